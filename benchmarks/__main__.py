@@ -0,0 +1,58 @@
+"""
+Usage:
+    python -m benchmarks run [--bars N] [--seed S] [--repeats R] [--output PATH]
+    python -m benchmarks compare BASELINE.json CANDIDATE.json [--threshold T]
+
+`run` writes its results to benchmarks/results/<git commit>.json by default.
+`compare` exits with status 1 if any benchmark regressed by more than the
+threshold.
+"""
+
+import argparse
+import json
+import os
+import sys
+import pandas as pd
+from benchmarks.suite import compare_results, run_benchmarks
+
+RESULTS_DIR = os.path.join("benchmarks", "results")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run")
+    run_parser.add_argument("--bars", type=int, default=1_000_000)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--repeats", type=int, default=3)
+    run_parser.add_argument("--output")
+    compare_parser = subparsers.add_parser("compare")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    if args.command == "run":
+        results = run_benchmarks(args.bars, args.seed, args.repeats)
+        output = args.output or os.path.join(
+            RESULTS_DIR, f"{results['metadata']['git_commit'] or 'unknown'}.json"
+        )
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        with open(output, "w") as results_file:
+            json.dump(results, results_file, indent=2)
+        for name, result in results["results"].items():
+            print(f"{name:50s} {result['value']:>16.1f} {result['unit']}")
+        print(f"Results written to {output}")
+        return 0
+
+    with open(args.baseline) as baseline_file, open(args.candidate) as candidate_file:
+        comparison = compare_results(
+            json.load(baseline_file), json.load(candidate_file), args.threshold
+        )
+    with pd.option_context("display.width", 200, "display.max_rows", None):
+        print(comparison.to_string(index=False))
+    return 1 if comparison["regression"].any() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+import dataclasses
+import functools
+import itertools
+import logging
+import os
+import platform
+import subprocess
+import threading
+import time
+import numpy as np
+import pandas as pd
+from ttools.datafeeds import (
+    CSVDatafeed,
+    SharedMemoryDatafeed,
+    write_synthetic_databento_csv,
+)
+from ttools.indicators import BollingerUpperBand, SimpleMovingAverage
+from ttools.ontology.batching_queue import BatchingQueue, DiscardingQueue
+from ttools.ontology.enum_defs import DecisionType, TradeDirection
+from ttools.ontology.event_messages import LimitOrderEventMessage, new_order_id
+from ttools.strategies import StrategiesABC, Strategy1
+
+INDICATOR_PERIODS = [10, 100, 1_000]
+RESTING_ORDER_COUNTS = [0, 10, 100, 1_000, 10_000]
+
+
+@dataclasses.dataclass(frozen=True)
+class BenchmarkResult:
+    name: str
+    value: float
+    unit: str
+    higher_is_better: bool
+
+
+def _best_of(repeats: int, function) -> float:
+    """
+    Returns the shortest of `repeats` wall-clock durations of `function()`.
+    """
+    durations = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start_time)
+    return min(durations)
+
+
+def synthetic_csv_path(data_dir: str, bar_count: int, seed: int) -> str:
+    """
+    Returns the path of the synthetic CSV file with `bar_count` bars, writing
+    it first if it does not exist yet.
+    """
+    path_to_csv_file = os.path.join(data_dir, f"synthetic_{bar_count}_{seed}.csv")
+    if not os.path.exists(path_to_csv_file):
+        os.makedirs(data_dir, exist_ok=True)
+        write_synthetic_databento_csv(path_to_csv_file + ".tmp", bar_count, seed=seed)
+        os.replace(path_to_csv_file + ".tmp", path_to_csv_file)
+    return path_to_csv_file
+
+
+def bench_csv_decode(path_to_csv_file: str, bar_count: int, repeats: int):
+    def decode_bar_arrays():
+        for _ in CSVDatafeed(path_to_csv_file)._iter_bar_arrays():
+            pass
+
+    def decode_bar_event_messages():
+        for _ in CSVDatafeed(path_to_csv_file)._iter_bar_event_messages():
+            pass
+
+    yield BenchmarkResult(
+        "csv_decode.bar_arrays",
+        bar_count / _best_of(repeats, decode_bar_arrays),
+        "bars/s",
+        True,
+    )
+    yield BenchmarkResult(
+        "csv_decode.bar_event_messages",
+        bar_count / _best_of(repeats, decode_bar_event_messages),
+        "bars/s",
+        True,
+    )
+
+
+def bench_indicator_updates(closes: np.ndarray, repeats: int):
+    values = closes.tolist()
+    for indicator_class, period in itertools.product(
+        [SimpleMovingAverage, BollingerUpperBand], INDICATOR_PERIODS
+    ):
+
+        def update():
+            indicator = indicator_class(period)
+            for value in values:
+                indicator.update(value)
+
+        yield BenchmarkResult(
+            f"indicator_update.{indicator_class.__name__}.{period}",
+            _best_of(repeats, update) / len(values) * 1e9,
+            "ns/update",
+            False,
+        )
+
+
+class _RestingOrdersStrategy(StrategiesABC):
+    def on_bar(self, new_bar_event_message):
+        pass
+
+
+def bench_fill_orders(bar_event_messages: list, repeats: int):
+    # Limit orders far away from the market, which rest on the book for the
+    # whole benchmark.
+    lowest_price = min(bar.ohlcv.low for bar in bar_event_messages)
+    highest_price = max(bar.ohlcv.high for bar in bar_event_messages)
+    for resting_order_count in RESTING_ORDER_COUNTS:
+        strategy = _RestingOrdersStrategy(
+            incoming_bar_event_message_queue=DiscardingQueue(),
+            process_bar_event_message_queue=DiscardingQueue(),
+            trade_event_message_queue=DiscardingQueue(),
+            stop_event=threading.Event(),
+        )
+        for order_index in range(resting_order_count):
+            is_buy = order_index % 2 == 0
+            strategy.submit_order(
+                LimitOrderEventMessage(
+                    ts_event=0,
+                    order_id=new_order_id(),
+                    trade_direction=(
+                        TradeDirection.BUY if is_buy else TradeDirection.SELL
+                    ),
+                    quantity=1,
+                    decision_type=DecisionType.SHORT_ENTRY,
+                    limit_price=(
+                        lowest_price - 1 - order_index
+                        if is_buy
+                        else highest_price + 1 + order_index
+                    ),
+                )
+            )
+
+        def fill_orders():
+            for bar in bar_event_messages:
+                strategy._fill_orders(bar)
+
+        yield BenchmarkResult(
+            f"fill_orders.{resting_order_count}_resting",
+            _best_of(repeats, fill_orders) / len(bar_event_messages) * 1e9,
+            "ns/bar",
+            False,
+        )
+
+
+def bench_strategy1_end_to_end(path_to_csv_file: str, bar_count: int, repeats: int):
+    # The shared-memory datafeed decodes the CSV file in a separate process.
+    datafeed_factories = {
+        "end_to_end.Strategy1": functools.partial(CSVDatafeed, path_to_csv_file),
+        "end_to_end.Strategy1.shared_memory": functools.partial(
+            SharedMemoryDatafeed.from_csv_file, path_to_csv_file
+        ),
+    }
+
+    def run(datafeed_factory):
+        stop_event = threading.Event()
+        incoming_bar_event_message_queue = BatchingQueue(batch_size=256, max_batches=64)
+        datafeed = datafeed_factory(
+            incoming_bar_event_message_queue=incoming_bar_event_message_queue,
+            stop_event=stop_event,
+        )
+        strategy = Strategy1(
+            incoming_bar_event_message_queue=incoming_bar_event_message_queue,
+            process_bar_event_message_queue=BatchingQueue(batch_size=256),
+            trade_event_message_queue=BatchingQueue(batch_size=256),
+            stop_event=stop_event,
+        )
+        datafeed.connect()
+        strategy.run_strategy()
+        strategy.strategy_thread.join()
+        datafeed.disconnect()
+
+    for name, datafeed_factory in datafeed_factories.items():
+        yield BenchmarkResult(
+            name,
+            bar_count / _best_of(repeats, functools.partial(run, datafeed_factory)),
+            "bars/s",
+            True,
+        )
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(
+    bar_count: int = 1_000_000,
+    seed: int = 0,
+    repeats: int = 3,
+    data_dir: str = os.path.join("benchmarks", ".data"),
+) -> dict:
+    """
+    Runs all benchmarks on a synthetic CSV file of `bar_count` bars and returns
+    the results together with the environment they were measured in.
+    """
+    # Per-bar INFO logging would dominate the measurements.
+    logging.getLogger().setLevel(logging.WARNING)
+    path_to_csv_file = synthetic_csv_path(data_dir, bar_count, seed)
+    bar_arrays = CSVDatafeed(path_to_csv_file).load_bar_arrays()
+    sample_size = min(bar_count, 100_000)
+    bar_event_messages = list(bar_arrays.iter_bar_event_messages())[:sample_size]
+
+    results = [
+        *bench_csv_decode(path_to_csv_file, bar_count, repeats),
+        *bench_indicator_updates(bar_arrays.close[:sample_size], repeats),
+        *bench_fill_orders(bar_event_messages, repeats),
+        *bench_strategy1_end_to_end(path_to_csv_file, bar_count, repeats),
+    ]
+    return {
+        "metadata": {
+            "git_commit": _git_commit(),
+            "timestamp": pd.Timestamp.now(tz="UTC").isoformat(),
+            "python_version": platform.python_version(),
+            "numpy_version": np.__version__,
+            "pandas_version": pd.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "bar_count": bar_count,
+            "seed": seed,
+            "repeats": repeats,
+        },
+        "results": {
+            result.name: {
+                "value": result.value,
+                "unit": result.unit,
+                "higher_is_better": result.higher_is_better,
+            }
+            for result in results
+        },
+    }
+
+
+def compare_results(
+    baseline: dict, candidate: dict, threshold: float = 0.1
+) -> pd.DataFrame:
+    """
+    Compares two outputs of run_benchmarks(). `change` is positive when the
+    candidate is better; benchmarks that got worse by more than `threshold`
+    are flagged as regressions.
+    """
+    rows = []
+    for name, candidate_result in candidate["results"].items():
+        baseline_result = baseline["results"].get(name)
+        if baseline_result is None:
+            continue
+        ratio = candidate_result["value"] / baseline_result["value"]
+        change = ratio - 1 if candidate_result["higher_is_better"] else 1 / ratio - 1
+        rows.append(
+            {
+                "benchmark": name,
+                "unit": candidate_result["unit"],
+                "baseline": baseline_result["value"],
+                "candidate": candidate_result["value"],
+                "change": change,
+                "regression": change < -threshold,
+            }
+        )
+    return pd.DataFrame(rows)
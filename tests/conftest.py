@@ -0,0 +1,24 @@
+import logging
+
+import pytest
+
+from ttools.datafeeds import CSVDatafeed, write_synthetic_databento_csv
+from ttools.ontology import BarArrays
+
+
+@pytest.fixture(scope="session")
+def synthetic_csv_file(tmp_path_factory) -> str:
+    return write_synthetic_databento_csv(
+        str(tmp_path_factory.mktemp("data") / "bars.csv"), 20_000
+    )
+
+
+@pytest.fixture(scope="session")
+def synthetic_bars(synthetic_csv_file) -> BarArrays:
+    return CSVDatafeed(synthetic_csv_file).load_bar_arrays()
+
+
+@pytest.fixture(autouse=True, scope="session")
+def quiet_logging():
+    # ttools logs every bar and order at INFO level.
+    logging.getLogger().setLevel(logging.WARNING)
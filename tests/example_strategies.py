@@ -0,0 +1,128 @@
+import random
+
+import numpy as np
+
+from ttools.ontology import (
+    BarArrays,
+    DecisionType,
+    IncomingBarEventMessage,
+    LimitOrderEventMessage,
+    MarketOrderEventMessage,
+    OrderType,
+    StopOrderEventMessage,
+    TradeDirection,
+    new_order_id,
+)
+from ttools.strategies import StrategiesABC, VectorizedOrders
+
+
+class LimitAndStopStrategy(StrategiesABC):
+    """
+    Submits a market sell every 7 bars, a limit sell above the close every 50
+    bars and a stop buy above the close every 30 bars, on the bar's close.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.bar_count = 0
+
+    def on_bar(self, new_bar_event_message: IncomingBarEventMessage):
+        close = new_bar_event_message.ohlcv.close
+        order_fields = dict(
+            ts_event=new_bar_event_message.ts_event,
+            quantity=1,
+            symbol=new_bar_event_message.symbol,
+        )
+        if self.bar_count % 7 == 0:
+            self.submit_order(
+                MarketOrderEventMessage(
+                    order_id=new_order_id(),
+                    trade_direction=TradeDirection.SELL,
+                    decision_type=DecisionType.SHORT_ENTRY,
+                    **order_fields,
+                )
+            )
+        if self.bar_count % 50 == 0:
+            self.submit_order(
+                LimitOrderEventMessage(
+                    order_id=new_order_id(),
+                    trade_direction=TradeDirection.SELL,
+                    decision_type=DecisionType.SHORT_ADD,
+                    limit_price=close + 1.0,
+                    **order_fields,
+                )
+            )
+        if self.bar_count % 30 == 0:
+            self.submit_order(
+                StopOrderEventMessage(
+                    order_id=new_order_id(),
+                    trade_direction=TradeDirection.BUY,
+                    decision_type=DecisionType.SHORT_FULL_COVER,
+                    stop_price=close + 2.0,
+                    **order_fields,
+                )
+            )
+        self.bar_count += 1
+
+    def generate_vectorized_orders(self, bars: BarArrays) -> VectorizedOrders:
+        bar_count = self.bar_count + np.arange(len(bars))
+        return VectorizedOrders.concatenate(
+            VectorizedOrders.from_signal(
+                bar_count % 7 == 0,
+                trade_direction=TradeDirection.SELL,
+                quantity=1,
+                decision_type=DecisionType.SHORT_ENTRY,
+            ),
+            VectorizedOrders.from_signal(
+                bar_count % 50 == 0,
+                trade_direction=TradeDirection.SELL,
+                quantity=1,
+                decision_type=DecisionType.SHORT_ADD,
+                order_type=OrderType.LIMIT,
+                price=bars.close + 1.0,
+            ),
+            VectorizedOrders.from_signal(
+                bar_count % 30 == 0,
+                trade_direction=TradeDirection.BUY,
+                quantity=1,
+                decision_type=DecisionType.SHORT_FULL_COVER,
+                order_type=OrderType.STOP,
+                price=bars.close + 2.0,
+            ),
+        )
+
+
+class RandomTrader(StrategiesABC):
+    """
+    Submits, on a seeded random tenth of the bars, a market order and, on
+    another twentieth, a limit order half a point through the close, each of
+    a random direction and quantity.
+    """
+
+    def __init__(self, seed: int = 0, **kwargs):
+        super().__init__(**kwargs)
+        self.random = random.Random(seed)
+
+    def on_bar(self, new_bar_event_message: IncomingBarEventMessage):
+        draw = self.random.random()
+        if draw >= 0.15:
+            return
+        trade_direction = self.random.choice(list(TradeDirection))
+        order_fields = dict(
+            ts_event=new_bar_event_message.ts_event,
+            order_id=new_order_id(),
+            trade_direction=trade_direction,
+            quantity=self.random.randint(1, 5),
+            decision_type=DecisionType.SHORT_ENTRY,
+            symbol=new_bar_event_message.symbol,
+        )
+        if draw < 0.1:
+            self.submit_order(MarketOrderEventMessage(**order_fields))
+        else:
+            offset = -0.5 if trade_direction == TradeDirection.BUY else 0.5
+            self.submit_order(
+                LimitOrderEventMessage(
+                    limit_price=new_bar_event_message.ohlcv.close + offset,
+                    **order_fields,
+                )
+            )
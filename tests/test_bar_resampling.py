@@ -0,0 +1,147 @@
+import dataclasses
+
+import numpy as np
+import pytest
+
+from ttools.datafeeds import (
+    BarResampler,
+    CSVDatafeed,
+    ResampledDatafeed,
+    iter_synthetic_bar_arrays,
+    resample_bar_arrays,
+)
+from ttools.ontology import BarArrays, Rtype
+
+SECOND = 10**9
+
+
+def _one_second_bars(seconds: list[int], symbol: str = "ESM4") -> BarArrays:
+    count = len(seconds)
+    return BarArrays(
+        ts_event=np.array(seconds, dtype=np.int64) * SECOND,
+        rtype=np.full(count, Rtype.OHLCV_1S.value, dtype=np.uint8),
+        open=np.arange(count) + 10.0,
+        high=np.arange(count) + 20.0,
+        low=np.arange(count) + 0.0,
+        close=np.arange(count) + 15.0,
+        volume=np.arange(count, dtype=np.int64) + 1,
+        symbol=np.full(count, symbol, dtype=object),
+    )
+
+
+def _resample_streaming(bars: BarArrays, rtype: Rtype) -> BarArrays:
+    resampler = BarResampler(rtype)
+    resampled = []
+    for new_bar_event_message in bars.iter_bar_event_messages():
+        resampled += resampler.update(new_bar_event_message)
+    resampled += resampler.flush()
+    return BarArrays.from_bar_event_messages(resampled)
+
+
+def _sorted_by_start_and_symbol(bars: BarArrays) -> BarArrays:
+    order = np.lexsort((bars.symbol.astype(str), bars.ts_event))
+    return BarArrays(
+        **{
+            field.name: getattr(bars, field.name)[order]
+            for field in dataclasses.fields(BarArrays)
+        }
+    )
+
+
+def _assert_bars_equal(actual: BarArrays, expected: BarArrays) -> None:
+    for field in dataclasses.fields(BarArrays):
+        np.testing.assert_array_equal(
+            getattr(actual, field.name), getattr(expected, field.name), field.name
+        )
+
+
+@pytest.fixture(scope="module")
+def two_symbol_bars() -> BarArrays:
+    blocks = [
+        block
+        for symbol, seed in (("ESM4", 0), ("NQM4", 1))
+        for block in iter_synthetic_bar_arrays(5_000, symbol, seed)
+    ]
+    bars = BarArrays.concatenate(blocks)
+    order = np.argsort(bars.ts_event, kind="stable")
+    return BarArrays(
+        **{
+            field.name: getattr(bars, field.name)[order]
+            for field in dataclasses.fields(BarArrays)
+        }
+    )
+
+
+def test_buckets_are_aligned_and_aggregate_ohlcv():
+    # 5s buckets [0, 5), [5, 10) and a last, partial bucket [10, 15).
+    bars = _one_second_bars([3, 4, 5, 7, 9, 12])
+    resampler = BarResampler(Rtype.OHLCV_5S)
+    emitted_after = [
+        [bar.ts_event for bar in resampler.update(new_bar_event_message)]
+        for new_bar_event_message in bars.iter_bar_event_messages()
+    ]
+    # A bucket is emitted with the source bar that ends it.
+    assert emitted_after == [[], [0], [], [], [5 * SECOND], []]
+    (partial_bar,) = resampler.flush()
+    assert partial_bar.ts_event == 10 * SECOND
+    assert partial_bar.rtype == Rtype.OHLCV_5S
+
+    resampled = resample_bar_arrays(bars, Rtype.OHLCV_5S)
+    np.testing.assert_array_equal(resampled.ts_event, [0, 5 * SECOND, 10 * SECOND])
+    np.testing.assert_array_equal(resampled.open, [10.0, 12.0, 15.0])
+    np.testing.assert_array_equal(resampled.high, [21.0, 24.0, 25.0])
+    np.testing.assert_array_equal(resampled.low, [0.0, 2.0, 5.0])
+    np.testing.assert_array_equal(resampled.close, [16.0, 19.0, 20.0])
+    np.testing.assert_array_equal(resampled.volume, [3, 12, 6])
+    assert (resampled.rtype == Rtype.OHLCV_5S.value).all()
+
+
+def test_bar_completed_by_a_later_bucket_is_emitted_then():
+    bars = _one_second_bars([61, 62, 185])
+    resampler = BarResampler(Rtype.OHLCV_1M)
+    emitted = [
+        resampler.update(new_bar_event_message)
+        for new_bar_event_message in bars.iter_bar_event_messages()
+    ]
+    assert [[bar.ts_event for bar in completed] for completed in emitted] == [
+        [],
+        [],
+        [60 * SECOND],
+    ]
+    assert [bar.ts_event for bar in resampler.flush()] == [180 * SECOND]
+
+
+@pytest.mark.parametrize("rtype", [Rtype.OHLCV_5S, Rtype.OHLCV_1M, Rtype.OHLCV_5M])
+def test_streaming_matches_vectorized_resampling(two_symbol_bars, rtype):
+    resampled = resample_bar_arrays(two_symbol_bars, rtype)
+    assert (resampled.ts_event % (rtype.interval_seconds * SECOND) == 0).all()
+    assert resampled.volume.sum() == two_symbol_bars.volume.sum()
+    _assert_bars_equal(
+        resampled,
+        _sorted_by_start_and_symbol(_resample_streaming(two_symbol_bars, rtype)),
+    )
+
+
+def test_resampled_datafeed_matches_vectorized_resampling(
+    synthetic_csv_file, synthetic_bars
+):
+    datafeed = ResampledDatafeed(
+        CSVDatafeed(synthetic_csv_file),
+        [Rtype.OHLCV_1M, Rtype.OHLCV_5M],
+        include_source_bars=True,
+    )
+    replayed = BarArrays.concatenate(list(datafeed._iter_bar_arrays()))
+    for rtype in (Rtype.OHLCV_1S, Rtype.OHLCV_1M, Rtype.OHLCV_5M):
+        is_rtype = replayed.rtype == rtype.value
+        replayed_rtype = BarArrays(
+            **{
+                field.name: getattr(replayed, field.name)[is_rtype]
+                for field in dataclasses.fields(BarArrays)
+            }
+        )
+        expected = (
+            synthetic_bars
+            if rtype == Rtype.OHLCV_1S
+            else resample_bar_arrays(synthetic_bars, rtype)
+        )
+        _assert_bars_equal(replayed_rtype, expected)
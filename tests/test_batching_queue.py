@@ -0,0 +1,120 @@
+import queue
+import threading
+import time
+
+import pytest
+
+from ttools.datafeeds import CSVDatafeed, write_synthetic_databento_csv
+from ttools.ontology import END_OF_STREAM, BatchingQueue
+from ttools.ontology.batching_queue import DiscardingQueue
+from ttools.strategies import Strategy1
+
+
+def test_items_come_out_in_order_across_batches():
+    batching_queue = BatchingQueue(batch_size=4)
+    batching_queue.put_many(range(10))
+    batching_queue.put(10)
+    batching_queue.close()
+    items = []
+    while (item := batching_queue.get(timeout=1)) is not END_OF_STREAM:
+        items.append(item)
+    assert items == list(range(11))
+
+
+def test_get_sees_a_partial_batch():
+    batching_queue = BatchingQueue(batch_size=256)
+    batching_queue.put("trade")
+    assert batching_queue.get(timeout=0.5) == "trade"
+    with pytest.raises(queue.Empty):
+        batching_queue.get(timeout=0.01)
+
+
+def test_blocked_get_many_wakes_up_on_put():
+    batching_queue = BatchingQueue(batch_size=256)
+    results = []
+    consumer = threading.Thread(
+        target=lambda: results.append(batching_queue.get_many(timeout=5))
+    )
+    consumer.start()
+    time.sleep(0.05)
+    batching_queue.put("bar")
+    consumer.join(1)
+    assert results == [["bar"]]
+
+
+def test_waiting_consumer_collects_a_partial_batch_for_max_delay():
+    batching_queue = BatchingQueue(batch_size=256, max_delay=0.2)
+    results = []
+    consumer = threading.Thread(
+        target=lambda: results.append(batching_queue.get_many(timeout=5))
+    )
+    consumer.start()
+    time.sleep(0.05)
+    for item in range(3):
+        batching_queue.put(item)
+    consumer.join(1)
+    assert results == [[0, 1, 2]]
+
+
+def test_put_many_does_not_duplicate_items_taken_while_it_waits():
+    batching_queue = BatchingQueue(batch_size=2, max_batches=1, max_delay=0)
+    batching_queue.put_many([0, 1])
+    producer = threading.Thread(target=batching_queue.put_many, args=([2, 3, 4, 5],))
+    producer.start()
+    items = []
+    while len(items) < 6:
+        items.extend(batching_queue.get_many(timeout=1))
+    producer.join(1)
+    assert items == [0, 1, 2, 3, 4, 5]
+    assert batching_queue.empty()
+
+
+def test_put_times_out_on_a_full_queue_without_putting():
+    batching_queue = BatchingQueue(batch_size=2, max_batches=1)
+    batching_queue.put_many([0, 1, 2])
+    with pytest.raises(queue.Full):
+        batching_queue.put(3, timeout=0.01)
+    with pytest.raises(queue.Full):
+        batching_queue.close(timeout=0.01)
+    assert batching_queue.get_many() == [0, 1]
+    batching_queue.put(3)
+    assert batching_queue.get_many() == [2, 3]
+    batching_queue.close()
+    assert batching_queue.get_many() == [END_OF_STREAM]
+
+
+def test_discarding_queue_accepts_close_with_timeout():
+    DiscardingQueue().close(timeout=0.1)
+
+
+def test_stop_event_does_not_deadlock_a_datafeed_on_a_full_queue(tmp_path):
+    path_to_csv_file = write_synthetic_databento_csv(str(tmp_path / "bars.csv"), 50_000)
+    stop_event = threading.Event()
+    incoming_bar_event_message_queue = BatchingQueue(batch_size=256, max_batches=4)
+    datafeed = CSVDatafeed(
+        path_to_csv_file,
+        incoming_bar_event_message_queue=incoming_bar_event_message_queue,
+        stop_event=stop_event,
+    )
+    strategy = Strategy1(
+        incoming_bar_event_message_queue=BatchingQueue(batch_size=256),
+        process_bar_event_message_queue=DiscardingQueue(),
+        trade_event_message_queue=DiscardingQueue(),
+        stop_event=stop_event,
+    )
+    # Only the datafeed runs, so it blocks once the queue is full.
+    datafeed.connect()
+    deadline = time.monotonic() + 10
+    while incoming_bar_event_message_queue.qsize() < 4 * 256:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    strategy.incoming_bar_event_message_queue = incoming_bar_event_message_queue
+    stop_event.set()
+    strategy.run_strategy()
+    strategy.strategy_thread.join(5)
+    assert not strategy.strategy_thread.is_alive()
+
+    disconnect_thread = threading.Thread(target=datafeed.disconnect, daemon=True)
+    disconnect_thread.start()
+    disconnect_thread.join(5)
+    assert not disconnect_thread.is_alive()
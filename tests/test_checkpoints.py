@@ -0,0 +1,77 @@
+import itertools
+
+import pytest
+
+from ttools.ontology import BatchingQueue, get_next_ids, set_next_ids
+from ttools.ontology.batching_queue import DiscardingQueue
+from ttools.strategies import Strategy1
+
+from tests.example_strategies import LimitAndStopStrategy
+
+CHECKPOINT_BAR = 12_345
+
+
+def _process(strategy, bar_event_messages) -> list:
+    for new_bar_event_message in bar_event_messages:
+        strategy._process_bar(new_bar_event_message)
+    trades = []
+    while not strategy.trade_event_message_queue.empty():
+        trades.append(strategy.trade_event_message_queue.get())
+    return trades
+
+
+@pytest.mark.parametrize("strategy_class", [Strategy1, LimitAndStopStrategy])
+def test_resumed_run_matches_full_replay(strategy_class, synthetic_bars, tmp_path):
+    next_ids = get_next_ids()
+    full_replay_strategy = strategy_class(
+        process_bar_event_message_queue=DiscardingQueue(),
+        trade_event_message_queue=BatchingQueue(),
+    )
+    full_replay_trades = _process(
+        full_replay_strategy, synthetic_bars.iter_bar_event_messages()
+    )
+
+    set_next_ids(*next_ids)
+    bar_event_messages = synthetic_bars.iter_bar_event_messages()
+    strategy = strategy_class(
+        process_bar_event_message_queue=DiscardingQueue(),
+        trade_event_message_queue=BatchingQueue(),
+    )
+    trades = _process(strategy, itertools.islice(bar_event_messages, CHECKPOINT_BAR))
+    strategy.save_checkpoint(str(tmp_path / "strategy.ckpt"))
+    del strategy
+
+    resumed_strategy = strategy_class.load_checkpoint(
+        str(tmp_path / "strategy.ckpt"),
+        process_bar_event_message_queue=DiscardingQueue(),
+        trade_event_message_queue=BatchingQueue(),
+    )
+    assert resumed_strategy.last_ts_event == synthetic_bars.ts_event[CHECKPOINT_BAR - 1]
+    trades += _process(resumed_strategy, bar_event_messages)
+
+    assert len(full_replay_trades) > 100
+    assert trades == full_replay_trades
+    assert (
+        resumed_strategy.performance_tracker.summary()
+        == full_replay_strategy.performance_tracker.summary()
+    )
+
+
+def test_loading_a_checkpoint_never_reuses_ids(synthetic_bars, tmp_path):
+    strategy = LimitAndStopStrategy(
+        process_bar_event_message_queue=DiscardingQueue(),
+        trade_event_message_queue=BatchingQueue(),
+    )
+    _process(strategy, itertools.islice(synthetic_bars.iter_bar_event_messages(), 100))
+    strategy.save_checkpoint(str(tmp_path / "strategy.ckpt"))
+    # Another strategy in the process uses up ids after the checkpoint.
+    _process(
+        LimitAndStopStrategy(
+            process_bar_event_message_queue=DiscardingQueue(),
+            trade_event_message_queue=BatchingQueue(),
+        ),
+        itertools.islice(synthetic_bars.iter_bar_event_messages(), 100),
+    )
+    next_ids = get_next_ids()
+    LimitAndStopStrategy.load_checkpoint(str(tmp_path / "strategy.ckpt"))
+    assert get_next_ids() == next_ids
@@ -0,0 +1,83 @@
+import dataclasses
+import gzip
+import itertools
+import shutil
+
+import numpy as np
+import pytest
+
+from ttools.datafeeds import CSVDatafeed, csv_datafeed
+from ttools.ontology import BarArrays
+
+
+@pytest.fixture(scope="module")
+def gzipped_csv_file(synthetic_csv_file, tmp_path_factory) -> str:
+    path_to_gzipped_csv_file = str(tmp_path_factory.mktemp("gzip") / "bars.csv.gz")
+    with (
+        open(synthetic_csv_file, "rb") as csv_file,
+        gzip.open(path_to_gzipped_csv_file, "wb") as gzipped_csv_file,
+    ):
+        shutil.copyfileobj(csv_file, gzipped_csv_file)
+    return path_to_gzipped_csv_file
+
+
+@pytest.fixture
+def opened_readers(monkeypatch) -> list:
+    # Records the decompressing readers that CSVDatafeed opens.
+    readers = []
+    open_decompressing_reader = csv_datafeed.open_decompressing_reader
+
+    def open_and_record_decompressing_reader(path: str):
+        readers.append(open_decompressing_reader(path))
+        return readers[-1]
+
+    monkeypatch.setattr(
+        csv_datafeed, "open_decompressing_reader", open_and_record_decompressing_reader
+    )
+    return readers
+
+
+def _assert_bars_equal(actual: BarArrays, expected: BarArrays) -> None:
+    for field in dataclasses.fields(BarArrays):
+        np.testing.assert_array_equal(
+            getattr(actual, field.name), getattr(expected, field.name), field.name
+        )
+
+
+def test_replays_a_gzipped_file(gzipped_csv_file, synthetic_bars, opened_readers):
+    datafeed = CSVDatafeed(gzipped_csv_file, chunksize=1_000)
+    # The file is only opened once the replay starts.
+    assert not opened_readers
+    _assert_bars_equal(datafeed.load_bar_arrays(), synthetic_bars)
+    (reader,) = opened_readers
+    assert reader.closed
+
+
+def test_closing_the_replay_early_closes_the_file(gzipped_csv_file, opened_readers):
+    datafeed = CSVDatafeed(gzipped_csv_file, chunksize=1_000)
+    bar_arrays = datafeed._iter_bar_arrays()
+    assert len(list(itertools.islice(bar_arrays, 2))) == 2
+    (reader,) = opened_readers
+    assert not reader.closed
+    bar_arrays.close()
+    assert reader.closed
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+def test_replays_a_time_range(
+    compressed, synthetic_csv_file, gzipped_csv_file, synthetic_bars
+):
+    start, end = synthetic_bars.ts_event[[7_777, 12_345]]
+    datafeed = CSVDatafeed(
+        gzipped_csv_file if compressed else synthetic_csv_file,
+        chunksize=1_000,
+        start=int(start),
+        end=int(end),
+    )
+    expected = BarArrays(
+        **{
+            field.name: getattr(synthetic_bars, field.name)[7_777:12_345]
+            for field in dataclasses.fields(BarArrays)
+        }
+    )
+    _assert_bars_equal(datafeed.load_bar_arrays(), expected)
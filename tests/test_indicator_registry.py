@@ -0,0 +1,59 @@
+import numpy as np
+
+from ttools.engines import VectorizedBacktestEngine
+from ttools.indicators import (
+    IndicatorRegistry,
+    IndicatorSeriesCache,
+    SimpleMovingAverage,
+)
+from ttools.ontology import OHLCV, IncomingBarEventMessage, Rtype
+from ttools.strategies import Strategy1
+
+
+def _bar(ts_event: int, close: float) -> IncomingBarEventMessage:
+    return IncomingBarEventMessage(
+        ts_event=ts_event,
+        rtype=Rtype.OHLCV_1S,
+        symbol="ESM4",
+        ohlcv=OHLCV(close, close, close, close, 1),
+    )
+
+
+def _fills(trades) -> list[tuple[int, float]]:
+    return [(trade.ts_event, trade.fill_price) for trade in trades]
+
+
+def test_registry_shares_indicators_and_updates_once_per_bar():
+    registry = IndicatorRegistry()
+    sma = registry.register(SimpleMovingAverage, "close", period=2)
+    same_sma = registry.register(SimpleMovingAverage, "close", period=2)
+    assert len(registry) == 1
+    assert same_sma.key == sma.key
+
+    first_bar = _bar(1, 1.0)
+    registry.update(first_bar)
+    registry.update(first_bar)
+    # A distinct bar with the same ts_event, symbol and rtype is a new update.
+    registry.update(_bar(1, 3.0))
+    assert sma[0] == 2.0
+    assert np.isnan(sma[-1])
+
+
+def test_vectorized_engine_loads_cached_indicator_series(
+    synthetic_csv_file, synthetic_bars, tmp_path
+):
+    series_cache = IndicatorSeriesCache(
+        synthetic_csv_file, str(tmp_path / "indicators")
+    )
+    trades = VectorizedBacktestEngine(Strategy1(), series_cache).run(synthetic_bars)
+
+    strategy = Strategy1()
+    cached_series = series_cache.load(strategy.sma_slow.key)
+    assert isinstance(cached_series, np.memmap)
+    expected_series = SimpleMovingAverage(100).update_many(synthetic_bars.close)
+    np.testing.assert_array_equal(cached_series, expected_series)
+
+    cached_trades = VectorizedBacktestEngine(strategy, series_cache).run(synthetic_bars)
+    uncached_trades = VectorizedBacktestEngine(Strategy1()).run(synthetic_bars)
+    assert _fills(cached_trades) == _fills(trades)
+    assert _fills(uncached_trades) == _fills(trades)
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from ttools.indicators import (
+    BollingerBandwidth,
+    BollingerBands,
+    BollingerLowerBand,
+    BollingerMiddleBand,
+    BollingerUpperBand,
+    SimpleMovingAverage,
+)
+from ttools.indicators.bollinger_toolkit import _BollingerBand
+
+PERIOD = 20
+MULTIPLIER = 2.0
+
+
+@pytest.fixture(scope="module")
+def prices() -> np.ndarray:
+    # A random walk far from zero, where a running sum drifts the most.
+    rng = np.random.default_rng(0)
+    return 5_000.0 + np.cumsum(rng.normal(scale=0.25, size=5_000))
+
+
+def _windows(prices: np.ndarray) -> np.ndarray:
+    return np.lib.stride_tricks.sliding_window_view(prices, PERIOD)
+
+
+def test_sma_update_matches_np_mean(prices):
+    sma = SimpleMovingAverage(PERIOD)
+    updated = []
+    for price in prices.tolist():
+        sma.update(price)
+        updated.append(sma[0])
+    updated = np.array(updated)
+    assert np.isnan(updated[: PERIOD - 1]).all()
+    np.testing.assert_allclose(
+        updated[PERIOD - 1 :], _windows(prices).mean(axis=1), rtol=0, atol=1e-9
+    )
+
+
+def test_sma_update_many_matches_update(prices):
+    sma = SimpleMovingAverage(PERIOD)
+    for price in prices[:7].tolist():
+        sma.update(price)
+    updated_many = sma.update_many(prices[7:])
+    np.testing.assert_allclose(
+        updated_many[PERIOD - 8 :], _windows(prices).mean(axis=1), atol=1e-9
+    )
+
+
+@pytest.mark.parametrize(
+    "band_class, expected",
+    [
+        (BollingerUpperBand, lambda mean, std: mean + MULTIPLIER * std),
+        (BollingerMiddleBand, lambda mean, std: mean),
+        (BollingerLowerBand, lambda mean, std: mean - MULTIPLIER * std),
+        (BollingerBandwidth, lambda mean, std: 2 * MULTIPLIER * std / mean),
+    ],
+)
+def test_bollinger_update_matches_np_mean_and_std(prices, band_class, expected):
+    band = band_class(PERIOD, MULTIPLIER)
+    updated = []
+    for price in prices.tolist():
+        band.update(price)
+        updated.append(band[0])
+    windows = _windows(prices)
+    np.testing.assert_allclose(
+        np.array(updated)[PERIOD - 1 :],
+        expected(windows.mean(axis=1), windows.std(axis=1)),
+        rtol=1e-9,
+        atol=1e-9,
+    )
+
+
+def test_bollinger_bands_share_one_window(prices):
+    bands = BollingerBands(PERIOD, MULTIPLIER)
+    upper = BollingerUpperBand(PERIOD, MULTIPLIER)
+    for price in prices.tolist():
+        bands.update(price)
+        upper.update(price)
+        assert bands.upper[0] == upper[0] or np.isnan(upper[0])
+    windows = _windows(prices)
+    assert bands.middle[0] == pytest.approx(windows[-1].mean(), abs=1e-9)
+    assert bands.lower[0] == pytest.approx(
+        windows[-1].mean() - MULTIPLIER * windows[-1].std(), abs=1e-9
+    )
+
+
+def test_bollinger_band_without_band_value_cannot_be_instantiated():
+    class IncompleteBand(_BollingerBand):
+        @property
+        def name(self) -> str:
+            return "IncompleteBand"
+
+    with pytest.raises(TypeError):
+        IncompleteBand(PERIOD)
@@ -0,0 +1,39 @@
+import logging
+
+from ttools.engines import ParameterSweepRunner
+from ttools.ontology import BatchingQueue
+from ttools.ontology.batching_queue import DiscardingQueue
+from ttools.strategies import Strategy1
+
+
+def test_sweep_runs_match_single_runs(synthetic_csv_file, synthetic_bars):
+    results = ParameterSweepRunner(
+        Strategy1,
+        {"fast_period": [5, 10], "slow_period": [50]},
+        synthetic_csv_file,
+        max_workers=2,
+        worker_log_level=logging.WARNING,
+    ).run()
+
+    assert results.metrics["bar_count"].tolist() == [len(synthetic_bars)] * 2
+    for run_id, fast_period in enumerate([5, 10]):
+        trade_event_message_queue = BatchingQueue()
+        strategy = Strategy1(
+            fast_period=fast_period,
+            slow_period=50,
+            process_bar_event_message_queue=DiscardingQueue(),
+            trade_event_message_queue=trade_event_message_queue,
+        )
+        for new_bar_event_message in synthetic_bars.iter_bar_event_messages():
+            strategy._process_bar(new_bar_event_message)
+        expected_trades = []
+        while not trade_event_message_queue.empty():
+            trade = trade_event_message_queue.get()
+            expected_trades.append((trade.ts_event, trade.fill_price))
+
+        run_trades = results.trades[results.trades["run_id"] == run_id]
+        assert len(expected_trades) > 0
+        assert (
+            list(zip(run_trades["ts_event"], run_trades["fill_price"]))
+            == expected_trades
+        )
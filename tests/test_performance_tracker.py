@@ -0,0 +1,76 @@
+import dataclasses
+
+import numpy as np
+import pytest
+
+from ttools.datafeeds import iter_synthetic_bar_arrays
+from ttools.ontology import BarArrays, BatchingQueue
+from ttools.ontology.batching_queue import DiscardingQueue
+from ttools.strategies import Strategy1, summarize_performance
+
+from tests.example_strategies import LimitAndStopStrategy, RandomTrader
+
+
+@pytest.fixture(scope="module")
+def three_symbol_bars() -> BarArrays:
+    bars = BarArrays.concatenate(
+        [
+            block
+            for seed, symbol in enumerate(("ESM4", "NQM4", "CLN4"))
+            for block in iter_synthetic_bar_arrays(5_000, symbol, seed)
+        ]
+    )
+    order = np.argsort(bars.ts_event, kind="stable")
+    return BarArrays(
+        **{
+            field.name: getattr(bars, field.name)[order]
+            for field in dataclasses.fields(BarArrays)
+        }
+    )
+
+
+def _run(strategy, bars: BarArrays) -> tuple[dict, list]:
+    for new_bar_event_message in bars.iter_bar_event_messages():
+        strategy._process_bar(new_bar_event_message)
+    trades = []
+    while not strategy.trade_event_message_queue.empty():
+        trades.append(strategy.trade_event_message_queue.get())
+    return strategy.performance_tracker.summary(), trades
+
+
+def _assert_summaries_equal(actual: dict, expected: dict) -> None:
+    assert actual["positions"] == expected["positions"]
+    for key in expected.keys() - {"positions"}:
+        assert actual[key] == pytest.approx(expected[key], abs=1e-6), key
+
+
+@pytest.mark.parametrize(
+    "strategy_class", [Strategy1, LimitAndStopStrategy, RandomTrader]
+)
+def test_summary_matches_tracker(strategy_class, synthetic_bars):
+    strategy = strategy_class(
+        process_bar_event_message_queue=DiscardingQueue(),
+        trade_event_message_queue=BatchingQueue(),
+    )
+    summary, trades = _run(strategy, synthetic_bars)
+    assert len(trades) > 100
+    _assert_summaries_equal(summarize_performance(synthetic_bars, trades), summary)
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_summary_matches_tracker_across_symbols(seed, three_symbol_bars):
+    strategy = RandomTrader(
+        seed=seed,
+        process_bar_event_message_queue=DiscardingQueue(),
+        trade_event_message_queue=BatchingQueue(),
+    )
+    summary, trades = _run(strategy, three_symbol_bars)
+    assert {trade.symbol for trade in trades} == {"ESM4", "NQM4", "CLN4"}
+    assert len(summary["positions"]) == 3
+    _assert_summaries_equal(
+        summarize_performance(three_symbol_bars, trades, multiplier=50.0),
+        {
+            key: value if key == "positions" else value * 50.0
+            for key, value in summary.items()
+        },
+    )
@@ -0,0 +1,47 @@
+import threading
+
+from ttools.ontology import BatchingQueue
+from ttools.ontology.batching_queue import DiscardingQueue
+from ttools.pipeline_metrics import PipelineMetrics, pipeline_metrics
+from ttools.strategies import Strategy1
+
+
+def test_concurrent_updates_are_not_lost():
+    metrics = PipelineMetrics(enabled=True)
+
+    def record():
+        for duration_ns in range(10_000):
+            metrics.increment("bars_processed")
+            metrics.record_duration("strategy.on_bar", duration_ns)
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert metrics.counters["bars_processed"] == 40_000
+    assert metrics.histograms["strategy.on_bar"].count == 40_000
+    assert sum(metrics.histograms["strategy.on_bar"].bucket_counts) == 40_000
+
+
+def test_strategy_stages_are_timed_separately(synthetic_bars):
+    strategy = Strategy1(
+        process_bar_event_message_queue=DiscardingQueue(),
+        trade_event_message_queue=BatchingQueue(),
+    )
+    pipeline_metrics.reset()
+    pipeline_metrics.enable()
+    try:
+        for new_bar_event_message in synthetic_bars.iter_bar_event_messages():
+            strategy._process_bar(new_bar_event_message)
+    finally:
+        pipeline_metrics.disable()
+    bar_count = len(synthetic_bars)
+    assert pipeline_metrics.counters["bars_processed"] == bar_count
+    for stage in (
+        "strategy.fill_orders",
+        "strategy.update_performance",
+        "strategy.on_bar",
+    ):
+        assert pipeline_metrics.histograms[stage].count == bar_count
+    pipeline_metrics.reset()
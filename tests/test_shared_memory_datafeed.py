@@ -0,0 +1,93 @@
+import dataclasses
+import functools
+import itertools
+import logging
+import os
+import sys
+
+import numpy as np
+import pytest
+
+from ttools.datafeeds import CSVDatafeed, SharedMemoryDatafeed
+from ttools.ontology import BarArrays
+
+# The producer process attaches to the ring buffer with SharedMemory(track=...).
+pytestmark = pytest.mark.skipif(
+    sys.version_info < (3, 13), reason="requires Python 3.13"
+)
+
+
+class _FailingCSVDatafeed(CSVDatafeed):
+    def _iter_bar_arrays(self):
+        yield from itertools.islice(super()._iter_bar_arrays(), 2)
+        raise ValueError("Corrupt record")
+
+
+class _CrashingCSVDatafeed(CSVDatafeed):
+    def _iter_bar_arrays(self):
+        yield from itertools.islice(super()._iter_bar_arrays(), 2)
+        os._exit(3)
+
+
+def _shared_memory_datafeed(source_class, path_to_csv_file: str):
+    # A small ring buffer wraps around many times and keeps the producer
+    # waiting for the consumer.
+    return SharedMemoryDatafeed(
+        functools.partial(source_class, path_to_csv_file, chunksize=1_000),
+        capacity=3_000,
+        blocksize=700,
+    )
+
+
+def _assert_bars_equal(actual: BarArrays, expected: BarArrays) -> None:
+    for field in dataclasses.fields(BarArrays):
+        np.testing.assert_array_equal(
+            getattr(actual, field.name), getattr(expected, field.name), field.name
+        )
+
+
+def _head(bars: BarArrays, count: int) -> BarArrays:
+    return BarArrays(
+        **{
+            field.name: getattr(bars, field.name)[:count]
+            for field in dataclasses.fields(BarArrays)
+        }
+    )
+
+
+def test_replays_the_bars_of_its_source(synthetic_csv_file, synthetic_bars):
+    datafeed = _shared_memory_datafeed(CSVDatafeed, synthetic_csv_file)
+    replayed = BarArrays.concatenate(list(datafeed._iter_bar_arrays()))
+    _assert_bars_equal(replayed, synthetic_bars)
+    assert datafeed.producer_process.exitcode == 0
+
+
+def test_closing_the_replay_early_stops_the_producer(
+    synthetic_csv_file, synthetic_bars
+):
+    datafeed = _shared_memory_datafeed(CSVDatafeed, synthetic_csv_file)
+    bar_arrays = datafeed._iter_bar_arrays()
+    replayed = BarArrays.concatenate(list(itertools.islice(bar_arrays, 3)))
+    bar_arrays.close()
+    assert datafeed.producer_process.exitcode == 0
+    assert 0 < len(replayed) < len(synthetic_bars)
+    _assert_bars_equal(replayed, _head(synthetic_bars, len(replayed)))
+
+
+@pytest.mark.parametrize(
+    "source_class, message",
+    [
+        (_FailingCSVDatafeed, "producer process failed"),
+        (_CrashingCSVDatafeed, "exited with code 3"),
+    ],
+)
+def test_failing_source_ends_the_replay_after_its_bars(
+    source_class, message, synthetic_csv_file, synthetic_bars, caplog
+):
+    datafeed = _shared_memory_datafeed(source_class, synthetic_csv_file)
+    with caplog.at_level(logging.ERROR):
+        replayed = BarArrays.concatenate(list(datafeed._iter_bar_arrays()))
+    # The bars written before the failure are all replayed.
+    assert len(replayed) == 2_000
+    _assert_bars_equal(replayed, _head(synthetic_bars, 2_000))
+    assert message in caplog.text
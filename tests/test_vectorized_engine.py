@@ -0,0 +1,54 @@
+import pytest
+
+from ttools.engines import VectorizedBacktestEngine
+from ttools.ontology import BarArrays, BatchingQueue, TradeEventMessage, get_next_ids
+from ttools.ontology.batching_queue import DiscardingQueue
+from ttools.strategies import Strategy1
+
+from tests.example_strategies import LimitAndStopStrategy
+
+
+def _relative_ids(trades: list[TradeEventMessage], next_ids: tuple[int, int]):
+    # Ids are process-wide counters, so the runs are compared by the ids they
+    # used up relative to their first one.
+    next_order_id, next_trade_id = next_ids
+    return [
+        (
+            trade.ts_event,
+            trade.trade_id - next_trade_id,
+            trade.assoc_order_id - next_order_id,
+            trade.trade_direction,
+            trade.quantity,
+            trade.fill_price,
+            trade.assoc_decision_type,
+            trade.symbol,
+        )
+        for trade in trades
+    ]
+
+
+def _run_event_driven(strategy_class, bars: BarArrays) -> list:
+    trade_event_message_queue = BatchingQueue()
+    strategy = strategy_class(
+        process_bar_event_message_queue=DiscardingQueue(),
+        trade_event_message_queue=trade_event_message_queue,
+    )
+    next_ids = get_next_ids()
+    for new_bar_event_message in bars.iter_bar_event_messages():
+        strategy._process_bar(new_bar_event_message)
+    trades = []
+    while not trade_event_message_queue.empty():
+        trades.append(trade_event_message_queue.get())
+    return _relative_ids(trades, next_ids)
+
+
+def _run_vectorized(strategy_class, bars: BarArrays) -> list:
+    next_ids = get_next_ids()
+    return _relative_ids(VectorizedBacktestEngine(strategy_class()).run(bars), next_ids)
+
+
+@pytest.mark.parametrize("strategy_class", [Strategy1, LimitAndStopStrategy])
+def test_vectorized_engine_matches_event_driven_trades(strategy_class, synthetic_bars):
+    event_driven_trades = _run_event_driven(strategy_class, synthetic_bars)
+    assert len(event_driven_trades) > 100
+    assert _run_vectorized(strategy_class, synthetic_bars) == event_driven_trades
@@ -1,2 +1,10 @@
 from .abc_datafeeds import *
+from .csv_offset_index import *
+from .decompressing_reader import *
 from .csv_datafeed import *
+from .memmap_datafeed import *
+from .dbn_datafeed import *
+from .multi_symbol_datafeed import *
+from .synthetic_data import *
+from .bar_resampling import *
+from .shared_memory_datafeed import *
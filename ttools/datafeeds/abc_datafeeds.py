@@ -1,6 +1,22 @@
 import abc
+import logging
+import queue
 import threading
-from ttools.ontology.event_messages import IncomingBarEventMessage
+import time
+from collections.abc import Iterator
+from ttools.ontology.event_messages import (
+    GLOBAL_STOP_EVENT,
+    IncomingBarEventMessage,
+    IncomingBarBlockEventMessage,
+)
+from ttools.ontology.bar_arrays import BarArrays
+from ttools.ontology.batching_queue import BatchingQueue
+from ttools.ontology import global_queues
+from ttools.logging_config import logger
+from ttools.pipeline_metrics import pipeline_metrics
+
+# Seconds between checks of the stop events while the incoming queue is full.
+_PUT_TIMEOUT = 0.1
 
 
 class DatafeedsABC(abc.ABC):
@@ -23,3 +39,150 @@ class DatafeedsABC(abc.ABC):
     @abc.abstractmethod
     def disconnect(self):
         pass
+
+
+class ReplayDatafeedABC(DatafeedsABC):
+    """
+    Base class for datafeeds that replay recorded bars on a background thread.
+    Subclasses only need to implement `_iter_bar_arrays()`. With
+    `emit_bar_blocks=True`, every decoded block is enqueued as a single
+    IncomingBarBlockEventMessage instead of one message per bar.
+    """
+
+    def __init__(
+        self,
+        emit_bar_blocks: bool = False,
+        incoming_bar_event_message_queue: BatchingQueue | None = None,
+        stop_event: threading.Event | None = None,
+    ):
+        super().__init__()
+        self.emit_bar_blocks = emit_bar_blocks
+        self.incoming_bar_event_message_queue = (
+            incoming_bar_event_message_queue
+            or global_queues.incoming_bar_event_message_queue
+        )
+        self._stop_event = stop_event or GLOBAL_STOP_EVENT
+        self._bar_event_messages: Iterator[IncomingBarEventMessage] | None = None
+        self.enqueue_incoming_bar_event_messages_thread: threading.Thread | None = None
+
+    @abc.abstractmethod
+    def _iter_bar_arrays(self) -> Iterator[BarArrays]:
+        pass
+
+    def _iter_bar_event_messages(
+        self,
+    ) -> Iterator[IncomingBarEventMessage | IncomingBarBlockEventMessage]:
+        for bar_arrays in self._iter_bar_arrays():
+            if self.emit_bar_blocks:
+                yield IncomingBarBlockEventMessage(bar_arrays)
+            else:
+                yield from bar_arrays.iter_bar_event_messages()
+
+    def _get_next_bar_event_message(
+        self,
+    ) -> IncomingBarEventMessage | IncomingBarBlockEventMessage | None:
+        if self._stop_event.is_set() or self._instance_stop_event.is_set():
+            return None
+        if self._bar_event_messages is None:
+            self._bar_event_messages = self._iter_bar_event_messages()
+        try:
+            return next(self._bar_event_messages)
+        except StopIteration:
+            logger.info(f"End of {type(self).__name__} replay data reached")
+            return None
+        except Exception as e:
+            logger.error(f"Error reading next bar: {e}", exc_info=False)
+            return None
+
+    def connect(self):
+        self.enqueue_incoming_bar_event_messages_thread = threading.Thread(
+            target=self._enqueue_incoming_bar_event_messages,
+            name=type(self).__name__,
+        )
+        self.enqueue_incoming_bar_event_messages_thread.start()
+
+    def _put_incoming_bar_event_message(self, incoming_bar_event_message) -> bool:
+        """
+        Puts the message on the incoming queue, waiting while it is full.
+        Returns False if the datafeed is stopped meanwhile, as the strategy may
+        no longer be reading the queue.
+        """
+        while not (self._stop_event.is_set() or self._instance_stop_event.is_set()):
+            try:
+                self.incoming_bar_event_message_queue.put(
+                    incoming_bar_event_message, timeout=_PUT_TIMEOUT
+                )
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _close_incoming_bar_event_message_queue(self) -> None:
+        # A strategy reads on after disconnect() until END_OF_STREAM, so only
+        # the shared stop event, which also stops the strategy, gives up.
+        while True:
+            try:
+                self.incoming_bar_event_message_queue.close(timeout=_PUT_TIMEOUT)
+                return
+            except queue.Full:
+                if self._stop_event.is_set():
+                    return
+
+    def _enqueue_incoming_bar_event_messages(self):
+        metrics_enabled = pipeline_metrics.enabled
+        while not (self._stop_event.is_set() or self._instance_stop_event.is_set()):
+            try:
+                if metrics_enabled:
+                    decode_start_ns = time.perf_counter_ns()
+                incoming_bar_event_message = self._get_next_bar_event_message()
+                if incoming_bar_event_message is None:
+                    break
+                if metrics_enabled:
+                    enqueue_start_ns = time.perf_counter_ns()
+                    pipeline_metrics.record_duration(
+                        "datafeed.decode", enqueue_start_ns - decode_start_ns
+                    )
+                if not self._put_incoming_bar_event_message(incoming_bar_event_message):
+                    break
+                if metrics_enabled:
+                    pipeline_metrics.record_duration(
+                        "datafeed.enqueue", time.perf_counter_ns() - enqueue_start_ns
+                    )
+                    pipeline_metrics.increment(
+                        "bars_enqueued",
+                        (
+                            len(incoming_bar_event_message)
+                            if isinstance(
+                                incoming_bar_event_message,
+                                IncomingBarBlockEventMessage,
+                            )
+                            else 1
+                        ),
+                    )
+                    pipeline_metrics.record_queue_depth(
+                        "incoming_bar_event_message_queue",
+                        self.incoming_bar_event_message_queue.qsize(),
+                    )
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        "Enqueued %s | Queue size: %s",
+                        incoming_bar_event_message,
+                        self.incoming_bar_event_message_queue.qsize(),
+                    )
+            except Exception as e:
+                logger.error(f"Error enqueuing bar event: {e}", exc_info=False)
+        self._close_incoming_bar_event_message_queue()
+        if self._stop_event.is_set():
+            logger.info(f"Stop event detected.")
+            self._instance_stop_event.set()
+
+    def disconnect(self):
+        self._instance_stop_event.set()
+        if (
+            self.enqueue_incoming_bar_event_messages_thread
+            and self.enqueue_incoming_bar_event_messages_thread.is_alive()
+        ):
+            thread_name = self.enqueue_incoming_bar_event_messages_thread.name
+            logger.debug(f"Stopping {thread_name}...")
+            self.enqueue_incoming_bar_event_messages_thread.join()
+            logger.debug(f"{thread_name} stopped.")
@@ -0,0 +1,180 @@
+import dataclasses
+import itertools
+from collections.abc import Iterator
+import numpy as np
+from ttools.datafeeds.abc_datafeeds import ReplayDatafeedABC
+from ttools.ontology.bar_arrays import BarArrays
+from ttools.ontology.enum_defs import Rtype
+from ttools.ontology.event_messages import (
+    OHLCV,
+    IncomingBarEventMessage,
+    IncomingBarBlockEventMessage,
+)
+
+NANOSECONDS_PER_SECOND = 10**9
+
+
+class BarResampler:
+    """
+    Incrementally aggregates bars into bars of `rtype`'s interval (first open,
+    maximum high, minimum low, last close, summed volume), separately for every
+    symbol. Like DataBento bars, an aggregated bar is stamped with the start
+    of its interval and only exists if there were source bars in it.
+
+    A bar is emitted as soon as it is known to be complete: when the source
+    bar that ends its interval arrives, or else when the first source bar of a
+    later interval arrives.
+    """
+
+    def __init__(self, rtype: Rtype):
+        self.rtype = rtype
+        self._interval_ns = rtype.interval_seconds * NANOSECONDS_PER_SECOND
+        # symbol -> [interval start, open, high, low, close, volume]
+        self._partial_bars: dict[str, list] = {}
+
+    def _complete(self, symbol: str) -> IncomingBarEventMessage:
+        start, open_, high, low, close, volume = self._partial_bars.pop(symbol)
+        return IncomingBarEventMessage(
+            ts_event=start,
+            rtype=self.rtype,
+            symbol=symbol,
+            ohlcv=OHLCV(open_, high, low, close, volume),
+        )
+
+    def update(
+        self, new_bar_event_message: IncomingBarEventMessage
+    ) -> list[IncomingBarEventMessage]:
+        """
+        Adds a source bar and returns the aggregated bars it completes.
+        """
+        ts_event = new_bar_event_message.ts_event
+        symbol = new_bar_event_message.symbol
+        ohlcv = new_bar_event_message.ohlcv
+        start = ts_event - ts_event % self._interval_ns
+        completed = []
+
+        partial_bar = self._partial_bars.get(symbol)
+        if partial_bar is not None and partial_bar[0] != start:
+            completed.append(self._complete(symbol))
+            partial_bar = None
+        if partial_bar is None:
+            self._partial_bars[symbol] = [
+                start,
+                ohlcv.open,
+                ohlcv.high,
+                ohlcv.low,
+                ohlcv.close,
+                ohlcv.volume,
+            ]
+        else:
+            if ohlcv.high > partial_bar[2]:
+                partial_bar[2] = ohlcv.high
+            if ohlcv.low < partial_bar[3]:
+                partial_bar[3] = ohlcv.low
+            partial_bar[4] = ohlcv.close
+            partial_bar[5] += ohlcv.volume
+
+        source_end = (
+            ts_event
+            + new_bar_event_message.rtype.interval_seconds * NANOSECONDS_PER_SECOND
+        )
+        if source_end >= start + self._interval_ns:
+            completed.append(self._complete(symbol))
+        return completed
+
+    def flush(self) -> list[IncomingBarEventMessage]:
+        """
+        Returns the incomplete bars of all symbols, e.g. at the end of the data.
+        """
+        return [self._complete(symbol) for symbol in list(self._partial_bars)]
+
+
+def resample_bar_arrays(bars: BarArrays, rtype: Rtype) -> BarArrays:
+    """
+    Aggregates a block of bars into bars of `rtype`'s interval in one pass over
+    the arrays. Gives the same bars as feeding `bars` through a BarResampler
+    and flushing it, ordered by interval start and then by symbol.
+    """
+    if not len(bars):
+        return bars
+    interval_ns = rtype.interval_seconds * NANOSECONDS_PER_SECOND
+    start = bars.ts_event - bars.ts_event % interval_ns
+    symbols, symbol_codes = np.unique(bars.symbol.astype(str), return_inverse=True)
+    order = np.lexsort((bars.ts_event, start, symbol_codes))
+    start, symbol_codes = start[order], symbol_codes[order]
+
+    is_first = np.empty(len(order), dtype=bool)
+    is_first[0] = True
+    is_first[1:] = (start[1:] != start[:-1]) | (symbol_codes[1:] != symbol_codes[:-1])
+    first = np.flatnonzero(is_first)
+    last = np.append(first[1:], len(order)) - 1
+
+    resampled = BarArrays(
+        ts_event=start[first],
+        rtype=np.full(len(first), rtype.value, dtype=np.uint8),
+        open=bars.open[order][first],
+        high=np.maximum.reduceat(bars.high[order], first),
+        low=np.minimum.reduceat(bars.low[order], first),
+        close=bars.close[order][last],
+        volume=np.add.reduceat(bars.volume[order], first),
+        symbol=symbols[symbol_codes[first]].astype(object),
+    )
+    by_start = np.argsort(resampled.ts_event, kind="stable")
+    return BarArrays(
+        **{
+            field.name: getattr(resampled, field.name)[by_start]
+            for field in dataclasses.fields(BarArrays)
+        }
+    )
+
+
+class ResampledDatafeed(ReplayDatafeedABC):
+    """
+    Replays a source datafeed aggregated into one or more higher timeframes,
+    so a strategy can subscribe to several timeframes from a single pass over
+    the source. Bars are distinguished by their rtype; every aggregated bar is
+    enqueued right after the source bar that completes it. With
+    `include_source_bars`, the source bars are enqueued as well.
+
+    The source is only read from; its own queue and thread are unused.
+    """
+
+    def __init__(
+        self,
+        datafeed: ReplayDatafeedABC,
+        rtypes: list[Rtype],
+        include_source_bars: bool = False,
+        blocksize: int = 4_096,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.datafeed = datafeed
+        self.rtypes = rtypes
+        self.include_source_bars = include_source_bars
+        self.blocksize = blocksize
+
+    def _iter_resampled_bar_event_messages(
+        self,
+    ) -> Iterator[IncomingBarEventMessage]:
+        resamplers = [BarResampler(rtype) for rtype in self.rtypes]
+        for bar_arrays in self.datafeed._iter_bar_arrays():
+            for new_bar_event_message in bar_arrays.iter_bar_event_messages():
+                if self.include_source_bars:
+                    yield new_bar_event_message
+                for resampler in resamplers:
+                    yield from resampler.update(new_bar_event_message)
+        for resampler in resamplers:
+            yield from resampler.flush()
+
+    def _iter_bar_arrays(self) -> Iterator[BarArrays]:
+        bar_event_messages = self._iter_resampled_bar_event_messages()
+        while block := list(itertools.islice(bar_event_messages, self.blocksize)):
+            yield BarArrays.from_bar_event_messages(block)
+
+    def _iter_bar_event_messages(
+        self,
+    ) -> Iterator[IncomingBarEventMessage | IncomingBarBlockEventMessage]:
+        if self.emit_bar_blocks:
+            yield from super()._iter_bar_event_messages()
+        else:
+            yield from self._iter_resampled_bar_event_messages()
@@ -1,103 +1,157 @@
-from ttools.datafeeds.abc_datafeeds import DatafeedsABC
-import pandas as pd
-from ttools.ontology.event_messages import (
-    GLOBAL_STOP_EVENT,
-    IncomingBarEventMessage,
-    OHLCV,
+from collections.abc import Iterator
+from typing import IO
+import numpy as np
+from ttools.datafeeds.abc_datafeeds import ReplayDatafeedABC
+from ttools.datafeeds.csv_offset_index import (
+    CSV_OFFSET_INDEX_STRIDE,
+    load_or_build_csv_offset_index,
+)
+from ttools.datafeeds.decompressing_reader import (
+    is_compressed_file,
+    open_decompressing_reader,
 )
-from ttools.ontology.enum_defs import Rtype
-from ttools.ontology.global_queues import incoming_bar_event_message_queue
-from ttools.logging_config import logger
-import threading
+import pandas as pd
+from ttools.ontology.bar_arrays import BarArrays
+
+
+CSV_COLUMNS = [
+    "ts_event",
+    "rtype",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "symbol",
+]
+
+CSV_DTYPES = {
+    "ts_event": int,
+    "rtype": int,
+    "open": int,
+    "high": int,
+    "low": int,
+    "close": int,
+    "volume": int,
+    "symbol": str,
+}
+
+
+def _to_ts_event(timestamp: int | str | pd.Timestamp | None) -> int | None:
+    if timestamp is None or isinstance(timestamp, int):
+        return timestamp
+    return pd.Timestamp(timestamp).value
 
 
-class CSVDatafeed(DatafeedsABC):
+class CSVDatafeed(ReplayDatafeedABC):
+    """
+    Replays a DataBento CSV file sorted by ts_event. With `start` and `end`,
+    only the bars with start <= ts_event < end are replayed: the reader jumps
+    close to `start` using the file's sparse offset index (see
+    `load_or_build_csv_offset_index()`), which is built on first use, and stops
+    at the first bar at or after `end`.
 
-    def __init__(self, path_to_csv_file: str):
-        super().__init__()
+    .gz and .zst files are decompressed while they are read, on a separate
+    reader thread (see ThreadedDecompressingReader). They cannot be seeked, so
+    the bars before `start` are parsed and skipped.
+    """
+
+    def __init__(
+        self,
+        path_to_csv_file: str,
+        chunksize: int = 65_536,
+        start: int | str | pd.Timestamp | None = None,
+        end: int | str | pd.Timestamp | None = None,
+        index_stride: int = CSV_OFFSET_INDEX_STRIDE,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
         self.path_to_csv_file = path_to_csv_file
-        self.data_iterator = pd.read_csv(
-            self.path_to_csv_file,
-            usecols=[
-                "ts_event",
-                "rtype",
-                "open",
-                "high",
-                "low",
-                "close",
-                "volume",
-                "symbol",
-            ],
-            dtype={
-                "ts_event": int,
-                "rtype": int,
-                "open": int,
-                "high": int,
-                "low": int,
-                "close": int,
-                "volume": int,
-                "symbol": str,
-            },
-            iterator=True,
-            chunksize=1,
-        )
+        self.chunksize = chunksize
+        self.start = _to_ts_event(start)
+        self.end = _to_ts_event(end)
+        self.index_stride = index_stride
 
-    def _get_next_bar_event_message(self) -> IncomingBarEventMessage | None:
-        if GLOBAL_STOP_EVENT.is_set() or self._instance_stop_event.is_set():
-            return None
+    def _open_data_iterator(self) -> tuple[pd.io.parsers.TextFileReader, IO | None]:
+        """
+        Opens a chunk iterator over the rows of the CSV file, from close to
+        `start` if possible, and returns it along with the file object that
+        must be closed after it, if any.
+        """
+        if self.start is None or is_compressed_file(self.path_to_csv_file):
+            csv_file = (
+                open_decompressing_reader(self.path_to_csv_file)
+                if is_compressed_file(self.path_to_csv_file)
+                else None
+            )
+            read_csv_kwargs = {}
+        else:
+            offset_index = load_or_build_csv_offset_index(
+                self.path_to_csv_file, self.index_stride
+            )
+            csv_file = open(self.path_to_csv_file, "rb")
+            column_names = csv_file.readline().decode().rstrip("\r\n").split(",")
+            csv_file.seek(offset_index.seek_offset(self.start))
+            read_csv_kwargs = {"header": None, "names": column_names}
         try:
-            csv_row = next(self.data_iterator).iloc[0]
-            return IncomingBarEventMessage(
-                symbol=csv_row["symbol"],
-                rtype=Rtype(int(csv_row["rtype"])),
-                ts_event=pd.to_datetime(int(csv_row["ts_event"]), unit="ns"),
-                ohlcv=OHLCV(
-                    csv_row["open"] / 1e9,
-                    csv_row["high"] / 1e9,
-                    csv_row["low"] / 1e9,
-                    csv_row["close"] / 1e9,
-                    int(csv_row["volume"]),
+            return (
+                pd.read_csv(
+                    csv_file or self.path_to_csv_file,
+                    usecols=CSV_COLUMNS,
+                    dtype=CSV_DTYPES,
+                    iterator=True,
+                    chunksize=self.chunksize,
+                    **read_csv_kwargs,
                 ),
+                csv_file,
             )
-        except StopIteration:
-            logger.info("End of CSV replay data reached")
-            return None
-        except Exception as e:
-            logger.error(f"Error reading next bar: {e}", exc_info=False)
-            return None
-
-    def connect(self):
-        self.enqueue_incoming_bar_event_messages_thread = threading.Thread(
-            target=self._enqueue_incoming_bar_event_messages,
-            name="CSVDatafeed",
-        )
-        self.enqueue_incoming_bar_event_messages_thread.start()
+        except BaseException:
+            if csv_file is not None:
+                csv_file.close()
+            raise
 
-    def _enqueue_incoming_bar_event_messages(self):
-        while not (GLOBAL_STOP_EVENT.is_set() or self._instance_stop_event.is_set()):
-            try:
-                incoming_bar_event_message = self._get_next_bar_event_message()
-                if incoming_bar_event_message is None:
-                    break
-                incoming_bar_event_message_queue.put(incoming_bar_event_message)
-                logger.debug(
-                    f"Enqueued "
-                    f"{incoming_bar_event_message} | Queue size: "
-                    f"{incoming_bar_event_message_queue.qsize()}"
+    def _iter_bar_arrays(self) -> Iterator[BarArrays]:
+        """
+        Decodes the CSV file in chunks of `self.chunksize` rows, converting
+        timestamps, prices and rtypes for the whole chunk at once. The file is
+        opened when the iteration starts and closed when it ends, including
+        when it is closed early or fails.
+        """
+        data_iterator, csv_file = self._open_data_iterator()
+        try:
+            for chunk in data_iterator:
+                ts_event = chunk["ts_event"].to_numpy()
+                first = (
+                    0
+                    if self.start is None
+                    else int(np.searchsorted(ts_event, self.start, side="left"))
                 )
-            except Exception as e:
-                logger.error(f"Error enqueuing bar event: {e}", exc_info=False)
-        if GLOBAL_STOP_EVENT.is_set():
-            logger.info(f"GLOBAL_STOP_EVENT detected.")
-            self._instance_stop_event.set()
+                stop = (
+                    len(ts_event)
+                    if self.end is None
+                    else int(np.searchsorted(ts_event, self.end, side="left"))
+                )
+                if first < stop:
+                    chunk = chunk.iloc[first:stop]
+                    yield BarArrays.from_fixed_point(
+                        ts_event=chunk["ts_event"].to_numpy(),
+                        rtype=chunk["rtype"].to_numpy(),
+                        open=chunk["open"].to_numpy(),
+                        high=chunk["high"].to_numpy(),
+                        low=chunk["low"].to_numpy(),
+                        close=chunk["close"].to_numpy(),
+                        volume=chunk["volume"].to_numpy(),
+                        symbol=chunk["symbol"].to_numpy(),
+                    )
+                if stop < len(ts_event):
+                    break
+        finally:
+            data_iterator.close()
+            if csv_file is not None:
+                csv_file.close()
 
-    def disconnect(self):
-        self._instance_stop_event.set()
-        if (
-            self.enqueue_incoming_bar_event_messages_thread
-            and self.enqueue_incoming_bar_event_messages_thread.is_alive()
-        ):
-            thread_name = self.enqueue_incoming_bar_event_messages_thread.name
-            logger.debug(f"Stopping {thread_name}...")
-            self.enqueue_incoming_bar_event_messages_thread.join()
-            logger.debug(f"{thread_name} stopped.")
+    def load_bar_arrays(self) -> BarArrays:
+        """
+        Decodes the rows of the CSV file into a single BarArrays block.
+        """
+        return BarArrays.concatenate(list(self._iter_bar_arrays()))
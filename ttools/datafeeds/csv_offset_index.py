@@ -0,0 +1,136 @@
+import dataclasses
+import json
+import os
+import numpy as np
+from ttools.logging_config import logger
+
+CSV_OFFSET_INDEX_FORMAT_VERSION = 1
+
+# Every CSV_OFFSET_INDEX_STRIDE-th row is indexed, so the index of a file with
+# 100M rows holds about 25k entries and a seek parses at most that many rows
+# before reaching the requested start.
+CSV_OFFSET_INDEX_STRIDE = 4_096
+
+_SCAN_BLOCK_SIZE = 1 << 24
+
+
+def file_fingerprint(path: str) -> dict:
+    """
+    Returns the size and modification time of a file, used to detect whether
+    caches derived from it are stale.
+    """
+    stat_result = os.stat(path)
+    return {"size": stat_result.st_size, "mtime_ns": stat_result.st_mtime_ns}
+
+
+@dataclasses.dataclass(frozen=True)
+class CSVOffsetIndex:
+    """
+    Sparse index of a CSV file sorted by ts_event: the ts_event and byte
+    offset of every `stride`-th row. `data_offset` is the offset of the first
+    row after the header.
+    """
+
+    ts_event: np.ndarray  # int64
+    offset: np.ndarray  # int64
+    stride: int
+    data_offset: int
+
+    def seek_offset(self, ts_event: int) -> int:
+        """
+        Byte offset of a row at or before the first row with a ts_event of at
+        least `ts_event`, at most `stride` rows before it.
+        """
+        position = int(np.searchsorted(self.ts_event, ts_event, side="left")) - 1
+        return int(self.offset[position]) if position >= 0 else self.data_offset
+
+
+def build_csv_offset_index(
+    path_to_csv_file: str, stride: int = CSV_OFFSET_INDEX_STRIDE
+) -> CSVOffsetIndex:
+    """
+    Builds the index by scanning the file for newlines block by block, only
+    parsing the ts_event of the indexed rows.
+    """
+    with open(path_to_csv_file, "rb") as csv_file:
+        header = csv_file.readline()
+        ts_event_column = header.decode().rstrip("\r\n").split(",").index("ts_event")
+        data_offset = len(header)
+        file_size = os.fstat(csv_file.fileno()).st_size
+
+        row_offset_blocks = [np.array([data_offset], dtype=np.int64)]
+        row_count = 1 if file_size > data_offset else 0
+        block_offset = data_offset
+        while block := csv_file.read(_SCAN_BLOCK_SIZE):
+            row_offsets = (
+                block_offset
+                + 1
+                + np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == ord("\n"))
+            )
+            row_offsets = row_offsets[row_offsets < file_size]
+            row_indices = row_count + np.arange(len(row_offsets))
+            row_offset_blocks.append(row_offsets[row_indices % stride == 0])
+            row_count += len(row_offsets)
+            block_offset += len(block)
+        offset = np.concatenate(row_offset_blocks)[: (row_count + stride - 1) // stride]
+
+        ts_event = np.empty(len(offset), dtype=np.int64)
+        for position, row_offset in enumerate(offset.tolist()):
+            csv_file.seek(row_offset)
+            ts_event[position] = int(csv_file.readline().split(b",")[ts_event_column])
+    return CSVOffsetIndex(ts_event, offset, stride, data_offset)
+
+
+def default_csv_offset_index_dir(path_to_csv_file: str) -> str:
+    return f"{path_to_csv_file}.ttindex"
+
+
+def load_or_build_csv_offset_index(
+    path_to_csv_file: str,
+    stride: int = CSV_OFFSET_INDEX_STRIDE,
+    path_to_index_dir: str | None = None,
+) -> CSVOffsetIndex:
+    """
+    Returns the offset index of a CSV file from its sidecar directory, building
+    and saving it first if it is missing or the file has changed.
+    """
+    path_to_index_dir = path_to_index_dir or default_csv_offset_index_dir(
+        path_to_csv_file
+    )
+    path_to_metadata_file = os.path.join(path_to_index_dir, "metadata.json")
+    expected_metadata = {
+        "format_version": CSV_OFFSET_INDEX_FORMAT_VERSION,
+        "source_fingerprint": file_fingerprint(path_to_csv_file),
+        "stride": stride,
+    }
+    try:
+        with open(path_to_metadata_file) as metadata_file:
+            metadata = json.load(metadata_file)
+    except (OSError, ValueError):
+        metadata = None
+    if (
+        metadata is not None
+        and {name: metadata.get(name) for name in expected_metadata}
+        == expected_metadata
+    ):
+        return CSVOffsetIndex(
+            ts_event=np.load(os.path.join(path_to_index_dir, "ts_event.npy")),
+            offset=np.load(os.path.join(path_to_index_dir, "offset.npy")),
+            stride=stride,
+            data_offset=metadata["data_offset"],
+        )
+
+    logger.info(f"Building offset index of {path_to_csv_file} in {path_to_index_dir}")
+    index = build_csv_offset_index(path_to_csv_file, stride)
+    os.makedirs(path_to_index_dir, exist_ok=True)
+    # The metadata file is removed first and written last, so an interrupted
+    # build is never mistaken for a valid index.
+    if os.path.exists(path_to_metadata_file):
+        os.remove(path_to_metadata_file)
+    np.save(os.path.join(path_to_index_dir, "ts_event.npy"), index.ts_event)
+    np.save(os.path.join(path_to_index_dir, "offset.npy"), index.offset)
+    with open(path_to_metadata_file, "w") as metadata_file:
+        json.dump(
+            {**expected_metadata, "data_offset": index.data_offset}, metadata_file
+        )
+    return index
@@ -0,0 +1,330 @@
+import datetime
+import os
+import struct
+from collections.abc import Iterator
+import numpy as np
+from ttools.datafeeds.abc_datafeeds import ReplayDatafeedABC
+from ttools.ontology.enum_defs import Rtype
+from ttools.ontology.bar_arrays import BarArrays, FIXED_POINT_SCALE
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+DBN_VERSION = 2
+DBN_SYMBOL_CSTR_LEN = 71
+DBN_OHLCV_RTYPES = {
+    Rtype.OHLCV_1S.value,
+    Rtype.OHLCV_1M.value,
+    Rtype.OHLCV_1H.value,
+    Rtype.OHLCV_1D.value,
+}
+# DataBento schema ids of the OHLCV schemas, keyed by their rtype.
+DBN_OHLCV_SCHEMAS = {
+    Rtype.OHLCV_1S.value: 5,
+    Rtype.OHLCV_1M.value: 6,
+    Rtype.OHLCV_1H.value: 7,
+    Rtype.OHLCV_1D.value: 8,
+}
+DBN_STYPE_INSTRUMENT_ID = 0
+DBN_STYPE_RAW_SYMBOL = 1
+
+# Record header (16 bytes) followed by the OHLCV body (40 bytes).
+DBN_OHLCV_FIELDS = [
+    ("length", "u1"),
+    ("rtype", "u1"),
+    ("publisher_id", "<u2"),
+    ("instrument_id", "<u4"),
+    ("ts_event", "<u8"),
+    ("open", "<i8"),
+    ("high", "<i8"),
+    ("low", "<i8"),
+    ("close", "<i8"),
+    ("volume", "<u8"),
+]
+DBN_OHLCV_DTYPE = np.dtype(DBN_OHLCV_FIELDS)
+
+
+def _dbn_record_dtype(record_size: int) -> np.dtype:
+    """
+    Returns the OHLCV record dtype padded to `record_size` bytes, which is
+    larger than 56 bytes if the file was written with `ts_out`.
+    """
+    if record_size < DBN_OHLCV_DTYPE.itemsize:
+        raise ValueError(f"Record size {record_size} is too small for OHLCV records.")
+    return np.dtype(
+        {
+            "names": list(DBN_OHLCV_DTYPE.names),
+            "formats": [
+                DBN_OHLCV_DTYPE.fields[name][0] for name in DBN_OHLCV_DTYPE.names
+            ],
+            "offsets": [
+                DBN_OHLCV_DTYPE.fields[name][1] for name in DBN_OHLCV_DTYPE.names
+            ],
+            "itemsize": record_size,
+        }
+    )
+
+
+def _open_dbn_file(path_to_dbn_file: str):
+    if path_to_dbn_file.endswith(".zst"):
+        if zstandard is None:
+            raise ImportError("Reading .dbn.zst files requires the zstandard package.")
+        return zstandard.ZstdDecompressor().stream_reader(open(path_to_dbn_file, "rb"))
+    return open(path_to_dbn_file, "rb")
+
+
+def _read_exact(dbn_file, size: int) -> bytes:
+    buffer = bytearray()
+    while len(buffer) < size:
+        data = dbn_file.read(size - len(buffer))
+        if not data:
+            break
+        buffer += data
+    return bytes(buffer)
+
+
+def _read_dbn_metadata(dbn_file) -> tuple[dict, int]:
+    """
+    Parses the metadata header of a DBN file (versions 1 to 3). Returns the
+    metadata and the byte offset of the first record.
+    """
+    prelude = _read_exact(dbn_file, 8)
+    if len(prelude) < 8 or prelude[:3] != b"DBN":
+        raise ValueError("Not a DBN file.")
+    version = prelude[3]
+    (length,) = struct.unpack_from("<I", prelude, 4)
+    buffer = _read_exact(dbn_file, length)
+
+    dataset = buffer[:16].rstrip(b"\0").decode()
+    schema, start, end, limit = struct.unpack_from("<HQQQ", buffer, 16)
+    offset = 42
+    if version == 1:
+        offset += 8  # record_count
+    stype_in, stype_out, ts_out = struct.unpack_from("<BBB", buffer, offset)
+    offset += 3
+    if version == 1:
+        symbol_cstr_len = 22
+        offset += 47
+    else:
+        (symbol_cstr_len,) = struct.unpack_from("<H", buffer, offset)
+        offset += 2 + 53
+    (schema_definition_length,) = struct.unpack_from("<I", buffer, offset)
+    offset += 4 + schema_definition_length
+
+    def read_cstr() -> str:
+        nonlocal offset
+        value = buffer[offset : offset + symbol_cstr_len].split(b"\0", 1)[0].decode()
+        offset += symbol_cstr_len
+        return value
+
+    def read_u32() -> int:
+        nonlocal offset
+        (value,) = struct.unpack_from("<I", buffer, offset)
+        offset += 4
+        return value
+
+    symbols = [read_cstr() for _ in range(read_u32())]
+    partial = [read_cstr() for _ in range(read_u32())]
+    not_found = [read_cstr() for _ in range(read_u32())]
+    mappings = {}
+    for _ in range(read_u32()):
+        raw_symbol = read_cstr()
+        intervals = []
+        for _ in range(read_u32()):
+            start_date, end_date = read_u32(), read_u32()
+            intervals.append((start_date, end_date, read_cstr()))
+        mappings[raw_symbol] = intervals
+
+    metadata = {
+        "version": version,
+        "dataset": dataset,
+        "schema": schema,
+        "start": start,
+        "end": end,
+        "limit": limit,
+        "stype_in": stype_in,
+        "stype_out": stype_out,
+        "ts_out": bool(ts_out),
+        "symbols": symbols,
+        "partial": partial,
+        "not_found": not_found,
+        "mappings": mappings,
+    }
+    return metadata, 8 + length
+
+
+def _instrument_symbols(metadata: dict) -> dict[int, str]:
+    """
+    Maps instrument ids to raw symbols using the symbology mappings stored in
+    the metadata of files with `stype_out` set to instrument ids.
+    """
+    instrument_symbols = {}
+    if metadata["stype_out"] != DBN_STYPE_INSTRUMENT_ID:
+        return instrument_symbols
+    for raw_symbol, intervals in metadata["mappings"].items():
+        for _, _, instrument_id in intervals:
+            if instrument_id.isdigit():
+                instrument_symbols[int(instrument_id)] = raw_symbol
+    return instrument_symbols
+
+
+class DBNDatafeed(ReplayDatafeedABC):
+    """
+    Replays DataBento OHLCV files in the binary DBN encoding. Records are
+    mapped onto a NumPy structured dtype (via `numpy.memmap` for uncompressed
+    files), so no per-field parsing happens in Python. Files ending in `.zst`
+    are decompressed on the fly and require the `zstandard` package.
+    """
+
+    def __init__(
+        self,
+        path_to_dbn_file: str,
+        blocksize: int = 65_536,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.path_to_dbn_file = path_to_dbn_file
+        self.blocksize = blocksize
+        with _open_dbn_file(path_to_dbn_file) as dbn_file:
+            self.metadata, self._records_offset = _read_dbn_metadata(dbn_file)
+            first_record = _read_exact(dbn_file, 1)
+        self._record_size = 4 * first_record[0] if first_record else 0
+        self._instrument_symbols = _instrument_symbols(self.metadata)
+
+    def _iter_records(self) -> Iterator[np.ndarray]:
+        if not self._record_size:
+            return
+        record_dtype = _dbn_record_dtype(self._record_size)
+        if not self.path_to_dbn_file.endswith(".zst"):
+            record_count = (
+                os.path.getsize(self.path_to_dbn_file) - self._records_offset
+            ) // self._record_size
+            records = np.memmap(
+                self.path_to_dbn_file,
+                dtype=record_dtype,
+                mode="r",
+                offset=self._records_offset,
+                shape=(record_count,),
+            )
+            for start in range(0, record_count, self.blocksize):
+                yield records[start : start + self.blocksize]
+            return
+        with _open_dbn_file(self.path_to_dbn_file) as dbn_file:
+            _read_exact(dbn_file, self._records_offset)
+            while True:
+                buffer = _read_exact(dbn_file, self.blocksize * self._record_size)
+                if len(buffer) < self._record_size:
+                    break
+                yield np.frombuffer(
+                    buffer,
+                    dtype=record_dtype,
+                    count=len(buffer) // self._record_size,
+                )
+
+    def _symbols_for(self, instrument_ids: np.ndarray) -> np.ndarray:
+        unique_ids, inverse = np.unique(instrument_ids, return_inverse=True)
+        unique_symbols = np.array(
+            [
+                self._instrument_symbols.get(instrument_id, str(instrument_id))
+                for instrument_id in unique_ids.tolist()
+            ],
+            dtype=object,
+        )
+        return unique_symbols[inverse]
+
+    def _to_bar_arrays(self, records: np.ndarray) -> BarArrays:
+        if np.any(records["length"] != self._record_size // 4) or not np.all(
+            np.isin(records["rtype"], list(DBN_OHLCV_RTYPES))
+        ):
+            raise ValueError(
+                f"{self.path_to_dbn_file} contains records that are not OHLCV bars."
+            )
+        return BarArrays.from_fixed_point(
+            ts_event=records["ts_event"],
+            rtype=records["rtype"],
+            open=records["open"],
+            high=records["high"],
+            low=records["low"],
+            close=records["close"],
+            volume=records["volume"],
+            symbol=self._symbols_for(records["instrument_id"]),
+        )
+
+    def _iter_bar_arrays(self) -> Iterator[BarArrays]:
+        for records in self._iter_records():
+            yield self._to_bar_arrays(records)
+
+
+def _yyyymmdd(ts_event: int) -> int:
+    date = datetime.datetime.fromtimestamp(
+        ts_event / 1e9, tz=datetime.timezone.utc
+    ).date()
+    return date.year * 10_000 + date.month * 100 + date.day
+
+
+def write_dbn_file(
+    path_to_dbn_file: str,
+    bar_arrays: BarArrays,
+    dataset: str = "GLBX.MDP3",
+    publisher_id: int = 1,
+) -> None:
+    """
+    Writes bars as a version 2 DBN OHLCV file (zstd-compressed if the path ends
+    in `.zst`). Intended for building offline fixtures, not as a full DBN encoder.
+    """
+
+    def cstr(value: str) -> bytes:
+        return value.encode().ljust(DBN_SYMBOL_CSTR_LEN, b"\0")
+
+    unique_symbols, symbol_index = np.unique(
+        bar_arrays.symbol.astype(str), return_inverse=True
+    )
+    instrument_ids = np.arange(1, len(unique_symbols) + 1, dtype=np.uint32)
+    rtypes = np.unique(bar_arrays.rtype).tolist()
+    schema = DBN_OHLCV_SCHEMAS[rtypes[0]] if len(rtypes) == 1 else 0xFFFF
+    start = int(bar_arrays.ts_event[0]) if len(bar_arrays) else 0
+    end = int(bar_arrays.ts_event[-1]) + 1 if len(bar_arrays) else 0
+
+    metadata = bytearray(dataset.encode().ljust(16, b"\0"))
+    metadata += struct.pack("<HQQQ", schema, start, end, 0)
+    metadata += struct.pack(
+        "<BBBH", DBN_STYPE_RAW_SYMBOL, DBN_STYPE_INSTRUMENT_ID, 0, DBN_SYMBOL_CSTR_LEN
+    )
+    metadata += bytes(53)
+    metadata += struct.pack("<I", 0)  # schema_definition_length
+    metadata += struct.pack("<I", len(unique_symbols))
+    metadata += b"".join(cstr(symbol) for symbol in unique_symbols)
+    metadata += struct.pack("<II", 0, 0)  # partial, not_found
+    metadata += struct.pack("<I", len(unique_symbols))
+    for symbol, instrument_id in zip(unique_symbols, instrument_ids.tolist()):
+        metadata += cstr(symbol) + struct.pack("<I", 1)
+        metadata += struct.pack("<II", _yyyymmdd(start), _yyyymmdd(end) + 1)
+        metadata += cstr(str(instrument_id))
+    metadata += bytes(-len(metadata) % 8)  # keep the records 8-byte aligned
+
+    records = np.zeros(len(bar_arrays), dtype=DBN_OHLCV_DTYPE)
+    records["length"] = DBN_OHLCV_DTYPE.itemsize // 4
+    records["rtype"] = bar_arrays.rtype
+    records["publisher_id"] = publisher_id
+    records["instrument_id"] = instrument_ids[symbol_index]
+    records["ts_event"] = bar_arrays.ts_event
+    for column in ("open", "high", "low", "close"):
+        records[column] = np.rint(getattr(bar_arrays, column) * FIXED_POINT_SCALE)
+    records["volume"] = bar_arrays.volume
+
+    content = (
+        b"DBN"
+        + bytes([DBN_VERSION])
+        + struct.pack("<I", len(metadata))
+        + bytes(metadata)
+        + records.tobytes()
+    )
+    if path_to_dbn_file.endswith(".zst"):
+        if zstandard is None:
+            raise ImportError("Writing .dbn.zst files requires the zstandard package.")
+        content = zstandard.ZstdCompressor().compress(content)
+    with open(path_to_dbn_file, "wb") as dbn_file:
+        dbn_file.write(content)
@@ -0,0 +1,110 @@
+import gzip
+import io
+import queue
+import threading
+from ttools.logging_config import logger
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+COMPRESSED_FILE_SUFFIXES = (".gz", ".zst")
+
+
+def is_compressed_file(path: str) -> bool:
+    return path.endswith(COMPRESSED_FILE_SUFFIXES)
+
+
+def _open_decompressed(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise ImportError("Reading .zst files requires the zstandard package.")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"))
+    raise ValueError(f"Unsupported compressed file {path}.")
+
+
+class ThreadedDecompressingReader(io.RawIOBase):
+    """
+    Raw file object over the decompressed content of a .gz or .zst file. The
+    file is decompressed on a reader thread into a queue of at most
+    `max_blocks` blocks of `block_size` bytes, so decompression overlaps with
+    the consumer, e.g. the CSV parser, while memory use stays bounded. zlib
+    and zstandard release the GIL while decompressing.
+    """
+
+    def __init__(self, path: str, block_size: int = 1 << 20, max_blocks: int = 8):
+        super().__init__()
+        self.path = path
+        self.block_size = block_size
+        self._blocks: queue.Queue[bytes | Exception] = queue.Queue(maxsize=max_blocks)
+        self._block = memoryview(b"")
+        self._at_eof = False
+        self._closing = threading.Event()
+        self._reader_thread = threading.Thread(
+            target=self._decompress, name=f"Decompress({path})", daemon=True
+        )
+        self._reader_thread.start()
+
+    def _put(self, item: bytes | Exception) -> bool:
+        while not self._closing.is_set():
+            try:
+                self._blocks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _decompress(self) -> None:
+        try:
+            with _open_decompressed(self.path) as decompressed_file:
+                while block := decompressed_file.read(self.block_size):
+                    if not self._put(block):
+                        return
+        except Exception as e:
+            logger.error(f"Error decompressing {self.path}: {e}", exc_info=False)
+            self._put(e)
+            return
+        self._put(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if not self._block:
+            if self._at_eof:
+                return 0
+            block = self._blocks.get()
+            if isinstance(block, Exception):
+                self._at_eof = True
+                raise block
+            if not block:
+                self._at_eof = True
+                return 0
+            self._block = memoryview(block)
+        size = min(len(buffer), len(self._block))
+        buffer[:size] = self._block[:size]
+        self._block = self._block[size:]
+        return size
+
+    def close(self) -> None:
+        if not self.closed:
+            self._closing.set()
+            self._reader_thread.join()
+        super().close()
+
+
+def open_decompressing_reader(
+    path: str, block_size: int = 1 << 20, max_blocks: int = 8
+) -> io.BufferedReader:
+    """
+    Opens a .gz or .zst file for reading its decompressed content, which is
+    produced by a ThreadedDecompressingReader.
+    """
+    return io.BufferedReader(
+        ThreadedDecompressingReader(path, block_size, max_blocks),
+        buffer_size=block_size,
+    )
@@ -0,0 +1,166 @@
+import json
+import os
+import shutil
+from collections.abc import Iterator
+import numpy as np
+import pandas as pd
+from ttools.datafeeds.abc_datafeeds import ReplayDatafeedABC
+from ttools.datafeeds.csv_datafeed import CSV_COLUMNS, CSV_DTYPES
+from ttools.datafeeds.csv_offset_index import file_fingerprint
+from ttools.ontology.bar_arrays import BarArrays
+from ttools.logging_config import logger
+
+
+BAR_CACHE_FORMAT_VERSION = 1
+
+# Column files of a bar cache. Prices are kept as DataBento fixed-point int64.
+BAR_CACHE_COLUMN_DTYPES = {
+    "ts_event": np.int64,
+    "rtype": np.uint8,
+    "open": np.int64,
+    "high": np.int64,
+    "low": np.int64,
+    "close": np.int64,
+    "volume": np.int64,
+    "symbol_id": np.int32,
+}
+
+
+def default_bar_cache_dir(path_to_csv_file: str) -> str:
+    return f"{path_to_csv_file}.ttcache"
+
+
+def _read_bar_cache_metadata(path_to_cache_dir: str) -> dict | None:
+    try:
+        with open(os.path.join(path_to_cache_dir, "metadata.json")) as metadata_file:
+            return json.load(metadata_file)
+    except (OSError, ValueError):
+        return None
+
+
+def is_bar_cache_valid(path_to_csv_file: str, path_to_cache_dir: str) -> bool:
+    metadata = _read_bar_cache_metadata(path_to_cache_dir)
+    return (
+        metadata is not None
+        and metadata.get("format_version") == BAR_CACHE_FORMAT_VERSION
+        and metadata.get("source_fingerprint") == file_fingerprint(path_to_csv_file)
+    )
+
+
+def build_bar_cache(
+    path_to_csv_file: str,
+    path_to_cache_dir: str | None = None,
+    chunksize: int = 1_000_000,
+    force: bool = False,
+) -> str:
+    """
+    Converts a DataBento OHLCV CSV file into a directory of columnar binary
+    files that can be replayed via `numpy.memmap`. The conversion is skipped if
+    an up-to-date cache already exists. Returns the path of the cache directory.
+    """
+    path_to_cache_dir = path_to_cache_dir or default_bar_cache_dir(path_to_csv_file)
+    if not force and is_bar_cache_valid(path_to_csv_file, path_to_cache_dir):
+        return path_to_cache_dir
+
+    logger.info(f"Building bar cache {path_to_cache_dir} from {path_to_csv_file}")
+    source_fingerprint = file_fingerprint(path_to_csv_file)
+    path_to_tmp_dir = f"{path_to_cache_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(path_to_tmp_dir, ignore_errors=True)
+    os.makedirs(path_to_tmp_dir)
+
+    symbol_ids: dict[str, int] = {}
+    row_count = 0
+    column_files = {
+        column: open(os.path.join(path_to_tmp_dir, f"{column}.bin"), "wb")
+        for column in BAR_CACHE_COLUMN_DTYPES
+    }
+    try:
+        for chunk in pd.read_csv(
+            path_to_csv_file,
+            usecols=CSV_COLUMNS,
+            dtype=CSV_DTYPES,
+            chunksize=chunksize,
+        ):
+            codes, uniques = pd.factorize(chunk["symbol"])
+            chunk_symbol_ids = np.array(
+                [symbol_ids.setdefault(symbol, len(symbol_ids)) for symbol in uniques],
+                dtype=np.int32,
+            )
+            columns = {column: chunk[column].to_numpy() for column in CSV_COLUMNS}
+            columns["symbol_id"] = chunk_symbol_ids[codes]
+            for column, dtype in BAR_CACHE_COLUMN_DTYPES.items():
+                columns[column].astype(dtype, copy=False).tofile(column_files[column])
+            row_count += len(chunk)
+    finally:
+        for column_file in column_files.values():
+            column_file.close()
+
+    with open(os.path.join(path_to_tmp_dir, "metadata.json"), "w") as metadata_file:
+        json.dump(
+            {
+                "format_version": BAR_CACHE_FORMAT_VERSION,
+                "source_fingerprint": source_fingerprint,
+                "row_count": row_count,
+                "symbols": list(symbol_ids),
+            },
+            metadata_file,
+        )
+    shutil.rmtree(path_to_cache_dir, ignore_errors=True)
+    os.rename(path_to_tmp_dir, path_to_cache_dir)
+    return path_to_cache_dir
+
+
+class MemmapDatafeed(ReplayDatafeedABC):
+    """
+    Replays a bar cache built by `build_bar_cache()` through `numpy.memmap`,
+    so only the pages of the columns actually touched are read from disk. The
+    cache is (re)built automatically if it is missing or its source changed.
+    """
+
+    def __init__(
+        self,
+        path_to_csv_file: str,
+        path_to_cache_dir: str | None = None,
+        blocksize: int = 65_536,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.path_to_csv_file = path_to_csv_file
+        self.path_to_cache_dir = build_bar_cache(path_to_csv_file, path_to_cache_dir)
+        self.blocksize = blocksize
+
+        metadata = _read_bar_cache_metadata(self.path_to_cache_dir)
+        self.row_count: int = metadata["row_count"]
+        self.symbols = np.array(metadata["symbols"], dtype=object)
+        self.columns: dict[str, np.ndarray] = {
+            column: (
+                np.memmap(
+                    os.path.join(self.path_to_cache_dir, f"{column}.bin"),
+                    dtype=dtype,
+                    mode="r",
+                    shape=(self.row_count,),
+                )
+                if self.row_count
+                else np.empty(0, dtype=dtype)
+            )
+            for column, dtype in BAR_CACHE_COLUMN_DTYPES.items()
+        }
+
+    def load_bar_arrays(self, start: int = 0, stop: int | None = None) -> BarArrays:
+        columns = {
+            column: values[start:stop] for column, values in self.columns.items()
+        }
+        return BarArrays.from_fixed_point(
+            ts_event=columns["ts_event"],
+            rtype=columns["rtype"],
+            open=columns["open"],
+            high=columns["high"],
+            low=columns["low"],
+            close=columns["close"],
+            volume=columns["volume"],
+            symbol=self.symbols[columns["symbol_id"]],
+        )
+
+    def _iter_bar_arrays(self) -> Iterator[BarArrays]:
+        for start in range(0, self.row_count, self.blocksize):
+            yield self.load_bar_arrays(start, start + self.blocksize)
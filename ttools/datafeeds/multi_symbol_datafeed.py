@@ -0,0 +1,79 @@
+import heapq
+import itertools
+import operator
+from collections.abc import Iterator
+from ttools.datafeeds.abc_datafeeds import ReplayDatafeedABC
+from ttools.datafeeds.csv_datafeed import CSVDatafeed
+from ttools.ontology.bar_arrays import BarArrays
+from ttools.ontology.event_messages import (
+    IncomingBarEventMessage,
+    IncomingBarBlockEventMessage,
+)
+
+
+class MultiSymbolDatafeed(ReplayDatafeedABC):
+    """
+    Replays several datafeeds, e.g. one per futures contract, as a single
+    stream in ts_event order. The sources are combined with a heap-based k-way
+    merge, so only the current block of each source is held in memory. Each
+    source must itself be sorted by ts_event; bars with the same ts_event are
+    emitted in the order of `datafeeds`.
+
+    The sources are only read from; their own queues and threads are unused.
+    """
+
+    def __init__(
+        self,
+        datafeeds: list[ReplayDatafeedABC],
+        blocksize: int = 4_096,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.datafeeds = datafeeds
+        self.blocksize = blocksize
+
+    @classmethod
+    def from_csv_files(
+        cls,
+        paths_to_csv_files: list[str],
+        chunksize: int = 4_096,
+        **kwargs,
+    ) -> "MultiSymbolDatafeed":
+        """
+        Creates a datafeed that merges one CSVDatafeed per file, each of which
+        reads its file in chunks of `chunksize` rows.
+        """
+        return cls(
+            [
+                CSVDatafeed(path_to_csv_file, chunksize=chunksize)
+                for path_to_csv_file in paths_to_csv_files
+            ],
+            blocksize=chunksize,
+            **kwargs,
+        )
+
+    def _iter_merged_bar_event_messages(self) -> Iterator[IncomingBarEventMessage]:
+        sources = [
+            itertools.chain.from_iterable(
+                bar_arrays.iter_bar_event_messages()
+                for bar_arrays in datafeed._iter_bar_arrays()
+            )
+            for datafeed in self.datafeeds
+        ]
+        return heapq.merge(*sources, key=operator.attrgetter("ts_event"))
+
+    def _iter_bar_arrays(self) -> Iterator[BarArrays]:
+        """
+        Yields the merged stream in blocks of up to `self.blocksize` bars.
+        """
+        bar_event_messages = self._iter_merged_bar_event_messages()
+        while block := list(itertools.islice(bar_event_messages, self.blocksize)):
+            yield BarArrays.from_bar_event_messages(block)
+
+    def _iter_bar_event_messages(
+        self,
+    ) -> Iterator[IncomingBarEventMessage | IncomingBarBlockEventMessage]:
+        if self.emit_bar_blocks:
+            yield from super()._iter_bar_event_messages()
+        else:
+            yield from self._iter_merged_bar_event_messages()
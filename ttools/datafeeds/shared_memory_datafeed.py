@@ -0,0 +1,253 @@
+import functools
+import logging
+import multiprocessing
+import multiprocessing.shared_memory
+from collections.abc import Callable, Iterator
+import numpy as np
+from ttools.datafeeds.abc_datafeeds import ReplayDatafeedABC
+from ttools.datafeeds.csv_datafeed import CSVDatafeed
+from ttools.ontology.bar_arrays import BarArrays
+from ttools.logging_config import logger
+
+# Symbols are stored as fixed-width bytes in the ring buffer.
+RING_BUFFER_SYMBOL_DTYPE = np.dtype("S32")
+RING_BUFFER_COLUMN_DTYPES = {
+    "ts_event": np.dtype(np.int64),
+    "rtype": np.dtype(np.uint8),
+    "open": np.dtype(np.float64),
+    "high": np.dtype(np.float64),
+    "low": np.dtype(np.float64),
+    "close": np.dtype(np.float64),
+    "volume": np.dtype(np.int64),
+    "symbol": RING_BUFFER_SYMBOL_DTYPE,
+}
+
+# Slots of the int64 header that precedes the columns.
+_WRITE_INDEX, _READ_INDEX, _PRODUCER_STATE, _CONSUMER_STOPPED = range(4)
+_HEADER_SIZE = 8 * 8
+_PRODUCER_RUNNING, _PRODUCER_FINISHED, _PRODUCER_FAILED = range(3)
+_WAIT_TIMEOUT = 0.1
+
+
+class _SharedBarRingBuffer:
+    """
+    Single-producer single-consumer ring buffer of bars in a SharedMemory
+    block: an int64 header with the monotonically increasing write and read
+    indices, followed by one array of `capacity` slots per BarArrays column.
+    Only the producer advances the write index and only the consumer the read
+    index, each after it has finished with the slots. The indices and the
+    producer state are updated and checked while holding `condition`, which
+    also wakes up the other side, so the consumer never sees the end of the
+    stream before the last write.
+    """
+
+    def __init__(
+        self,
+        shared_memory: multiprocessing.shared_memory.SharedMemory,
+        capacity: int,
+        condition,
+    ):
+        self.shared_memory = shared_memory
+        self.capacity = capacity
+        self.condition = condition
+        self.header = np.ndarray(8, dtype=np.int64, buffer=shared_memory.buf)
+        self.columns: dict[str, np.ndarray] = {}
+        offset = _HEADER_SIZE
+        for column, dtype in RING_BUFFER_COLUMN_DTYPES.items():
+            self.columns[column] = np.ndarray(
+                capacity, dtype=dtype, buffer=shared_memory.buf, offset=offset
+            )
+            offset += -(-capacity * dtype.itemsize // 8) * 8
+
+    @staticmethod
+    def size(capacity: int) -> int:
+        return _HEADER_SIZE + sum(
+            -(-capacity * dtype.itemsize // 8) * 8
+            for dtype in RING_BUFFER_COLUMN_DTYPES.values()
+        )
+
+    def release(self) -> None:
+        # The views must be gone before the SharedMemory can be closed.
+        self.header = None
+        self.columns = {}
+        self.shared_memory.close()
+
+    def _set_header(self, slot: int, value: int) -> None:
+        with self.condition:
+            self.header[slot] = value
+            self.condition.notify_all()
+
+    def write(self, bars: BarArrays) -> bool:
+        """
+        Copies the bars into the buffer, waiting for free slots whenever it is
+        full. Returns False if the consumer stopped meanwhile.
+        """
+        symbols = bars.symbol.astype(str)
+        if symbols.dtype.itemsize // 4 > RING_BUFFER_SYMBOL_DTYPE.itemsize:
+            raise ValueError(
+                f"Symbols longer than {RING_BUFFER_SYMBOL_DTYPE.itemsize} "
+                f"characters do not fit into the ring buffer."
+            )
+        symbols = symbols.astype(RING_BUFFER_SYMBOL_DTYPE)
+        written = 0
+        while written < len(bars):
+            write_index = int(self.header[_WRITE_INDEX])
+            with self.condition:
+                while (
+                    free := self.capacity - write_index + int(self.header[_READ_INDEX])
+                ) == 0:
+                    if self.header[_CONSUMER_STOPPED]:
+                        return False
+                    self.condition.wait(_WAIT_TIMEOUT)
+            start = write_index % self.capacity
+            count = min(len(bars) - written, free, self.capacity - start)
+            for column, values in self.columns.items():
+                source = symbols if column == "symbol" else getattr(bars, column)
+                values[start : start + count] = source[written : written + count]
+            written += count
+            self._set_header(_WRITE_INDEX, write_index + count)
+        return not self.header[_CONSUMER_STOPPED]
+
+    def read(self, max_count: int, should_stop: Callable[[], bool]) -> BarArrays | None:
+        """
+        Returns a copy of up to `max_count` of the oldest unread bars, waiting
+        for the producer if there are none. Returns None at the end of the
+        stream or once `should_stop()` is true.
+        """
+        read_index = int(self.header[_READ_INDEX])
+        with self.condition:
+            while (available := int(self.header[_WRITE_INDEX]) - read_index) == 0:
+                if self.header[_PRODUCER_STATE] != _PRODUCER_RUNNING or should_stop():
+                    return None
+                self.condition.wait(_WAIT_TIMEOUT)
+        start = read_index % self.capacity
+        count = min(available, max_count, self.capacity - start)
+        columns = {
+            column: values[start : start + count].copy()
+            for column, values in self.columns.items()
+        }
+        self._set_header(_READ_INDEX, read_index + count)
+        columns["symbol"] = columns["symbol"].astype(str).astype(object)
+        return BarArrays(**columns)
+
+
+def _produce_into_ring_buffer(
+    shared_memory_name: str,
+    capacity: int,
+    condition,
+    source_factory: Callable[[], ReplayDatafeedABC],
+    log_level: int,
+) -> None:
+    """
+    Entry point of the producer process: decodes the bars of the datafeed
+    returned by `source_factory()` into the ring buffer.
+    """
+    logging.getLogger().setLevel(log_level)
+    # The block is owned, and eventually unlinked, by the consumer.
+    ring_buffer = _SharedBarRingBuffer(
+        multiprocessing.shared_memory.SharedMemory(
+            name=shared_memory_name, track=False
+        ),
+        capacity,
+        condition,
+    )
+    producer_state = _PRODUCER_FINISHED
+    try:
+        for bar_arrays in source_factory()._iter_bar_arrays():
+            if not ring_buffer.write(bar_arrays):
+                break
+    except Exception as e:
+        logger.error(f"Error decoding bars into the ring buffer: {e}", exc_info=False)
+        producer_state = _PRODUCER_FAILED
+    ring_buffer._set_header(_PRODUCER_STATE, producer_state)
+    ring_buffer.release()
+
+
+class SharedMemoryDatafeed(ReplayDatafeedABC):
+    """
+    Replays the bars of another datafeed that decodes them in a separate
+    process, so decoding does not compete with the strategy for the GIL. The
+    producer process writes the bars into a shared-memory ring buffer of
+    `capacity` bars (see _SharedBarRingBuffer), from which they are read in
+    blocks of up to `blocksize` bars without pickling or per-bar messages.
+    The producer waits while the buffer is full.
+
+    `source_factory` creates the source datafeed in the producer process, so
+    it must be picklable, e.g. a functools.partial of a datafeed class. The
+    producer process is started when the replay starts.
+    """
+
+    def __init__(
+        self,
+        source_factory: Callable[[], ReplayDatafeedABC],
+        capacity: int = 1 << 18,
+        blocksize: int = 4_096,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.source_factory = source_factory
+        self.capacity = capacity
+        self.blocksize = blocksize
+        self.producer_process: multiprocessing.process.BaseProcess | None = None
+
+    @classmethod
+    def from_csv_file(
+        cls, path_to_csv_file: str, chunksize: int = 65_536, **kwargs
+    ) -> "SharedMemoryDatafeed":
+        return cls(
+            functools.partial(CSVDatafeed, path_to_csv_file, chunksize=chunksize),
+            **kwargs,
+        )
+
+    def _should_stop(self) -> bool:
+        # A producer that exits normally reports the end of the stream first,
+        # so a dead producer here has crashed; _iter_bar_arrays() reports it.
+        return (
+            self._stop_event.is_set()
+            or self._instance_stop_event.is_set()
+            or not self.producer_process.is_alive()
+        )
+
+    def _iter_bar_arrays(self) -> Iterator[BarArrays]:
+        mp_context = multiprocessing.get_context("spawn")
+        shared_memory = multiprocessing.shared_memory.SharedMemory(
+            create=True, size=_SharedBarRingBuffer.size(self.capacity)
+        )
+        ring_buffer = _SharedBarRingBuffer(
+            shared_memory, self.capacity, mp_context.Condition()
+        )
+        ring_buffer.header[:] = 0
+        self.producer_process = mp_context.Process(
+            target=_produce_into_ring_buffer,
+            args=(
+                shared_memory.name,
+                self.capacity,
+                ring_buffer.condition,
+                self.source_factory,
+                logging.getLogger().level,
+            ),
+            name=f"{type(self).__name__}Producer",
+            daemon=True,
+        )
+        self.producer_process.start()
+        try:
+            while (
+                bar_arrays := ring_buffer.read(self.blocksize, self._should_stop)
+            ) is not None:
+                yield bar_arrays
+            producer_state = ring_buffer.header[_PRODUCER_STATE]
+            if producer_state == _PRODUCER_FAILED:
+                logger.error("The datafeed producer process failed.")
+            elif producer_state == _PRODUCER_RUNNING and not (
+                self._stop_event.is_set() or self._instance_stop_event.is_set()
+            ):
+                logger.error(
+                    f"The datafeed producer process exited with code "
+                    f"{self.producer_process.exitcode} before the end of the "
+                    f"stream."
+                )
+        finally:
+            ring_buffer._set_header(_CONSUMER_STOPPED, 1)
+            self.producer_process.join()
+            ring_buffer.release()
+            shared_memory.unlink()
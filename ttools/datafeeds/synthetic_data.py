@@ -0,0 +1,139 @@
+from collections.abc import Iterator
+import numpy as np
+import pandas as pd
+from ttools.ontology.bar_arrays import BarArrays, FIXED_POINT_SCALE
+from ttools.ontology.enum_defs import Rtype
+
+SYNTHETIC_CSV_COLUMNS = [
+    "ts_event",
+    "rtype",
+    "publisher_id",
+    "instrument_id",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "symbol",
+]
+
+# Every chunk is drawn from its own generator seeded with (seed, chunk index),
+# so the bars do not depend on how the caller consumes them.
+_SYNTHETIC_CHUNK_SIZE = 1 << 20
+
+
+def _iter_synthetic_fixed_point_chunks(
+    bar_count: int,
+    seed: int,
+    start_ts_event: int,
+    initial_price: float,
+    tick_size: float,
+    volatility_ticks: float,
+    mean_volume: float,
+    gap_probability: float,
+) -> Iterator[dict[str, np.ndarray]]:
+    tick = round(tick_size * FIXED_POINT_SCALE)
+    last_close_ticks = round(initial_price / tick_size)
+    last_ts_event = start_ts_event - 10**9
+    for chunk_index, chunk_start in enumerate(
+        range(0, bar_count, _SYNTHETIC_CHUNK_SIZE)
+    ):
+        rng = np.random.default_rng([seed, chunk_index])
+        count = min(_SYNTHETIC_CHUNK_SIZE, bar_count - chunk_start)
+
+        # Seconds without trades produce no bar, as in DataBento OHLCV_1S data.
+        ts_event = last_ts_event + 10**9 * np.cumsum(
+            rng.geometric(1 - gap_probability, count), dtype=np.int64
+        )
+        close_ticks = last_close_ticks + np.cumsum(
+            np.rint(rng.normal(0.0, volatility_ticks, count)).astype(np.int64)
+        )
+        open_ticks = np.empty_like(close_ticks)
+        open_ticks[0] = last_close_ticks
+        open_ticks[1:] = close_ticks[:-1]
+        high_ticks = np.maximum(open_ticks, close_ticks) + rng.geometric(0.6, count) - 1
+        low_ticks = np.minimum(open_ticks, close_ticks) - rng.geometric(0.6, count) + 1
+
+        yield {
+            "ts_event": ts_event,
+            "open": open_ticks * tick,
+            "high": high_ticks * tick,
+            "low": low_ticks * tick,
+            "close": close_ticks * tick,
+            "volume": rng.poisson(mean_volume, count) + 1,
+        }
+        last_ts_event = int(ts_event[-1])
+        last_close_ticks = int(close_ticks[-1])
+
+
+def iter_synthetic_bar_arrays(
+    bar_count: int,
+    symbol: str = "ESM4",
+    seed: int = 0,
+    start_ts_event: int = 1_700_000_000 * 10**9,
+    initial_price: float = 5000.0,
+    tick_size: float = 0.25,
+    volatility_ticks: float = 1.0,
+    mean_volume: float = 20.0,
+    gap_probability: float = 0.05,
+) -> Iterator[BarArrays]:
+    """
+    Yields `bar_count` synthetic OHLCV_1S bars of a random walk on a tick grid
+    in blocks. The same arguments always produce the same bars.
+    """
+    for chunk in _iter_synthetic_fixed_point_chunks(
+        bar_count,
+        seed,
+        start_ts_event,
+        initial_price,
+        tick_size,
+        volatility_ticks,
+        mean_volume,
+        gap_probability,
+    ):
+        yield BarArrays.from_fixed_point(
+            rtype=np.full(len(chunk["ts_event"]), Rtype.OHLCV_1S.value),
+            symbol=np.full(len(chunk["ts_event"]), symbol, dtype=object),
+            **chunk,
+        )
+
+
+def write_synthetic_databento_csv(
+    path_to_csv_file: str,
+    bar_count: int,
+    symbol: str = "ESM4",
+    seed: int = 0,
+    instrument_id: int = 42,
+    publisher_id: int = 1,
+    **kwargs,
+) -> str:
+    """
+    Writes the bars of `iter_synthetic_bar_arrays()` to a CSV file in the
+    DataBento format read by CSVDatafeed, with fixed-point prices.
+    """
+    for block_index, bar_arrays in enumerate(
+        iter_synthetic_bar_arrays(bar_count, symbol, seed, **kwargs)
+    ):
+        pd.DataFrame(
+            {
+                "ts_event": bar_arrays.ts_event,
+                "rtype": bar_arrays.rtype,
+                "publisher_id": publisher_id,
+                "instrument_id": instrument_id,
+                **{
+                    column: np.rint(
+                        getattr(bar_arrays, column) * FIXED_POINT_SCALE
+                    ).astype(np.int64)
+                    for column in ("open", "high", "low", "close")
+                },
+                "volume": bar_arrays.volume,
+                "symbol": bar_arrays.symbol,
+            },
+            columns=SYNTHETIC_CSV_COLUMNS,
+        ).to_csv(
+            path_to_csv_file,
+            mode="w" if block_index == 0 else "a",
+            header=block_index == 0,
+            index=False,
+        )
+    return path_to_csv_file
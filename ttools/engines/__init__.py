@@ -0,0 +1,3 @@
+from .vectorized_engine import *
+from .parameter_sweep import *
+from .asyncio_engine import *
@@ -0,0 +1,117 @@
+import asyncio
+import itertools
+from ttools.datafeeds.abc_datafeeds import ReplayDatafeedABC
+from ttools.ontology.batching_queue import END_OF_STREAM
+from ttools.ontology.event_messages import (
+    IncomingBarEventMessage,
+    IncomingBarBlockEventMessage,
+)
+from ttools.strategies.abc_strategies import StrategiesABC
+from ttools.logging_config import logger
+from ttools.pipeline_metrics import pipeline_metrics
+
+
+class AsyncioEngine:
+    """
+    Runs pairs of replay datafeeds and strategies as tasks on one asyncio event
+    loop instead of two threads per pair. Each datafeed is a producer task and
+    each strategy a consumer task, connected by an asyncio.Queue that moves
+    messages in micro-batches of up to `batch_size` messages, like a
+    BatchingQueue, and holds at most `max_batches` batches. A producer runs
+    until its queue is full and then hands over to the consumer, so the loop
+    switches tasks once per `max_batches` batches rather than per bar. Tasks
+    only yield at queue operations, so decoding a datafeed chunk (see the
+    datafeeds' `chunksize`) holds up all other pairs meanwhile. The datafeeds'
+    and strategies' own incoming queues, threads and stop events are unused,
+    and bars are processed with StrategiesABC._process_bar() as on the
+    strategy thread.
+
+    The run is stopped by cancelling it (see stop()), which cancels all tasks.
+    The strategies' output queues are flushed in any case. They are put to
+    from the event loop, so they must not block, e.g. unbounded queues or
+    queues drained by a TTAnalyticaWriter thread.
+    """
+
+    def __init__(self, batch_size: int = 256, max_batches: int = 64):
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.pairs: list[tuple[ReplayDatafeedABC, StrategiesABC]] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._run_task: asyncio.Task | None = None
+
+    def add(self, datafeed: ReplayDatafeedABC, strategy: StrategiesABC) -> None:
+        self.pairs.append((datafeed, strategy))
+
+    async def _produce(self, datafeed: ReplayDatafeedABC, queue: asyncio.Queue) -> None:
+        incoming_bar_event_messages = datafeed._iter_bar_event_messages()
+        try:
+            while batch := list(
+                itertools.islice(incoming_bar_event_messages, self.batch_size)
+            ):
+                await queue.put(batch)
+            logger.info(f"End of {type(datafeed).__name__} replay data reached")
+        except Exception as e:
+            logger.error(f"Error reading next bar: {e}", exc_info=False)
+        await queue.put([END_OF_STREAM])
+
+    @staticmethod
+    async def _consume(strategy: StrategiesABC, queue: asyncio.Queue) -> None:
+        try:
+            while True:
+                for new_bar_event_message in await queue.get():
+                    if new_bar_event_message is END_OF_STREAM:
+                        return
+                    try:
+                        if isinstance(new_bar_event_message, IncomingBarEventMessage):
+                            strategy._process_bar(new_bar_event_message)
+                        elif isinstance(
+                            new_bar_event_message, IncomingBarBlockEventMessage
+                        ):
+                            strategy._process_bar_block(new_bar_event_message)
+                        else:
+                            logger.error(
+                                "Received non-bar event message from the queue."
+                            )
+                    except Exception as e:
+                        logger.error(f"Error processing bar event message: {e}")
+        finally:
+            strategy.process_bar_event_message_queue.flush()
+            strategy.trade_event_message_queue.flush()
+
+    async def run_async(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._run_task = asyncio.current_task()
+        logger.info(f"Running {len(self.pairs)} datafeed/strategy pairs")
+        if pipeline_metrics.enabled:
+            pipeline_metrics.start()
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                for datafeed, strategy in self.pairs:
+                    queue = asyncio.Queue(maxsize=self.max_batches)
+                    task_group.create_task(self._produce(datafeed, queue))
+                    task_group.create_task(self._consume(strategy, queue))
+        except asyncio.CancelledError:
+            logger.info("AsyncioEngine run cancelled.")
+            raise
+        finally:
+            self._run_task = None
+            if pipeline_metrics.enabled:
+                pipeline_metrics.stop()
+                pipeline_metrics.log_summary()
+
+    def run(self) -> None:
+        """
+        Runs all pairs to the end of their data on a new event loop.
+        """
+        try:
+            asyncio.run(self.run_async())
+        except asyncio.CancelledError:
+            pass
+
+    def stop(self) -> None:
+        """
+        Cancels a running run(). Can be called from any thread.
+        """
+        run_task = self._run_task
+        if run_task is not None:
+            self._loop.call_soon_threadsafe(run_task.cancel)
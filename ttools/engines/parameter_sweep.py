@@ -0,0 +1,163 @@
+import concurrent.futures
+import dataclasses
+import itertools
+import logging
+import multiprocessing
+import threading
+import time
+import pandas as pd
+from ttools.datafeeds.memmap_datafeed import MemmapDatafeed, build_bar_cache
+from ttools.ontology.batching_queue import BatchingQueue, DiscardingQueue
+from ttools.ontology.enum_defs import TradeDirection
+from ttools.strategies.abc_strategies import StrategiesABC
+from ttools.logging_config import logger
+
+
+@dataclasses.dataclass(frozen=True)
+class ParameterSweepResults:
+    trades: pd.DataFrame  # one row per trade, tagged with run_id and parameters
+    metrics: pd.DataFrame  # one row per run
+
+
+def _initialize_sweep_worker(log_level: int) -> None:
+    logging.getLogger().setLevel(log_level)
+
+
+def _run_sweep_task(
+    run_id: int,
+    strategy_class: type[StrategiesABC],
+    parameters: dict,
+    path_to_csv_file: str,
+    path_to_cache_dir: str,
+) -> tuple[list[dict], dict]:
+    """
+    Replays the shared bar cache through one strategy instance in the calling
+    process, on a datafeed thread and a strategy thread as in a live run.
+    Every run has its own queues and stop event, so runs do not interfere.
+    """
+    # Each message is a whole block of bars (see MemmapDatafeed.blocksize).
+    incoming_bar_event_message_queue = BatchingQueue(batch_size=1, max_batches=2)
+    trade_event_message_queue = BatchingQueue(batch_size=256)
+    stop_event = threading.Event()
+    datafeed = MemmapDatafeed(
+        path_to_csv_file,
+        path_to_cache_dir,
+        emit_bar_blocks=True,
+        incoming_bar_event_message_queue=incoming_bar_event_message_queue,
+        stop_event=stop_event,
+    )
+    strategy = strategy_class(
+        incoming_bar_event_message_queue=incoming_bar_event_message_queue,
+        process_bar_event_message_queue=DiscardingQueue(),
+        trade_event_message_queue=trade_event_message_queue,
+        stop_event=stop_event,
+        **parameters,
+    )
+
+    start_time = time.perf_counter()
+    datafeed.connect()
+    strategy.run_strategy()
+    strategy.strategy_thread.join()
+    datafeed.disconnect()
+    elapsed_seconds = time.perf_counter() - start_time
+
+    trade_event_message_queue.flush()
+    trades = []
+    while not trade_event_message_queue.empty():
+        trade = trade_event_message_queue.get()
+        trades.append(
+            {
+                "run_id": run_id,
+                **parameters,
+                "ts_event": trade.ts_event,
+                "symbol": trade.symbol,
+                "trade_id": trade.trade_id,
+                "assoc_order_id": trade.assoc_order_id,
+                "trade_direction": trade.trade_direction.name,
+                "quantity": trade.quantity,
+                "fill_price": trade.fill_price,
+                "assoc_decision_type": trade.assoc_decision_type.name,
+            }
+        )
+    metrics = {
+        "run_id": run_id,
+        **parameters,
+        "bar_count": datafeed.row_count,
+        "trade_count": len(trades),
+        "net_position": sum(
+            (1 if trade["trade_direction"] == TradeDirection.BUY.name else -1)
+            * trade["quantity"]
+            for trade in trades
+        ),
+        "elapsed_seconds": elapsed_seconds,
+        "bars_per_second": (
+            datafeed.row_count / elapsed_seconds if elapsed_seconds else float("nan")
+        ),
+    }
+    return trades, metrics
+
+
+class ParameterSweepRunner:
+    """
+    Runs a strategy class for every combination of the parameters in
+    `parameter_grid` across a pool of worker processes. The CSV file is decoded
+    once into a memory-mapped bar cache (see `build_bar_cache()`) whose pages
+    all workers share read-only via the OS page cache.
+    """
+
+    def __init__(
+        self,
+        strategy_class: type[StrategiesABC],
+        parameter_grid: dict[str, list],
+        path_to_csv_file: str,
+        max_workers: int | None = None,
+        worker_log_level: int = logging.WARNING,
+    ):
+        self.strategy_class = strategy_class
+        self.parameter_grid = parameter_grid
+        self.path_to_csv_file = path_to_csv_file
+        self.max_workers = max_workers
+        self.worker_log_level = worker_log_level
+
+    @property
+    def parameter_combinations(self) -> list[dict]:
+        return [
+            dict(zip(self.parameter_grid, values))
+            for values in itertools.product(*self.parameter_grid.values())
+        ]
+
+    def run(self) -> ParameterSweepResults:
+        path_to_cache_dir = build_bar_cache(self.path_to_csv_file)
+        parameter_combinations = self.parameter_combinations
+        logger.info(
+            f"Running {len(parameter_combinations)} {self.strategy_class.__name__} "
+            f"parameter combinations"
+        )
+        all_trades, all_metrics = [], []
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_initialize_sweep_worker,
+            initargs=(self.worker_log_level,),
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _run_sweep_task,
+                    run_id,
+                    self.strategy_class,
+                    parameters,
+                    self.path_to_csv_file,
+                    path_to_cache_dir,
+                )
+                for run_id, parameters in enumerate(parameter_combinations)
+            ]
+            for future in concurrent.futures.as_completed(futures):
+                trades, metrics = future.result()
+                all_trades.extend(trades)
+                all_metrics.append(metrics)
+
+        trades = pd.DataFrame(all_trades)
+        if not trades.empty:
+            trades = trades.sort_values(["run_id", "trade_id"], ignore_index=True)
+        metrics = pd.DataFrame(all_metrics).sort_values("run_id", ignore_index=True)
+        return ParameterSweepResults(trades=trades, metrics=metrics)
@@ -0,0 +1,144 @@
+import numpy as np
+from ttools.indicators.indicator_registry import IndicatorSeriesCache
+from ttools.ontology.bar_arrays import BarArrays
+from ttools.ontology.enum_defs import OrderType, TradeDirection
+from ttools.ontology.event_messages import (
+    TradeEventMessage,
+    new_order_id,
+    new_trade_id,
+)
+from ttools.strategies.abc_strategies import StrategiesABC
+from ttools.strategies.vectorized_orders import VectorizedOrders
+
+# Within a bar, StrategiesABC._fill_orders fills market orders first, then
+# limit orders and then stop orders.
+_FILL_RANK = {OrderType.MARKET: 0, OrderType.LIMIT: 1, OrderType.STOP: 2}
+
+
+def _first_trigger_index(
+    values: np.ndarray, start: int, price: float, at_or_below: bool
+) -> int:
+    """
+    Returns the index of the first element of `values` at or after `start` that
+    is at or below (or at or above) `price`, or -1 if there is none. The search
+    scans windows of doubling size, so orders triggered soon are found quickly.
+    """
+    window_size = 64
+    while start < len(values):
+        window = values[start : start + window_size]
+        triggered = window <= price if at_or_below else window >= price
+        if triggered.any():
+            return start + int(triggered.argmax())
+        start += window_size
+        window_size *= 2
+    return -1
+
+
+class VectorizedBacktestEngine:
+    """
+    Runs a bar-close strategy over a whole BarArrays block at once: the strategy
+    computes its indicators column-wise and returns its orders as arrays
+    (see StrategiesABC.generate_vectorized_orders), after which market, limit
+    and stop fills are simulated with the same semantics as
+    StrategiesABC._fill_orders. Orders submitted on a bar's close can be filled
+    from the next bar onwards.
+
+    With an `indicator_series_cache`, run() must be passed all bars of the
+    cache's data file, and the strategy's indicator series are loaded from
+    the cache instead of recomputed whenever possible.
+    """
+
+    def __init__(
+        self,
+        strategy: StrategiesABC,
+        indicator_series_cache: IndicatorSeriesCache | None = None,
+    ):
+        self.strategy = strategy
+        self.indicator_series_cache = indicator_series_cache
+
+    def _simulate_fills(
+        self, orders: VectorizedOrders, bars: BarArrays
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the index of the bar on which each order is filled (-1 if it is
+        never filled) and the corresponding fill prices.
+        """
+        fill_bar_index = np.full(len(orders), -1, dtype=np.int64)
+        fill_price = np.full(len(orders), np.nan)
+
+        is_market = orders.order_type == OrderType.MARKET
+        market_fill_bar = orders.bar_index[is_market] + 1
+        market_fill_bar[market_fill_bar >= len(bars)] = -1
+        fill_bar_index[is_market] = market_fill_bar
+        fill_price[is_market] = np.where(
+            market_fill_bar >= 0, bars.open[market_fill_bar], np.nan
+        )
+
+        for order in np.flatnonzero(~is_market).tolist():
+            order_type = orders.order_type[order]
+            is_buy = orders.trade_direction[order] == TradeDirection.BUY
+            price = orders.price[order]
+            start = orders.bar_index[order] + 1
+            if order_type == OrderType.LIMIT:
+                index = (
+                    _first_trigger_index(bars.low, start, price, at_or_below=True)
+                    if is_buy
+                    else _first_trigger_index(
+                        bars.high, start, price, at_or_below=False
+                    )
+                )
+                fill_price[order] = price
+            elif order_type == OrderType.STOP:
+                index = (
+                    _first_trigger_index(bars.high, start, price, at_or_below=False)
+                    if is_buy
+                    else _first_trigger_index(bars.low, start, price, at_or_below=True)
+                )
+                if index >= 0:
+                    fill_price[order] = (
+                        max(price, bars.open[index])
+                        if is_buy
+                        else min(price, bars.open[index])
+                    )
+            else:
+                raise ValueError(f"Unknown order type: {order_type}")
+            fill_bar_index[order] = index
+        return fill_bar_index, fill_price
+
+    def run(self, bars: BarArrays) -> list[TradeEventMessage]:
+        if self.indicator_series_cache is not None:
+            self.strategy.indicator_registry.load_series(
+                bars, self.indicator_series_cache
+            )
+        orders = self.strategy.generate_vectorized_orders(bars)
+        # Ids are handed out on submission, as in the event-driven path, so
+        # orders that are never filled use up ids too.
+        order_ids = np.empty(len(orders), dtype=np.int64)
+        order_ids[np.argsort(orders.bar_index, kind="stable")] = [
+            new_order_id() for _ in range(len(orders))
+        ]
+        fill_bar_index, fill_price = self._simulate_fills(orders, bars)
+
+        filled = np.flatnonzero(fill_bar_index >= 0)
+        fill_rank = np.array(
+            [_FILL_RANK[order_type] for order_type in orders.order_type[filled]],
+            dtype=np.int64,
+        )
+        # Same bar: market before limit before stop, each in submission order.
+        filled = filled[np.lexsort((filled, fill_rank, fill_bar_index[filled]))]
+
+        ts_events = bars.ts_event[fill_bar_index[filled]].tolist()
+        symbols = bars.symbol[fill_bar_index[filled]].tolist()
+        return [
+            TradeEventMessage(
+                ts_event=ts_event,
+                trade_id=new_trade_id(),
+                assoc_order_id=int(order_ids[order]),
+                trade_direction=orders.trade_direction[order],
+                quantity=int(orders.quantity[order]),
+                fill_price=float(fill_price[order]),
+                assoc_decision_type=orders.decision_type[order],
+                symbol=symbol,
+            )
+            for order, ts_event, symbol in zip(filled.tolist(), ts_events, symbols)
+        ]
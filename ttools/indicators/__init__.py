@@ -1,2 +1,4 @@
 from .abc_indicators import *
 from .simple_moving_average import *
+from .bollinger_toolkit import *
+from .indicator_registry import *
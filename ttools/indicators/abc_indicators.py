@@ -1,5 +1,4 @@
 import abc
-import collections
 import numpy as np
 from ttools.logging_config import logger
 
@@ -7,14 +6,22 @@ from ttools.logging_config import logger
 class ABCIndicator(abc.ABC):
     def __init__(self, max_history: int = 6) -> None:
         self._max_history = max_history
-        self._history = collections.deque([np.nan] * max_history, maxlen=max_history)
-        self._current = np.nan
+        # Ring buffer holding the current value and up to `max_history` previous
+        # values. Every value is written twice (at i and at i + capacity), so the
+        # most recent `capacity` values always form one contiguous slice.
+        self._capacity = max_history + 1
+        self._history = np.full(2 * self._capacity, np.nan)
+        self._position = self._capacity - 1
 
     @property
     @abc.abstractmethod
     def name(self) -> str:
         pass
 
+    @property
+    def _current(self) -> float:
+        return self._history[self._position]
+
     @abc.abstractmethod
     def _compute_indicator(self, *args, **kwargs):
         """
@@ -23,6 +30,29 @@ class ABCIndicator(abc.ABC):
         """
         pass
 
+    def _compute_indicator_many(self, values: np.ndarray) -> np.ndarray:
+        """
+        Computes the indicator for a block of values. Subclasses can override
+        this with a vectorized implementation; the default calls
+        self._compute_indicator() for every value.
+        """
+        return np.array([self._compute_indicator(value) for value in values.tolist()])
+
+    def _append(self, new_value: float) -> None:
+        self._position = (self._position + 1) % self._capacity
+        self._history[self._position] = new_value
+        self._history[self._position + self._capacity] = new_value
+
+    def _append_many(self, new_values: np.ndarray) -> None:
+        count = len(new_values)
+        written = new_values[-self._capacity :]
+        positions = (
+            self._position + 1 + np.arange(count - len(written), count)
+        ) % self._capacity
+        self._history[positions] = written
+        self._history[positions + self._capacity] = written
+        self._position = (self._position + count) % self._capacity
+
     def update(self, value):
         """
         Updates the indicator with either a single value or multiple values
@@ -39,18 +69,52 @@ class ABCIndicator(abc.ABC):
             logger.error(f"Unexpected type for value: {type(value)} | Value: {value}")
             return
 
-        self._history.append(self._current)
-        self._current = new_value
+        self._append(new_value)
+
+    def update_many(self, values) -> np.ndarray:
+        """
+        Updates the indicator with a block of single values in one call (NaN values
+        are skipped, as in self.update()) and returns the computed indicator values.
+        """
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return np.empty(0)
+        new_values = np.asarray(self._compute_indicator_many(values), dtype=float)
+        self._append_many(new_values)
+        return new_values
 
-    def __getitem__(self, index: int):
+    def __getitem__(self, index: int | slice):
+        """
+        Index 0 is the current value and negative indices are historical values.
+        Slices such as [-50:0] (excluding) or [-50:1] (including the current value)
+        return a read-only view into the ring buffer that is only valid until the
+        next update.
+        """
+        end = self._position + self._capacity
+        if isinstance(index, slice):
+            if index.step not in (None, 1):
+                raise IndexError("Slices with a step are not supported.")
+            start = -self._max_history if index.start is None else index.start
+            stop = 1 if index.stop is None else index.stop
+            if start > 0 or stop > 1:
+                raise IndexError(
+                    f"Slices must lie within the historical values and the current "
+                    f"value (indices -{self._max_history} to 0)."
+                )
+            if start < -self._max_history:
+                logger.warning(f"Requested history index {start} is out of bounds.")
+                start = -self._max_history
+            view = self._history[end + start : end + max(start, stop)]
+            view.flags.writeable = False
+            return view
         if index == 0:
-            return self._current
+            return self._history[end]
         elif index < 0:
-            try:
-                return self._history[index]
-            except IndexError:
+            if index < -self._max_history:
                 logger.warning(f"Requested history index {index} is out of bounds.")
                 return np.nan
+            return self._history[end + index]
         else:
             raise IndexError(
                 f"Only index 0 (current value) and negative indices (historical "
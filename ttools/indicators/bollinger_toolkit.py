@@ -1,28 +1,160 @@
+import abc
 from ttools.indicators import ABCIndicator
 import numpy as np
 import collections
+import math
 
 
-class BollingerUpperBand(ABCIndicator):
-    def __init__(self, period: int, multiplier: float = 2.0, max_history: int = 1000):
+class RollingMeanStd:
+    """
+    Windowed Welford algorithm: maintains the mean and population standard
+    deviation of the last `period` values in O(1) per update. Both are
+    recomputed exactly every `resum_interval` updates to bound drift.
+    """
+
+    def __init__(self, period: int, resum_interval: int | None = None):
+        self.period = period
+        self.values = collections.deque(maxlen=period)
+        self.resum_interval = resum_interval or period
+        self.mean = 0.0
+        self._sum_of_squared_deviations = 0.0
+        self._updates_since_resum = 0
+
+    @property
+    def is_full(self) -> bool:
+        return len(self.values) == self.period
+
+    @property
+    def std_dev(self) -> float:
+        return math.sqrt(max(self._sum_of_squared_deviations, 0.0) / len(self.values))
+
+    def push(self, value: float) -> None:
+        if self.is_full:
+            removed_value = self.values[0]
+            self.values.append(value)
+            previous_mean = self.mean
+            self.mean += (value - removed_value) / self.period
+            self._sum_of_squared_deviations += (value - removed_value) * (
+                value - self.mean + removed_value - previous_mean
+            )
+        else:
+            self.values.append(value)
+            delta = value - self.mean
+            self.mean += delta / len(self.values)
+            self._sum_of_squared_deviations += delta * (value - self.mean)
+
+        self._updates_since_resum += 1
+        if self._updates_since_resum >= self.resum_interval:
+            self.mean = math.fsum(self.values) / len(self.values)
+            self._sum_of_squared_deviations = math.fsum(
+                (v - self.mean) ** 2 for v in self.values
+            )
+            self._updates_since_resum = 0
+
+
+class _BollingerBand(ABCIndicator):
+    """
+    Base class of the Bollinger indicators. A band either owns its rolling
+    window or reads from a window shared with other bands (see
+    `BollingerBands`), in which case it does not push values itself.
+    """
+
+    def __init__(
+        self,
+        period: int,
+        multiplier: float = 2.0,
+        max_history: int = 1000,
+        window: RollingMeanStd | None = None,
+    ):
         super().__init__(max_history)
         self.period = period
         self.multiplier = multiplier
-        self.values = collections.deque(maxlen=period)
+        self._owns_window = window is None
+        self._window = window or RollingMeanStd(period)
+
+    @property
+    def values(self) -> collections.deque:
+        return self._window.values
+
+    def _compute_indicator(self, value):
+        if self._owns_window:
+            self._window.push(value)
+        if not self._window.is_full:
+            return np.nan
+        return self._band_value(self._window.mean, self._window.std_dev)
 
+    @abc.abstractmethod
+    def _band_value(self, mean: float, std_dev: float) -> float:
+        pass
+
+
+class BollingerUpperBand(_BollingerBand):
     @property
     def name(self) -> str:
         return (
             f"BollingerUpperBand (Period: {self.period}, Multiplier: {self.multiplier})"
         )
 
-    def _compute_indicator(self, value):
-        self.values.append(value)
+    def _band_value(self, mean: float, std_dev: float) -> float:
+        return mean + (self.multiplier * std_dev)
 
-        if len(self.values) < self.period:
-            return np.nan
 
-        sma = np.mean(self.values)
-        std_dev = np.std(self.values, ddof=0)  # Population standard deviation
+class BollingerMiddleBand(_BollingerBand):
+    @property
+    def name(self) -> str:
+        return f"BollingerMiddleBand (Period: {self.period})"
+
+    def _band_value(self, mean: float, std_dev: float) -> float:
+        return mean
+
+
+class BollingerLowerBand(_BollingerBand):
+    @property
+    def name(self) -> str:
+        return (
+            f"BollingerLowerBand (Period: {self.period}, Multiplier: {self.multiplier})"
+        )
+
+    def _band_value(self, mean: float, std_dev: float) -> float:
+        return mean - (self.multiplier * std_dev)
+
+
+class BollingerBandwidth(_BollingerBand):
+    @property
+    def name(self) -> str:
+        return (
+            f"BollingerBandwidth (Period: {self.period}, Multiplier: {self.multiplier})"
+        )
+
+    def _band_value(self, mean: float, std_dev: float) -> float:
+        return (2 * self.multiplier * std_dev) / mean if mean else np.nan
+
+
+class BollingerBands:
+    """
+    Upper, middle and lower band plus bandwidth computed from one shared
+    rolling window, so the mean and standard deviation are computed once per
+    update.
+    """
+
+    def __init__(self, period: int, multiplier: float = 2.0, max_history: int = 1000):
+        self.period = period
+        self.multiplier = multiplier
+        self._window = RollingMeanStd(period)
+        self.upper = BollingerUpperBand(period, multiplier, max_history, self._window)
+        self.middle = BollingerMiddleBand(period, multiplier, max_history, self._window)
+        self.lower = BollingerLowerBand(period, multiplier, max_history, self._window)
+        self.bandwidth = BollingerBandwidth(
+            period, multiplier, max_history, self._window
+        )
+
+    @property
+    def bands(self) -> tuple[_BollingerBand, ...]:
+        return self.upper, self.middle, self.lower, self.bandwidth
 
-        return sma + (self.multiplier * std_dev)
+    def update(self, value):
+        if isinstance(value, (float, int)) and np.isnan(value):
+            return
+        self._window.push(value)
+        for band in self.bands:
+            band.update(value)
@@ -0,0 +1,241 @@
+import hashlib
+import inspect
+import json
+import os
+import numpy as np
+from ttools.indicators.abc_indicators import ABCIndicator
+from ttools.datafeeds.csv_offset_index import file_fingerprint
+from ttools.ontology.bar_arrays import BarArrays
+from ttools.ontology.enum_defs import Rtype
+from ttools.ontology.event_messages import IncomingBarEventMessage, OHLCV
+from ttools.logging_config import logger
+
+INDICATOR_SERIES_CACHE_FORMAT_VERSION = 2
+
+# (indicator class, applied_on, rtype of the bars it is updated with or None
+# for all bars, sorted (parameter, value) pairs)
+IndicatorKey = tuple[
+    type[ABCIndicator], str, Rtype | None, tuple[tuple[str, object], ...]
+]
+
+
+def indicator_key(
+    indicator_class: type[ABCIndicator],
+    applied_on: str,
+    rtype: Rtype | None = None,
+    **parameters,
+) -> IndicatorKey:
+    return indicator_class, applied_on, rtype, tuple(sorted(parameters.items()))
+
+
+def _create_indicator(key: IndicatorKey) -> ABCIndicator:
+    indicator_class, applied_on, _, parameters = key
+    parameters = dict(parameters)
+    if "applied_on" in inspect.signature(indicator_class).parameters:
+        parameters["applied_on"] = applied_on
+    return indicator_class(**parameters)
+
+
+def _values_for_key(bars: BarArrays, key: IndicatorKey) -> np.ndarray:
+    _, applied_on, rtype, _ = key
+    values = getattr(bars, applied_on)
+    if rtype is None:
+        return values
+    return values[bars.rtype == rtype.value]
+
+
+class IndicatorView:
+    """
+    Read-only handle on an indicator owned by an IndicatorRegistry. It supports
+    the same indexing as the indicator, but not updating it.
+    """
+
+    __slots__ = ("key", "_indicator")
+
+    def __init__(self, key: IndicatorKey, indicator: ABCIndicator):
+        self.key = key
+        self._indicator = indicator
+
+    @property
+    def name(self) -> str:
+        return self._indicator.name
+
+    def __getitem__(self, index: int | slice):
+        return self._indicator[index]
+
+    def __repr__(self) -> str:
+        return f"IndicatorView({self.name})"
+
+
+class IndicatorRegistry:
+    """
+    Holds one instance of every distinct indicator, identified by its class,
+    the OHLCV field it is applied on, the rtype of the bars it is updated with
+    and its parameters. Strategies that share a registry (see
+    StrategiesABC.register_indicator()) share the instances, so every
+    indicator is computed once per bar no matter how many strategies read it.
+    A registry must only be fed the bars of one stream, in order.
+    """
+
+    def __init__(self):
+        self._indicators: dict[IndicatorKey, ABCIndicator] = {}
+        # The last bar message and block the indicators were updated with.
+        # Consumers of the registry are passed the same objects, while distinct
+        # bars may share a ts_event, symbol and rtype.
+        self._last_bar_event_message: IncomingBarEventMessage | None = None
+        self._last_bars: BarArrays | None = None
+        self._last_series: dict[IndicatorKey, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._indicators)
+
+    def __contains__(self, key: IndicatorKey) -> bool:
+        return key in self._indicators
+
+    def register(
+        self,
+        indicator_class: type[ABCIndicator],
+        applied_on: str,
+        rtype: Rtype | None = None,
+        **parameters,
+    ) -> IndicatorView:
+        """
+        Returns a view of the indicator with the given key, creating the
+        indicator if it is not registered yet. With an `rtype`, the indicator is
+        only updated with bars of that rtype, e.g. the OHLCV_5M bars of a
+        ResampledDatafeed.
+        """
+        if applied_on not in OHLCV._fields:
+            raise ValueError(
+                f"Cannot apply an indicator on {applied_on!r}, expected one of "
+                f"{OHLCV._fields}."
+            )
+        key = indicator_key(indicator_class, applied_on, rtype, **parameters)
+        indicator = self._indicators.get(key)
+        if indicator is None:
+            indicator = self._indicators[key] = _create_indicator(key)
+            logger.info(f"Registered indicator {indicator.name}")
+        return IndicatorView(key, indicator)
+
+    def update(self, new_bar_event_message: IncomingBarEventMessage) -> None:
+        """
+        Updates every indicator with the bar. Further calls with the same bar
+        message are ignored, so every consumer of the registry may call it.
+        """
+        if new_bar_event_message is self._last_bar_event_message:
+            return
+        self._last_bar_event_message = new_bar_event_message
+        rtype = new_bar_event_message.rtype
+        ohlcv = new_bar_event_message.ohlcv
+        for (_, applied_on, indicator_rtype, _), indicator in self._indicators.items():
+            if indicator_rtype is None or indicator_rtype == rtype:
+                indicator.update(getattr(ohlcv, applied_on))
+
+    def update_many(self, bars: BarArrays) -> dict[IndicatorKey, np.ndarray]:
+        """
+        Updates every indicator with a block of bars and returns the computed
+        series by key. The series of an indicator registered with an rtype only
+        has values for the bars of that rtype. Repeated calls with the same
+        block return the series computed by the first call.
+        """
+        if not len(bars):
+            return {key: np.empty(0) for key in self._indicators}
+        if bars is self._last_bars:
+            return self._last_series
+        self._last_bars = bars
+        self._last_series = {
+            key: indicator.update_many(_values_for_key(bars, key))
+            for key, indicator in self._indicators.items()
+        }
+        return self._last_series
+
+    def load_series(
+        self, bars: BarArrays, series_cache: "IndicatorSeriesCache"
+    ) -> dict[IndicatorKey, np.ndarray]:
+        """
+        Like update_many() for `bars`, which must hold all bars of the cache's
+        data file, but loads the series from `series_cache` where possible and
+        caches the ones it computes. Following update_many() calls with the
+        same block return these series. The indicators themselves are not
+        updated, so the registry can only serve such whole-file series
+        afterwards, e.g. in a VectorizedBacktestEngine run.
+        """
+        self._last_bars = bars
+        self._last_series = {
+            key: series_cache.load_or_compute(key, bars) for key in self._indicators
+        }
+        return self._last_series
+
+
+class IndicatorSeriesCache:
+    """
+    On-disk cache of indicator series computed over all bars of a data file,
+    keyed like the IndicatorRegistry. A cached series is only used while the
+    data file is unchanged (see `file_fingerprint()`).
+    """
+
+    def __init__(self, path_to_data_file: str, path_to_cache_dir: str | None = None):
+        self.path_to_data_file = path_to_data_file
+        self.path_to_cache_dir = path_to_cache_dir or (
+            f"{path_to_data_file}.ttindicators"
+        )
+
+    @staticmethod
+    def _describe(key: IndicatorKey) -> dict:
+        indicator_class, applied_on, rtype, parameters = key
+        return {
+            "indicator": f"{indicator_class.__module__}.{indicator_class.__qualname__}",
+            "applied_on": applied_on,
+            "rtype": rtype.name if rtype is not None else None,
+            "parameters": [[name, repr(value)] for name, value in parameters],
+        }
+
+    def _path_stem(self, key: IndicatorKey) -> str:
+        digest = hashlib.sha256(
+            json.dumps(self._describe(key), sort_keys=True).encode()
+        ).hexdigest()[:16]
+        return os.path.join(self.path_to_cache_dir, f"{key[0].__name__}_{digest}")
+
+    def _metadata(self, key: IndicatorKey) -> dict:
+        return {
+            "format_version": INDICATOR_SERIES_CACHE_FORMAT_VERSION,
+            "source_fingerprint": file_fingerprint(self.path_to_data_file),
+            "key": self._describe(key),
+        }
+
+    def load(self, key: IndicatorKey) -> np.ndarray | None:
+        path_stem = self._path_stem(key)
+        try:
+            with open(f"{path_stem}.json") as metadata_file:
+                metadata = json.load(metadata_file)
+        except (OSError, ValueError):
+            return None
+        if metadata != self._metadata(key):
+            return None
+        return np.load(f"{path_stem}.npy", mmap_mode="r")
+
+    def save(self, key: IndicatorKey, series: np.ndarray) -> None:
+        os.makedirs(self.path_to_cache_dir, exist_ok=True)
+        path_stem = self._path_stem(key)
+        # The metadata file is removed first and written last, so an
+        # interrupted save is never mistaken for a valid series.
+        if os.path.exists(f"{path_stem}.json"):
+            os.remove(f"{path_stem}.json")
+        with open(f"{path_stem}.npy", "wb") as series_file:
+            np.save(series_file, np.asarray(series, dtype=np.float64))
+        with open(f"{path_stem}.json", "w") as metadata_file:
+            json.dump(self._metadata(key), metadata_file)
+
+    def load_or_compute(self, key: IndicatorKey, bars: BarArrays) -> np.ndarray:
+        """
+        Returns the cached series of the indicator with the given key, or
+        computes it over `bars`, which must hold all bars of the data file, and
+        caches it.
+        """
+        values = _values_for_key(bars, key)
+        series = self.load(key)
+        if series is not None and len(series) == len(values):
+            return series
+        series = _create_indicator(key).update_many(values)
+        self.save(key, series)
+        return series
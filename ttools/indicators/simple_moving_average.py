@@ -1,23 +1,65 @@
 from ttools.indicators import ABCIndicator
 import numpy as np
 import collections
+import math
 
 
 class SimpleMovingAverage(ABCIndicator):
     def __init__(
-        self, period: int, applied_on: str | None = None, max_history: int = 1000
+        self,
+        period: int,
+        applied_on: str | None = None,
+        max_history: int = 1000,
+        resum_interval: int | None = None,
     ):
         super().__init__(max_history)
         self.period = period
         self.applied_on = applied_on or "N/A"
-        self.values = collections.deque([np.nan] * period, maxlen=period)
+        self.values = collections.deque(maxlen=period)
+        # The running sum is recomputed exactly every `resum_interval` updates
+        # to bound floating-point drift (amortized O(1) per update).
+        self.resum_interval = resum_interval or period
+        self._running_sum = 0.0
+        self._updates_since_resum = 0
 
     @property
     def name(self) -> str:
         return f"SMA_{self.period}_{self.applied_on}"
 
     def _compute_indicator(self, value):
+        if len(self.values) == self.period:
+            self._running_sum -= self.values[0]
         self.values.append(value)
-        if np.isnan(self.values[0]):
+        self._running_sum += value
+
+        self._updates_since_resum += 1
+        if self._updates_since_resum >= self.resum_interval:
+            self._running_sum = math.fsum(self.values)
+            self._updates_since_resum = 0
+
+        if len(self.values) < self.period:
             return np.nan
-        return np.mean(self.values)
+        return self._running_sum / self.period
+
+    def _compute_indicator_many(self, values: np.ndarray) -> np.ndarray:
+        combined = np.concatenate(
+            (np.fromiter(self.values, dtype=float, count=len(self.values)), values)
+        )
+        # Offsetting by the first value keeps the cumulative sum small, which
+        # limits the cancellation error of the window differences.
+        offset = combined[0]
+        cumulative_sum = np.concatenate(([0.0], np.cumsum(combined - offset)))
+        window_means = (
+            cumulative_sum[self.period :] - cumulative_sum[: -self.period]
+        ) / self.period + offset
+
+        new_values = np.full(len(values), np.nan)
+        first_full = max(self.period - len(self.values) - 1, 0)
+        new_values[first_full:] = window_means[
+            len(window_means) - (len(values) - first_full) :
+        ]
+
+        self.values.extend(values.tolist())
+        self._running_sum = math.fsum(self.values)
+        self._updates_since_resum = 0
+        return new_values
@@ -1,3 +1,5 @@
 from .enum_defs import *
 from .event_messages import *
+from .batching_queue import *
 from .global_queues import *
+from .bar_arrays import *
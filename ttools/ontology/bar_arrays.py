@@ -0,0 +1,115 @@
+import dataclasses
+from collections.abc import Iterator
+
+import numpy as np
+
+from ttools.ontology.enum_defs import Rtype
+from ttools.ontology.event_messages import IncomingBarEventMessage, OHLCV
+
+# DataBento encodes prices as fixed-point integers where 1 unit is 1e-9.
+FIXED_POINT_SCALE = 1e9
+
+
+@dataclasses.dataclass(frozen=True)
+class BarArrays:
+    """
+    Struct-of-arrays representation of a block of consecutive bars. Prices are
+    already scaled from DataBento fixed-point integers to floats.
+    """
+
+    ts_event: np.ndarray  # int64, nanoseconds since the UNIX epoch
+    rtype: np.ndarray  # uint8
+    open: np.ndarray  # float64
+    high: np.ndarray  # float64
+    low: np.ndarray  # float64
+    close: np.ndarray  # float64
+    volume: np.ndarray  # int64
+    symbol: np.ndarray  # object (str)
+
+    @classmethod
+    def from_fixed_point(
+        cls,
+        ts_event,
+        rtype,
+        open,
+        high,
+        low,
+        close,
+        volume,
+        symbol,
+    ) -> "BarArrays":
+        return cls(
+            ts_event=np.asarray(ts_event, dtype=np.int64),
+            rtype=np.asarray(rtype, dtype=np.uint8),
+            open=np.asarray(open) / FIXED_POINT_SCALE,
+            high=np.asarray(high) / FIXED_POINT_SCALE,
+            low=np.asarray(low) / FIXED_POINT_SCALE,
+            close=np.asarray(close) / FIXED_POINT_SCALE,
+            volume=np.asarray(volume, dtype=np.int64),
+            symbol=np.asarray(symbol, dtype=object),
+        )
+
+    @classmethod
+    def concatenate(cls, blocks: list["BarArrays"]) -> "BarArrays":
+        if not blocks:
+            return cls.from_fixed_point(*([[]] * len(dataclasses.fields(cls))))
+        return cls(
+            **{
+                field.name: np.concatenate(
+                    [getattr(block, field.name) for block in blocks]
+                )
+                for field in dataclasses.fields(cls)
+            }
+        )
+
+    @classmethod
+    def from_bar_event_messages(
+        cls, bar_event_messages: list[IncomingBarEventMessage]
+    ) -> "BarArrays":
+        count = len(bar_event_messages)
+        return cls(
+            ts_event=np.fromiter(
+                (bar.ts_event for bar in bar_event_messages), np.int64, count
+            ),
+            rtype=np.fromiter(
+                (bar.rtype.value for bar in bar_event_messages), np.uint8, count
+            ),
+            open=np.fromiter(
+                (bar.ohlcv.open for bar in bar_event_messages), np.float64, count
+            ),
+            high=np.fromiter(
+                (bar.ohlcv.high for bar in bar_event_messages), np.float64, count
+            ),
+            low=np.fromiter(
+                (bar.ohlcv.low for bar in bar_event_messages), np.float64, count
+            ),
+            close=np.fromiter(
+                (bar.ohlcv.close for bar in bar_event_messages), np.float64, count
+            ),
+            volume=np.fromiter(
+                (bar.ohlcv.volume for bar in bar_event_messages), np.int64, count
+            ),
+            symbol=np.array([bar.symbol for bar in bar_event_messages], dtype=object),
+        )
+
+    def __len__(self) -> int:
+        return len(self.ts_event)
+
+    def iter_bar_event_messages(self) -> Iterator[IncomingBarEventMessage]:
+        rtypes = {value: Rtype(value) for value in np.unique(self.rtype).tolist()}
+        for ts_event, rtype, symbol, open_, high, low, close, volume in zip(
+            self.ts_event.tolist(),
+            self.rtype.tolist(),
+            self.symbol.tolist(),
+            self.open.tolist(),
+            self.high.tolist(),
+            self.low.tolist(),
+            self.close.tolist(),
+            self.volume.tolist(),
+        ):
+            yield IncomingBarEventMessage(
+                ts_event=ts_event,
+                rtype=rtypes[rtype],
+                symbol=symbol,
+                ohlcv=OHLCV(open_, high, low, close, volume),
+            )
@@ -0,0 +1,209 @@
+import collections
+import queue
+import threading
+import time
+
+
+class _EndOfStream:
+    def __repr__(self) -> str:
+        return "END_OF_STREAM"
+
+
+# Sentinel put by producers via BatchingQueue.close() once a stream is exhausted.
+END_OF_STREAM = _EndOfStream()
+
+
+class BatchingQueue:
+    """
+    FIFO queue that moves items between threads in micro-batches of up to
+    `batch_size` items, so a lock round-trip is paid per batch rather than per
+    item. At most `max_batches` batches are buffered (0 means unbounded);
+    producers block once the queue is full.
+
+    Items put by a producer are handed over as a batch once it is full or on
+    flush()/close(). A consumer that finds no full batch but some items put
+    waits up to `max_delay` seconds for the batch to fill and then takes the
+    partial batch, so no item waits longer than that for a slow producer.
+    close() also appends END_OF_STREAM, which a consumer receives after all
+    other items of the stream.
+    """
+
+    def __init__(
+        self, batch_size: int = 1, max_batches: int = 0, max_delay: float = 0.005
+    ):
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.max_delay = max_delay
+        self._batches: collections.deque[list] = collections.deque()
+        self._put_buffer: list = []
+        self._get_buffer: collections.deque = collections.deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._waiting_getters = 0
+        self._waiting_putters = 0
+
+    def _wait_not_full(self, block: bool, timeout: float | None) -> None:
+        # Must be called with self._lock held.
+        if not self.max_batches or len(self._batches) < self.max_batches:
+            return
+        if not block:
+            raise queue.Full
+        self._waiting_putters += 1
+        try:
+            if not self._not_full.wait_for(
+                lambda: len(self._batches) < self.max_batches, timeout
+            ):
+                raise queue.Full
+        finally:
+            self._waiting_putters -= 1
+
+    def _append_batch(self, batch: list) -> None:
+        # Must be called with self._lock held and room for a batch.
+        self._batches.append(batch)
+        if self._waiting_getters:
+            self._not_empty.notify()
+
+    def put(self, item, block: bool = True, timeout: float | None = None) -> None:
+        """
+        Raises queue.Full, without putting the item, if it would complete a
+        batch and no room for the batch frees up within `timeout`.
+        """
+        with self._lock:
+            if len(self._put_buffer) + 1 >= self.batch_size:
+                self._wait_not_full(block, timeout)
+            self._put_buffer.append(item)
+            if len(self._put_buffer) >= self.batch_size:
+                self._append_batch(self._put_buffer)
+                self._put_buffer = []
+            elif len(self._put_buffer) == 1 and self._waiting_getters:
+                # Starts the max_delay countdown of a waiting consumer.
+                self._not_empty.notify()
+
+    def put_many(self, items) -> None:
+        with self._lock:
+            # The items are batched outside of self._put_buffer, which
+            # consumers may take while this waits for room.
+            buffered = self._put_buffer + list(items)
+            self._put_buffer = []
+            full_batches_end = len(buffered) - len(buffered) % self.batch_size
+            for start in range(0, full_batches_end, self.batch_size):
+                self._wait_not_full(True, None)
+                self._append_batch(buffered[start : start + self.batch_size])
+            self._put_buffer = buffered[full_batches_end:] + self._put_buffer
+            if self._put_buffer and self._waiting_getters:
+                self._not_empty.notify()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._put_buffer:
+                self._wait_not_full(True, None)
+            # A consumer may have taken the items meanwhile.
+            if self._put_buffer:
+                self._append_batch(self._put_buffer)
+                self._put_buffer = []
+
+    def close(self, block: bool = True, timeout: float | None = None) -> None:
+        """
+        Raises queue.Full, without closing the queue, if no room for the last
+        batch frees up within `timeout`.
+        """
+        with self._lock:
+            self._wait_not_full(block, timeout)
+            self._put_buffer.append(END_OF_STREAM)
+            self._append_batch(self._put_buffer)
+            self._put_buffer = []
+
+    def _take(self, block: bool, timeout: float | None) -> list:
+        # Must be called with self._lock held and an empty self._get_buffer.
+        deadline = None if timeout is None else time.monotonic() + timeout
+        partial_batch_deadline = None
+        while not self._batches:
+            now = time.monotonic()
+            wait_timeout = None
+            if self._put_buffer:
+                if partial_batch_deadline is None:
+                    partial_batch_deadline = now + self.max_delay
+                if not block or now >= partial_batch_deadline:
+                    break
+                wait_timeout = partial_batch_deadline - now
+            elif not block:
+                raise queue.Empty
+            if deadline is not None:
+                if now >= deadline:
+                    if self._put_buffer:
+                        break
+                    raise queue.Empty
+                wait_timeout = (
+                    deadline - now
+                    if wait_timeout is None
+                    else min(wait_timeout, deadline - now)
+                )
+            self._waiting_getters += 1
+            try:
+                self._not_empty.wait(wait_timeout)
+            finally:
+                self._waiting_getters -= 1
+        if not self._batches:
+            items, self._put_buffer = self._put_buffer, []
+            return items
+        items = self._batches.popleft()
+        if self._waiting_putters:
+            self._not_full.notify()
+        return items
+
+    def get(self, block: bool = True, timeout: float | None = None):
+        with self._lock:
+            if not self._get_buffer:
+                self._get_buffer.extend(self._take(block, timeout))
+            return self._get_buffer.popleft()
+
+    def get_many(self, block: bool = True, timeout: float | None = None) -> list:
+        """
+        Returns the items of the next available batch, or of the partial batch
+        once it is `max_delay` seconds old (never an empty list).
+        """
+        with self._lock:
+            if self._get_buffer:
+                items = list(self._get_buffer)
+                self._get_buffer.clear()
+                return items
+            return self._take(block, timeout)
+
+    def qsize(self) -> int:
+        """
+        Approximate number of items in the queue, including unflushed items.
+        """
+        return (
+            len(self._batches) * self.batch_size
+            + len(self._get_buffer)
+            + len(self._put_buffer)
+        )
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+
+class DiscardingQueue:
+    """
+    Stand-in for a BatchingQueue whose messages are not needed, e.g. the
+    processed bars of a parameter sweep run. Everything put is dropped.
+    """
+
+    def put(self, item, block: bool = True, timeout: float | None = None) -> None:
+        pass
+
+    def put_many(self, items) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+    def close(self, block: bool = True, timeout: float | None = None) -> None:
+        pass
+
+    def qsize(self) -> int:
+        return 0
+
+    def empty(self) -> bool:
+        return True
@@ -3,6 +3,52 @@ import enum
 
 class Rtype(enum.Enum):
     OHLCV_1S = 32
+    OHLCV_1M = 33
+    OHLCV_1H = 34
+    OHLCV_1D = 35
+    # Intervals that DataBento does not provide, only produced by resampling.
+    # Their values lie outside the range of DataBento rtypes.
+    OHLCV_5S = 0xE0
+    OHLCV_10S = 0xE1
+    OHLCV_15S = 0xE2
+    OHLCV_30S = 0xE3
+    OHLCV_2M = 0xE4
+    OHLCV_3M = 0xE5
+    OHLCV_5M = 0xE6
+    OHLCV_10M = 0xE7
+    OHLCV_15M = 0xE8
+    OHLCV_30M = 0xE9
+    OHLCV_4H = 0xEA
+
+    @property
+    def interval_seconds(self) -> int:
+        return _RTYPE_INTERVAL_SECONDS[self]
+
+    @classmethod
+    def from_interval_seconds(cls, interval_seconds: int) -> "Rtype":
+        for rtype, rtype_interval_seconds in _RTYPE_INTERVAL_SECONDS.items():
+            if rtype_interval_seconds == interval_seconds:
+                return rtype
+        raise ValueError(f"No rtype for bars of {interval_seconds} seconds.")
+
+
+_RTYPE_INTERVAL_SECONDS = {
+    Rtype.OHLCV_1S: 1,
+    Rtype.OHLCV_5S: 5,
+    Rtype.OHLCV_10S: 10,
+    Rtype.OHLCV_15S: 15,
+    Rtype.OHLCV_30S: 30,
+    Rtype.OHLCV_1M: 60,
+    Rtype.OHLCV_2M: 2 * 60,
+    Rtype.OHLCV_3M: 3 * 60,
+    Rtype.OHLCV_5M: 5 * 60,
+    Rtype.OHLCV_10M: 10 * 60,
+    Rtype.OHLCV_15M: 15 * 60,
+    Rtype.OHLCV_30M: 30 * 60,
+    Rtype.OHLCV_1H: 60 * 60,
+    Rtype.OHLCV_4H: 4 * 60 * 60,
+    Rtype.OHLCV_1D: 24 * 60 * 60,
+}
 
 
 class OrderType(enum.Enum):
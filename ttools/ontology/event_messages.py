@@ -1,44 +1,115 @@
 import dataclasses
-import uuid
+import itertools
+import typing
 
 from ttools.ontology.enum_defs import Rtype, TradeDirection, OrderType, DecisionType
 import threading
 import pandas as pd
 import collections
 
+if typing.TYPE_CHECKING:
+    from ttools.ontology.bar_arrays import BarArrays
+
 
 GLOBAL_STOP_EVENT = threading.Event()
 
+# Order and trade ids are increasing integers, which are much cheaper to create
+# than UUIDs. next() on an itertools.count is atomic, so ids are unique across
+# threads. Replacing the counters is guarded by _ids_lock, which new ids also
+# take so that no id is handed out from a counter that is being replaced.
+_order_ids = itertools.count(1)
+_trade_ids = itertools.count(1)
+_ids_lock = threading.Lock()
+
+
+def new_order_id() -> int:
+    with _ids_lock:
+        return next(_order_ids)
+
+
+def new_trade_id() -> int:
+    with _ids_lock:
+        return next(_trade_ids)
+
+
+def get_next_ids() -> tuple[int, int]:
+    """
+    Returns the next order id and the next trade id without using them up.
+    """
+    global _order_ids, _trade_ids
+    with _ids_lock:
+        next_order_id, next_trade_id = next(_order_ids), next(_trade_ids)
+        _order_ids = itertools.count(next_order_id)
+        _trade_ids = itertools.count(next_trade_id)
+    return next_order_id, next_trade_id
+
+
+def set_next_ids(next_order_id: int, next_trade_id: int) -> None:
+    """
+    Makes new_order_id() and new_trade_id() continue from the given ids. Ids
+    that were handed out before may be handed out again, so only call it while
+    no other strategy in the process is running, e.g. at startup.
+    """
+    global _order_ids, _trade_ids
+    with _ids_lock:
+        _order_ids = itertools.count(next_order_id)
+        _trade_ids = itertools.count(next_trade_id)
+
+
+def advance_next_ids(next_order_id: int, next_trade_id: int) -> None:
+    """
+    Like set_next_ids(), but never moves a counter backwards, so ids stay
+    unique within the process, e.g. when resuming from a checkpoint.
+    """
+    global _order_ids, _trade_ids
+    with _ids_lock:
+        current_order_id, current_trade_id = next(_order_ids), next(_trade_ids)
+        _order_ids = itertools.count(max(current_order_id, next_order_id))
+        _trade_ids = itertools.count(max(current_trade_id, next_trade_id))
+
+
+def _to_timestamp(ts_event: int) -> pd.Timestamp:
+    return pd.Timestamp(ts_event, unit="ns")
+
+
 OHLCV = collections.namedtuple("OHLCV", ["open", "high", "low", "close", "volume"])
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class IncomingBarEventMessage:
-    ts_event: pd.Timestamp
+    ts_event: int  # nanoseconds since the UNIX epoch
     rtype: Rtype
     symbol: str
     ohlcv: OHLCV
 
+    @property
+    def timestamp(self) -> pd.Timestamp:
+        return _to_timestamp(self.ts_event)
+
     def __str__(self) -> str:
         ohlcv_str = (
             f"open={self.ohlcv.open}, high={self.ohlcv.high}, "
             f"low={self.ohlcv.low}, close={self.ohlcv.close}, volume={self.ohlcv.volume}"
         )
         return (
-            f"IncomingBarEventMessage({self.ts_event}, {self.symbol}, {self.rtype}, "
+            f"IncomingBarEventMessage({self.timestamp}, {self.symbol}, {self.rtype}, "
             f"ohlcv=({ohlcv_str}))"
         )
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class ProcessedBarEventMessage:
-    ts_event: pd.Timestamp
+    ts_event: int  # nanoseconds since the UNIX epoch
     rtype: Rtype
     symbol: str
     ohlcv: OHLCV
     indicator_values: dict
     # bar_performance_metrics: dict
 
+    @property
+    def timestamp(self) -> pd.Timestamp:
+        return _to_timestamp(self.ts_event)
+
     def __str__(self) -> str:
         ohlcv_str = (
             f"open={self.ohlcv.open}, high={self.ohlcv.high}, "
@@ -48,44 +119,71 @@ class ProcessedBarEventMessage:
             f"{k}: {v}" for k, v in self.indicator_values.items()
         )
         return (
-            f"ProcessedBarEventMessage({self.ts_event}, {self.symbol}, "
+            f"ProcessedBarEventMessage({self.timestamp}, {self.symbol}, "
             f"ohlcv=({ohlcv_str}), indicators={indicators_str})"
         )
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class OrderEventMessage:
-    ts_event: pd.Timestamp
-    order_id: uuid.UUID
+    ts_event: int  # nanoseconds since the UNIX epoch
+    order_id: int
     trade_direction: TradeDirection
     quantity: int
     decision_type: DecisionType
     order_type: OrderType
+    # None means the order is filled by the next bars of whatever symbol.
+    symbol: str | None = dataclasses.field(default=None, kw_only=True)
+
+    @property
+    def timestamp(self) -> pd.Timestamp:
+        return _to_timestamp(self.ts_event)
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class MarketOrderEventMessage(OrderEventMessage):
     order_type: OrderType = dataclasses.field(default=OrderType.MARKET, init=False)
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class LimitOrderEventMessage(OrderEventMessage):
     limit_price: float
     order_type: OrderType = dataclasses.field(default=OrderType.LIMIT, init=False)
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class StopOrderEventMessage(OrderEventMessage):
     stop_price: float
     order_type: OrderType = dataclasses.field(default=OrderType.STOP, init=False)
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class TradeEventMessage:
-    ts_event: pd.Timestamp
-    trade_id: uuid.UUID
-    assoc_order_id: uuid.UUID
+    ts_event: int  # nanoseconds since the UNIX epoch
+    trade_id: int
+    assoc_order_id: int
     trade_direction: TradeDirection
     quantity: int
     fill_price: float
     assoc_decision_type: DecisionType
+    symbol: str | None = dataclasses.field(default=None, kw_only=True)
+
+    @property
+    def timestamp(self) -> pd.Timestamp:
+        return _to_timestamp(self.ts_event)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class IncomingBarBlockEventMessage:
+    """
+    Carries a block of consecutive bars as a struct of arrays, so consumers
+    that can work on arrays do not need to create one message per bar.
+    """
+
+    bars: "BarArrays"
+
+    def __len__(self) -> int:
+        return len(self.bars)
+
+    def iter_bar_event_messages(self) -> typing.Iterator[IncomingBarEventMessage]:
+        return self.bars.iter_bar_event_messages()
@@ -1,5 +1,8 @@
-import queue
+from ttools.ontology.batching_queue import BatchingQueue
 
-incoming_bar_event_message_queue = queue.Queue()
-process_bar_event_message_queue = queue.Queue()
-trade_event_message_queue = queue.Queue()
+# Bounded, so the datafeed cannot run ahead of the strategy by more than
+# batch_size * max_batches bars.
+incoming_bar_event_message_queue = BatchingQueue(batch_size=256, max_batches=64)
+# Unbounded, so that putting processed bars and trades never blocks the strategy.
+process_bar_event_message_queue = BatchingQueue(batch_size=256)
+trade_event_message_queue = BatchingQueue(batch_size=256)
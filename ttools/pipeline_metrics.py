@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+from ttools.logging_config import logger
+
+
+class LatencyHistogram:
+    """
+    Histogram of durations in nanoseconds with power-of-two buckets: bucket i
+    counts the durations d with 2**(i-1) <= d < 2**i.
+    """
+
+    def __init__(self):
+        self.bucket_counts = [0] * 64
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, duration_ns: int) -> None:
+        self.bucket_counts[duration_ns.bit_length()] += 1
+        self.count += 1
+        self.total_ns += duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+
+    def percentile_upper_bound_ns(self, percentile: float) -> int:
+        """
+        Upper bound of the bucket that contains the given percentile.
+        """
+        rank = percentile / 100 * self.count
+        cumulative_count = 0
+        for bucket, bucket_count in enumerate(self.bucket_counts):
+            cumulative_count += bucket_count
+            if bucket_count and cumulative_count >= rank:
+                return min(2**bucket, self.max_ns)
+        return self.max_ns
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.count if self.count else 0.0
+
+
+class PipelineMetrics:
+    """
+    Per-stage timing histograms, counters and queue depth high-water marks of
+    the event pipeline. Instrumented code checks `enabled` before taking any
+    timestamps, so disabled metrics only cost that attribute lookup. The
+    module-level `pipeline_metrics` is enabled by setting the TTOOLS_METRICS
+    environment variable to 1 or by calling enable().
+
+    Stages and counters may be written by several threads, e.g. the strategy
+    threads of a parameter sweep, so all updates take a lock.
+    """
+
+    def __init__(self, enabled: bool | None = None):
+        if enabled is None:
+            enabled = os.environ.get("TTOOLS_METRICS", "0") not in ("", "0")
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.histograms: dict[str, LatencyHistogram] = {}
+        self.counters: dict[str, int] = {}
+        self.queue_high_water_marks: dict[str, int] = {}
+        self._start_ns: int | None = None
+        self._stop_ns: int | None = None
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def start(self) -> None:
+        self._start_ns = time.perf_counter_ns()
+        self._stop_ns = None
+
+    def stop(self) -> None:
+        self._stop_ns = time.perf_counter_ns()
+
+    def record_duration(self, stage: str, duration_ns: int) -> None:
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = LatencyHistogram()
+            histogram.record(duration_ns)
+
+    def increment(self, counter: str, count: int = 1) -> None:
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + count
+
+    def record_queue_depth(self, queue_name: str, depth: int) -> None:
+        with self._lock:
+            if depth > self.queue_high_water_marks.get(queue_name, -1):
+                self.queue_high_water_marks[queue_name] = depth
+
+    @property
+    def elapsed_seconds(self) -> float:
+        if self._start_ns is None:
+            return 0.0
+        stop_ns = self._stop_ns or time.perf_counter_ns()
+        return (stop_ns - self._start_ns) / 1e9
+
+    def rate(self, counter: str) -> float:
+        """
+        Count of `counter` per second between start() and stop().
+        """
+        elapsed_seconds = self.elapsed_seconds
+        return (
+            self.counters.get(counter, 0) / elapsed_seconds if elapsed_seconds else 0.0
+        )
+
+    def summary(self) -> str:
+        with self._lock:
+            return self._summary()
+
+    def _summary(self) -> str:
+        lines = [f"Pipeline metrics over {self.elapsed_seconds:.3f} s"]
+        for stage, histogram in sorted(self.histograms.items()):
+            lines.append(
+                f"  {stage}: n={histogram.count}, "
+                f"mean={histogram.mean_ns / 1e3:.2f} us, "
+                f"p50<={histogram.percentile_upper_bound_ns(50) / 1e3:.2f} us, "
+                f"p99<={histogram.percentile_upper_bound_ns(99) / 1e3:.2f} us, "
+                f"max={histogram.max_ns / 1e3:.2f} us, "
+                f"total={histogram.total_ns / 1e9:.3f} s"
+            )
+        for counter, count in sorted(self.counters.items()):
+            lines.append(f"  {counter}: {count} ({self.rate(counter):.1f}/s)")
+        for queue_name, depth in sorted(self.queue_high_water_marks.items()):
+            lines.append(f"  {queue_name} high-water mark: {depth}")
+        return "\n".join(lines)
+
+    def log_summary(self) -> None:
+        logger.info("%s", self.summary())
+
+
+pipeline_metrics = PipelineMetrics()
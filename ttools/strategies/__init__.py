@@ -1 +1,6 @@
 from .abc_strategies import *
+from .pending_order_book import *
+from .performance_tracker import *
+from .vectorized_orders import *
+from .symbol_router import *
+from .strategy_group import *
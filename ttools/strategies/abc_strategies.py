@@ -1,7 +1,8 @@
 import abc
+import os
+import pickle
 import threading
-import uuid
-import pandas as pd
+import time
 from ttools.ontology.event_messages import (
     GLOBAL_STOP_EVENT,
     OrderEventMessage,
@@ -11,150 +12,391 @@ from ttools.ontology.event_messages import (
     IncomingBarEventMessage,
     ProcessedBarEventMessage,
     TradeEventMessage,
+    IncomingBarBlockEventMessage,
+    new_order_id,
+    new_trade_id,
+    advance_next_ids,
+    get_next_ids,
 )
-from ttools.ontology.enum_defs import DecisionType, TradeDirection, OrderType
-from ttools.ontology.global_queues import (
-    incoming_bar_event_message_queue,
-    process_bar_event_message_queue,
-    trade_event_message_queue,
-)
+from ttools.ontology.enum_defs import DecisionType, TradeDirection, OrderType, Rtype
+from ttools.ontology.batching_queue import END_OF_STREAM, BatchingQueue
+from ttools.ontology import global_queues
 from ttools.logging_config import logger
-from ttools.indicators import SimpleMovingAverage
+from ttools.pipeline_metrics import pipeline_metrics
+from ttools.indicators import (
+    ABCIndicator,
+    IndicatorRegistry,
+    IndicatorView,
+    SimpleMovingAverage,
+)
+from ttools.ontology.bar_arrays import BarArrays
+from ttools.strategies.pending_order_book import PendingOrderBook
+from ttools.strategies.performance_tracker import PerformanceTracker
+from ttools.strategies.vectorized_orders import VectorizedOrders
+
+# Bumped whenever the layout of strategy checkpoints changes.
+CHECKPOINT_FORMAT_VERSION = 4
 
 
 class StrategiesABC(abc.ABC):
 
-    def __init__(self) -> None:
+    # Runtime attributes that are not part of a checkpoint.
+    _UNPICKLED_ATTRIBUTES = (
+        "_instance_stop_event",
+        "_stop_event",
+        "incoming_bar_event_message_queue",
+        "process_bar_event_message_queue",
+        "trade_event_message_queue",
+        "strategy_thread",
+    )
+
+    def __init__(
+        self,
+        incoming_bar_event_message_queue: BatchingQueue | None = None,
+        process_bar_event_message_queue: BatchingQueue | None = None,
+        trade_event_message_queue: BatchingQueue | None = None,
+        stop_event: threading.Event | None = None,
+        indicator_registry: IndicatorRegistry | None = None,
+        fill_rtype: Rtype | None = None,
+    ) -> None:
+        """
+        The queues and the stop event default to the module-level singletons.
+        Passing dedicated ones isolates strategy instances from each other.
+        Strategies that run on the same bars can share an indicator registry.
+        On a stream of several timeframes (see ResampledDatafeed), `fill_rtype`
+        restricts order fills to the bars of the finest one.
+        """
+        self.fill_rtype = fill_rtype
+        self.indicator_registry = (
+            IndicatorRegistry() if indicator_registry is None else indicator_registry
+        )
         self._instance_stop_event: threading.Event = threading.Event()
+        self._stop_event = stop_event or GLOBAL_STOP_EVENT
+        self.incoming_bar_event_message_queue = (
+            incoming_bar_event_message_queue
+            or global_queues.incoming_bar_event_message_queue
+        )
+        self.process_bar_event_message_queue = (
+            process_bar_event_message_queue
+            or global_queues.process_bar_event_message_queue
+        )
+        self.trade_event_message_queue = (
+            trade_event_message_queue or global_queues.trade_event_message_queue
+        )
 
-        self._pending_market_orders: dict[uuid.UUID, MarketOrderEventMessage] = {}
-        self._pending_limit_orders: dict[uuid.UUID, LimitOrderEventMessage] = {}
-        self._pending_stop_orders: dict[uuid.UUID, StopOrderEventMessage] = {}
+        self._pending_market_orders: dict[int, MarketOrderEventMessage] = {}
+        self._pending_limit_orders = PendingOrderBook(OrderType.LIMIT)
+        self._pending_stop_orders = PendingOrderBook(OrderType.STOP)
+        self._last_ts_event: int | None = None
+        self.performance_tracker = PerformanceTracker()
+
+    @property
+    def last_ts_event(self) -> int | None:
+        """
+        ts_event of the last processed bar, or None before the first bar.
+        """
+        return self._last_ts_event
+
+    def __getstate__(self) -> dict:
+        return {
+            name: value
+            for name, value in self.__dict__.items()
+            if name not in self._UNPICKLED_ATTRIBUTES
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._instance_stop_event = threading.Event()
+        self._stop_event = GLOBAL_STOP_EVENT
+        self.incoming_bar_event_message_queue = (
+            global_queues.incoming_bar_event_message_queue
+        )
+        self.process_bar_event_message_queue = (
+            global_queues.process_bar_event_message_queue
+        )
+        self.trade_event_message_queue = global_queues.trade_event_message_queue
+
+    def save_checkpoint(self, path_to_checkpoint: str) -> None:
+        """
+        Pickles the strategy's state, i.e. its indicators, pending orders and
+        the last processed ts_event, together with the next order and trade
+        ids. Queues, stop events and threads are not saved. Call it while the
+        strategy is not processing bars, e.g. after its thread has finished.
+        """
+        next_order_id, next_trade_id = get_next_ids()
+        checkpoint = {
+            "format_version": CHECKPOINT_FORMAT_VERSION,
+            "strategy": self,
+            "next_order_id": next_order_id,
+            "next_trade_id": next_trade_id,
+        }
+        with open(path_to_checkpoint + ".tmp", "wb") as checkpoint_file:
+            pickle.dump(checkpoint, checkpoint_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path_to_checkpoint + ".tmp", path_to_checkpoint)
+        logger.info(
+            f"Saved {type(self).__name__} checkpoint at ts_event "
+            f"{self._last_ts_event} to {path_to_checkpoint}"
+        )
+
+    @classmethod
+    def load_checkpoint(
+        cls,
+        path_to_checkpoint: str,
+        incoming_bar_event_message_queue: BatchingQueue | None = None,
+        process_bar_event_message_queue: BatchingQueue | None = None,
+        trade_event_message_queue: BatchingQueue | None = None,
+        stop_event: threading.Event | None = None,
+        restore_ids: bool = True,
+    ) -> "StrategiesABC":
+        """
+        Restores a strategy saved with save_checkpoint() and attaches the given
+        queues and stop event, which default to the module-level singletons.
+        With `restore_ids`, new order and trade ids continue where the saved
+        run stopped, so that resuming gives the same results as a full replay.
+        The ids never move backwards, though: if the process has already
+        handed out higher ids, e.g. to another strategy, they continue from
+        there instead, so ids stay unique.
+        Only load checkpoints from trusted sources, as they are pickles.
+        """
+        with open(path_to_checkpoint, "rb") as checkpoint_file:
+            checkpoint = pickle.load(checkpoint_file)
+        if checkpoint.get("format_version") != CHECKPOINT_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported checkpoint format version "
+                f"{checkpoint.get('format_version')} in {path_to_checkpoint}."
+            )
+        strategy = checkpoint["strategy"]
+        if not isinstance(strategy, cls):
+            raise TypeError(
+                f"Checkpoint {path_to_checkpoint} holds a "
+                f"{type(strategy).__name__}, not a {cls.__name__}."
+            )
+        if incoming_bar_event_message_queue is not None:
+            strategy.incoming_bar_event_message_queue = incoming_bar_event_message_queue
+        if process_bar_event_message_queue is not None:
+            strategy.process_bar_event_message_queue = process_bar_event_message_queue
+        if trade_event_message_queue is not None:
+            strategy.trade_event_message_queue = trade_event_message_queue
+        if stop_event is not None:
+            strategy._stop_event = stop_event
+        if restore_ids:
+            advance_next_ids(checkpoint["next_order_id"], checkpoint["next_trade_id"])
+        logger.info(
+            f"Loaded {type(strategy).__name__} checkpoint at ts_event "
+            f"{strategy.last_ts_event} from {path_to_checkpoint}"
+        )
+        return strategy
+
+    def register_indicator(
+        self,
+        indicator_class: type[ABCIndicator],
+        applied_on: str,
+        rtype: Rtype | None = None,
+        **parameters,
+    ) -> IndicatorView:
+        """
+        Returns a read-only view of an indicator that the strategy's registry
+        updates with every bar, or every bar of `rtype`, before on_bar() is
+        called.
+        """
+        return self.indicator_registry.register(
+            indicator_class, applied_on, rtype, **parameters
+        )
 
     def submit_order(self, order: OrderEventMessage) -> None:
         if order.order_type == OrderType.MARKET:
             self._pending_market_orders[order.order_id] = order
-            logger.info(f"Submitted market order {order.order_id}")
+            logger.info("Submitted market order %s", order.order_id)
         elif order.order_type == OrderType.LIMIT:
-            self._pending_limit_orders[order.order_id] = order
-            logger.info(f"Submitted limit order {order.order_id}")
+            self._pending_limit_orders.add(order)
+            logger.info("Submitted limit order %s", order.order_id)
         elif order.order_type == OrderType.STOP:
-            self._pending_stop_orders[order.order_id] = order
-            logger.info(f"Submitted stop order {order.order_id}")
+            self._pending_stop_orders.add(order)
+            logger.info("Submitted stop order %s", order.order_id)
         else:
             logger.error(f"Unknown order type: {order.order_type}")
+            return
+        if pipeline_metrics.enabled:
+            pipeline_metrics.increment("orders_submitted")
+
+    def cancel_order(self, order_id: int) -> bool:
+        if (
+            self._pending_market_orders.pop(order_id, None)
+            or self._pending_limit_orders.cancel(order_id)
+            or self._pending_stop_orders.cancel(order_id)
+        ):
+            logger.info("Cancelled order %s", order_id)
+            return True
+        logger.warning(f"Cannot cancel order {order_id}: no such pending order")
+        return False
+
+    def modify_order(self, order: OrderEventMessage) -> bool:
+        """
+        Replaces the pending order that has the same order_id as `order`.
+        """
+        if not self.cancel_order(order.order_id):
+            return False
+        self.submit_order(order)
+        return True
+
+    def _execute_order(
+        self,
+        order_to_execute: OrderEventMessage,
+        new_bar_event_message: IncomingBarEventMessage,
+        fill_price: float,
+    ) -> None:
+        executed_order: TradeEventMessage = TradeEventMessage(
+            ts_event=new_bar_event_message.ts_event,
+            trade_id=new_trade_id(),
+            assoc_order_id=order_to_execute.order_id,
+            trade_direction=order_to_execute.trade_direction,
+            quantity=order_to_execute.quantity,
+            fill_price=fill_price,
+            assoc_decision_type=order_to_execute.decision_type,
+            symbol=new_bar_event_message.symbol,
+        )
+        self.performance_tracker.update_trade(executed_order)
+        self.trade_event_message_queue.put(executed_order)
+        if pipeline_metrics.enabled:
+            pipeline_metrics.increment("orders_filled")
+        logger.info("Filled order: %s", executed_order)
 
     def _fill_orders(self, new_bar_event_message: IncomingBarEventMessage):
-        new_bar_event_message = new_bar_event_message
+        """
+        Fills the pending orders triggered by the bar. Orders that name a symbol
+        are only filled by bars of that symbol.
+        """
+        ohlcv = new_bar_event_message.ohlcv
+        symbol = new_bar_event_message.symbol
         for market_order in list(self._pending_market_orders.keys()):
             order_to_execute: MarketOrderEventMessage = self._pending_market_orders[
                 market_order
             ]
-            executed_order: TradeEventMessage = TradeEventMessage(
-                ts_event=new_bar_event_message.ts_event,
-                trade_id=uuid.uuid4(),
-                assoc_order_id=order_to_execute.order_id,
-                trade_direction=order_to_execute.trade_direction,
-                quantity=order_to_execute.quantity,
-                fill_price=new_bar_event_message.ohlcv.open,
-                assoc_decision_type=order_to_execute.decision_type,
-            )
-            trade_event_message_queue.put(executed_order)
-            logger.info(f"Filled order: {executed_order}")
+            if order_to_execute.symbol not in (None, symbol):
+                continue
+            self._execute_order(order_to_execute, new_bar_event_message, ohlcv.open)
             del self._pending_market_orders[market_order]
 
-        for limit_order in list(self._pending_limit_orders.keys()):
-            order_to_execute: LimitOrderEventMessage = self._pending_limit_orders[
-                limit_order
-            ]
-            if (order_to_execute.trade_direction == TradeDirection.BUY) and (
-                order_to_execute.limit_price >= new_bar_event_message.ohlcv.low
-            ):
-                executed_order: TradeEventMessage = TradeEventMessage(
-                    ts_event=new_bar_event_message.ts_event,
-                    trade_id=uuid.uuid4(),
-                    assoc_order_id=order_to_execute.order_id,
-                    trade_direction=order_to_execute.trade_direction,
-                    quantity=order_to_execute.quantity,
-                    fill_price=order_to_execute.limit_price,
-                    assoc_decision_type=order_to_execute.decision_type,
-                )
-                trade_event_message_queue.put(executed_order)
-                logger.info(f"Filled order: {executed_order}")
-                del self._pending_limit_orders[limit_order]
-            elif (order_to_execute.trade_direction == TradeDirection.SELL) and (
-                order_to_execute.limit_price <= new_bar_event_message.ohlcv.high
-            ):
-                executed_order: TradeEventMessage = TradeEventMessage(
-                    ts_event=new_bar_event_message.ts_event,
-                    trade_id=uuid.uuid4(),
-                    assoc_order_id=order_to_execute.order_id,
-                    trade_direction=order_to_execute.trade_direction,
-                    quantity=order_to_execute.quantity,
-                    fill_price=order_to_execute.limit_price,
-                    assoc_decision_type=order_to_execute.decision_type,
-                )
-                trade_event_message_queue.put(executed_order)
-                logger.info(f"Filled order: {executed_order}")
-                del self._pending_limit_orders[limit_order]
+        for order_to_execute in self._pending_limit_orders.pop_triggered(
+            ohlcv.low, ohlcv.high, symbol
+        ):
+            self._execute_order(
+                order_to_execute, new_bar_event_message, order_to_execute.limit_price
+            )
 
-        for stop_order in list(self._pending_stop_orders.keys()):
-            order_to_execute: StopOrderEventMessage = self._pending_stop_orders[
-                stop_order
-            ]
-            if (order_to_execute.trade_direction == TradeDirection.BUY) and (
-                new_bar_event_message.ohlcv.high >= order_to_execute.stop_price
-            ):
-                executed_order: TradeEventMessage = TradeEventMessage(
-                    ts_event=new_bar_event_message.ts_event,
-                    trade_id=uuid.uuid4(),
-                    assoc_order_id=order_to_execute.order_id,
-                    trade_direction=order_to_execute.trade_direction,
-                    quantity=order_to_execute.quantity,
-                    fill_price=max(
-                        order_to_execute.stop_price, new_bar_event_message.ohlcv.open
-                    ),
-                    assoc_decision_type=order_to_execute.decision_type,
-                )
-                trade_event_message_queue.put(executed_order)
-                logger.info(f"Filled order: {executed_order}")
-                del self._pending_stop_orders[stop_order]
-            elif (order_to_execute.trade_direction == TradeDirection.SELL) and (
-                new_bar_event_message.ohlcv.low <= order_to_execute.stop_price
-            ):
-                executed_order: TradeEventMessage = TradeEventMessage(
-                    ts_event=new_bar_event_message.ts_event,
-                    trade_id=uuid.uuid4(),
-                    assoc_order_id=order_to_execute.order_id,
-                    trade_direction=order_to_execute.trade_direction,
-                    quantity=order_to_execute.quantity,
-                    fill_price=min(
-                        order_to_execute.stop_price, new_bar_event_message.ohlcv.open
-                    ),
-                    assoc_decision_type=order_to_execute.decision_type,
-                )
-                trade_event_message_queue.put(executed_order)
-                logger.info(f"Filled order: {executed_order}")
-                del self._pending_stop_orders[stop_order]
+        for order_to_execute in self._pending_stop_orders.pop_triggered(
+            ohlcv.low, ohlcv.high, symbol
+        ):
+            if order_to_execute.trade_direction == TradeDirection.BUY:
+                fill_price = max(order_to_execute.stop_price, ohlcv.open)
+            else:
+                fill_price = min(order_to_execute.stop_price, ohlcv.open)
+            self._execute_order(order_to_execute, new_bar_event_message, fill_price)
 
     @abc.abstractmethod
     def on_bar(self, new_bar_event_message: IncomingBarEventMessage):
         pass
 
-    def _run_strategy(self) -> None:
-        while not (GLOBAL_STOP_EVENT.is_set() or self._instance_stop_event.is_set()):
-            try:
-                new_bar_event_message = (
-                    incoming_bar_event_message_queue.get()
-                )  # blocking call
-                if not isinstance(new_bar_event_message, IncomingBarEventMessage):
-                    logger.error("Received non-bar event message from the queue.")
-                    continue
-                logger.debug(f"Received {new_bar_event_message}")
+    def generate_vectorized_orders(self, bars: BarArrays) -> VectorizedOrders:
+        """
+        Computes the orders the strategy would submit on every bar of `bars` at
+        once. Implementing this method allows the strategy to be run by the
+        VectorizedBacktestEngine.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support vectorized backtesting."
+        )
+
+    def _process_bar(self, new_bar_event_message: IncomingBarEventMessage) -> None:
+        self._last_ts_event = new_bar_event_message.ts_event
+        fills_orders = (
+            self.fill_rtype is None or new_bar_event_message.rtype == self.fill_rtype
+        )
+        if not pipeline_metrics.enabled:
+            if fills_orders:
                 self._fill_orders(new_bar_event_message)
-                self.on_bar(new_bar_event_message)
-            except Exception as e:
-                logger.error(f"Error processing bar event message: {e}")
+                self.performance_tracker.update_bar(new_bar_event_message)
+            self.indicator_registry.update(new_bar_event_message)
+            self.on_bar(new_bar_event_message)
+            return
+        if fills_orders:
+            fill_start_ns = time.perf_counter_ns()
+            self._fill_orders(new_bar_event_message)
+            update_performance_start_ns = time.perf_counter_ns()
+            self.performance_tracker.update_bar(new_bar_event_message)
+            pipeline_metrics.record_duration(
+                "strategy.fill_orders", update_performance_start_ns - fill_start_ns
+            )
+            pipeline_metrics.record_duration(
+                "strategy.update_performance",
+                time.perf_counter_ns() - update_performance_start_ns,
+            )
+        on_bar_start_ns = time.perf_counter_ns()
+        self.indicator_registry.update(new_bar_event_message)
+        self.on_bar(new_bar_event_message)
+        pipeline_metrics.record_duration(
+            "strategy.on_bar", time.perf_counter_ns() - on_bar_start_ns
+        )
+        pipeline_metrics.increment("bars_processed")
+
+    def _process_bar_block(
+        self, new_bar_block_event_message: IncomingBarBlockEventMessage
+    ) -> None:
+        """
+        Processes a block of bars. The default implementation processes the
+        bars one by one; strategies can override it to work on the arrays.
+        """
+        bar_event_messages = new_bar_block_event_message.iter_bar_event_messages()
+        for new_bar_event_message in bar_event_messages:
+            self._process_bar(new_bar_event_message)
+
+    def _run_strategy(self) -> None:
+        metrics_enabled = pipeline_metrics.enabled
+        if metrics_enabled:
+            pipeline_metrics.start()
+        while not (self._stop_event.is_set() or self._instance_stop_event.is_set()):
+            if metrics_enabled:
+                wait_start_ns = time.perf_counter_ns()
+            new_bar_event_messages = (
+                self.incoming_bar_event_message_queue.get_many()
+            )  # blocking call
+            if metrics_enabled:
+                pipeline_metrics.record_duration(
+                    "strategy.queue_wait", time.perf_counter_ns() - wait_start_ns
+                )
+                pipeline_metrics.record_queue_depth(
+                    "process_bar_event_message_queue",
+                    self.process_bar_event_message_queue.qsize(),
+                )
+                pipeline_metrics.record_queue_depth(
+                    "trade_event_message_queue",
+                    self.trade_event_message_queue.qsize(),
+                )
+            for new_bar_event_message in new_bar_event_messages:
+                if new_bar_event_message is END_OF_STREAM:
+                    logger.info("End of incoming bar event message stream reached")
+                    self._instance_stop_event.set()
+                    break
+                try:
+                    if isinstance(new_bar_event_message, IncomingBarEventMessage):
+                        logger.debug("Received %s", new_bar_event_message)
+                        self._process_bar(new_bar_event_message)
+                    elif isinstance(
+                        new_bar_event_message, IncomingBarBlockEventMessage
+                    ):
+                        logger.debug(
+                            "Received block of %s bars", len(new_bar_event_message)
+                        )
+                        self._process_bar_block(new_bar_event_message)
+                    else:
+                        logger.error("Received non-bar event message from the queue.")
+                except Exception as e:
+                    logger.error(f"Error processing bar event message: {e}")
+        self.process_bar_event_message_queue.flush()
+        self.trade_event_message_queue.flush()
+        if metrics_enabled:
+            pipeline_metrics.stop()
+            pipeline_metrics.log_summary()
 
     def run_strategy(self):
         self.strategy_thread = threading.Thread(
@@ -166,20 +408,22 @@ class StrategiesABC(abc.ABC):
 
 class Strategy1(StrategiesABC):
 
-    def __init__(self):
-        super().__init__()
-        # Step 1: Define indicators that are used in strategy:
-        self.sma_fast = SimpleMovingAverage(10, "close")
-        self.sma_slow = SimpleMovingAverage(100, "close")
+    def __init__(self, fast_period: int = 10, slow_period: int = 100, **kwargs):
+        super().__init__(**kwargs)
+        # Step 1: Define indicators that are used in strategy. The registry
+        # updates them at each new bar.
+        self.sma_fast = self.register_indicator(
+            SimpleMovingAverage, "close", period=fast_period
+        )
+        self.sma_slow = self.register_indicator(
+            SimpleMovingAverage, "close", period=slow_period
+        )
 
     def on_bar(self, new_bar_event_message: IncomingBarEventMessage):
-        # Step 2: At each new bar, update indicators
-        self.sma_fast.update(new_bar_event_message.ohlcv.close)
-        self.sma_slow.update(new_bar_event_message.ohlcv.close)
-
         indicator_values: dict[str, float] = {
             f"{self.sma_fast.name}": self.sma_fast[0],
             f"{self.sma_slow.name}": self.sma_slow[0],
+            **self.performance_tracker.indicator_values(new_bar_event_message.symbol),
         }
 
         processed_bar_event_message: ProcessedBarEventMessage = (
@@ -193,21 +437,33 @@ class Strategy1(StrategiesABC):
             )
         )
 
-        process_bar_event_message_queue.put(processed_bar_event_message)
-        logger.info(f"Enqueued {processed_bar_event_message}")
+        self.process_bar_event_message_queue.put(processed_bar_event_message)
+        logger.info("Enqueued %s", processed_bar_event_message)
 
-        # Step 3: Define the trading logic
+        # Step 2: Define the trading logic
         if self.sma_slow[0] < self.sma_fast[0] < new_bar_event_message.ohlcv.high:
             self.submit_order(
                 MarketOrderEventMessage(
                     ts_event=new_bar_event_message.ts_event,
-                    order_id=uuid.uuid4(),
+                    order_id=new_order_id(),
                     trade_direction=TradeDirection.SELL,
                     quantity=1,
                     decision_type=DecisionType.SHORT_ENTRY,
+                    symbol=new_bar_event_message.symbol,
                 )
             )
 
+    def generate_vectorized_orders(self, bars: BarArrays) -> VectorizedOrders:
+        indicator_series = self.indicator_registry.update_many(bars)
+        sma_fast = indicator_series[self.sma_fast.key]
+        sma_slow = indicator_series[self.sma_slow.key]
+        return VectorizedOrders.from_signal(
+            (sma_slow < sma_fast) & (sma_fast < bars.high),
+            trade_direction=TradeDirection.SELL,
+            quantity=1,
+            decision_type=DecisionType.SHORT_ENTRY,
+        )
+
     # To work on next time:
     # Fix up the logging everywhere
     # Make the trades queue
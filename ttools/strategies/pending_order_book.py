@@ -0,0 +1,129 @@
+import heapq
+from collections.abc import Iterator
+from ttools.ontology.enum_defs import OrderType, TradeDirection
+from ttools.ontology.event_messages import (
+    LimitOrderEventMessage,
+    StopOrderEventMessage,
+)
+
+
+class PendingOrderBook:
+    """
+    Pending limit or stop orders indexed by price. Each trade direction has a
+    heap ordered so that the order closest to being triggered is on top, which
+    means a bar only visits the orders it actually fills. Cancelled and
+    replaced orders are dropped from the heaps lazily, so adding, cancelling
+    and modifying orders are O(log n) by order id.
+
+    Orders for a specific symbol are kept in separate heaps, so a bar of one
+    symbol never visits the orders of another. Orders without a symbol are
+    triggered by bars of any symbol.
+    """
+
+    # Heap keys are the price for orders triggered by bars trading at or below
+    # it and the negated price for orders triggered at or above it.
+    _DESCENDING = {
+        OrderType.LIMIT: {TradeDirection.BUY: True, TradeDirection.SELL: False},
+        OrderType.STOP: {TradeDirection.BUY: False, TradeDirection.SELL: True},
+    }
+
+    def __init__(self, order_type: OrderType):
+        if order_type not in self._DESCENDING:
+            raise ValueError(f"No pending order book for order type {order_type}.")
+        self.order_type = order_type
+        self._price_attribute = (
+            "limit_price" if order_type == OrderType.LIMIT else "stop_price"
+        )
+        self._descending = self._DESCENDING[order_type]
+        self._orders: dict[
+            int, tuple[int, LimitOrderEventMessage | StopOrderEventMessage]
+        ] = {}
+        self._heaps: dict[
+            tuple[str | None, TradeDirection], list[tuple[float, int, int]]
+        ] = {}
+        self._next_sequence = 0
+        self._stale_entry_count = 0
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def __contains__(self, order_id) -> bool:
+        return order_id in self._orders
+
+    def __getitem__(self, order_id) -> LimitOrderEventMessage | StopOrderEventMessage:
+        return self._orders[order_id][1]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._orders)
+
+    def keys(self):
+        return self._orders.keys()
+
+    def values(self) -> list[LimitOrderEventMessage | StopOrderEventMessage]:
+        return [order for _, order in self._orders.values()]
+
+    def add(self, order: LimitOrderEventMessage | StopOrderEventMessage) -> None:
+        """
+        Adds an order to the book. An order with the same order id that is
+        already pending is replaced.
+        """
+        self.cancel(order.order_id)
+        sequence = self._next_sequence
+        self._next_sequence += 1
+        price = getattr(order, self._price_attribute)
+        key = -price if self._descending[order.trade_direction] else price
+        self._orders[order.order_id] = (sequence, order)
+        heap = self._heaps.setdefault((order.symbol, order.trade_direction), [])
+        heapq.heappush(heap, (key, sequence, order.order_id))
+
+    def cancel(self, order_id) -> LimitOrderEventMessage | StopOrderEventMessage | None:
+        entry = self._orders.pop(order_id, None)
+        if entry is None:
+            return None
+        self._stale_entry_count += 1
+        if self._stale_entry_count > max(64, len(self._orders)):
+            self._rebuild_heaps()
+        return entry[1]
+
+    def _rebuild_heaps(self) -> None:
+        for heap in self._heaps.values():
+            heap[:] = [
+                entry
+                for entry in heap
+                if self._orders.get(entry[2], (None,))[0] == entry[1]
+            ]
+            heapq.heapify(heap)
+        self._stale_entry_count = 0
+
+    def pop_triggered(
+        self, low: float, high: float, symbol: str | None = None
+    ) -> list[LimitOrderEventMessage | StopOrderEventMessage]:
+        """
+        Removes and returns all orders triggered by a bar of `symbol` with the
+        given low and high, in the order in which they were added.
+        """
+        triggered = []
+        heap_keys = [
+            (heap_symbol, trade_direction)
+            for heap_symbol in ((None,) if symbol is None else (None, symbol))
+            for trade_direction in self._descending
+        ]
+        for heap_key in heap_keys:
+            heap = self._heaps.get(heap_key)
+            if not heap:
+                continue
+            bound = -low if self._descending[heap_key[1]] else high
+            while heap:
+                key, sequence, order_id = heap[0]
+                entry = self._orders.get(order_id)
+                if entry is None or entry[0] != sequence:
+                    heapq.heappop(heap)
+                    self._stale_entry_count -= 1
+                    continue
+                if key > bound:
+                    break
+                heapq.heappop(heap)
+                del self._orders[order_id]
+                triggered.append(entry)
+        triggered.sort(key=lambda entry: entry[0])
+        return [order for _, order in triggered]
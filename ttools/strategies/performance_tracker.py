@@ -0,0 +1,311 @@
+import numpy as np
+from ttools.ontology.bar_arrays import BarArrays
+from ttools.ontology.enum_defs import TradeDirection
+from ttools.ontology.event_messages import IncomingBarEventMessage, TradeEventMessage
+
+# Keys of PerformanceTracker.indicator_values(), as they appear among the
+# indicator values of processed bars.
+PERFORMANCE_INDICATOR_NAMES = (
+    "position",
+    "average_entry_price",
+    "realized_pnl",
+    "unrealized_pnl",
+    "equity",
+    "high_water_mark",
+    "max_drawdown",
+)
+
+
+class _SymbolPerformance:
+    __slots__ = (
+        "position",
+        "average_entry_price",
+        "mark_price",
+        "unrealized_pnl",
+    )
+
+    def __init__(self):
+        self.position = 0
+        self.average_entry_price = float("nan")
+        self.mark_price = float("nan")
+        self.unrealized_pnl = 0.0
+
+
+class PerformanceTracker:
+    """
+    Tracks a strategy's position and PnL from its fills and marks them to
+    market at every bar's close, in O(1) per fill and per bar. Positions and
+    average entry prices (average cost method) are kept per symbol; PnL,
+    equity, its high-water mark and the maximum drawdown are totals over all
+    symbols, in price units times `multiplier`. Equity is evaluated at bar
+    closes only. summarize_performance() computes the same numbers from the
+    bars and fills of a whole run.
+    """
+
+    def __init__(self, multiplier: float = 1.0):
+        self.multiplier = multiplier
+        self._symbols: dict[str | None, _SymbolPerformance] = {}
+        self.realized_pnl = 0.0
+        self.unrealized_pnl = 0.0
+        self.high_water_mark = 0.0
+        self.max_drawdown = 0.0
+
+    def _symbol_performance(self, symbol: str | None) -> _SymbolPerformance:
+        symbol_performance = self._symbols.get(symbol)
+        if symbol_performance is None:
+            symbol_performance = self._symbols[symbol] = _SymbolPerformance()
+        return symbol_performance
+
+    @property
+    def equity(self) -> float:
+        return self.realized_pnl + self.unrealized_pnl
+
+    def position(self, symbol: str | None = None) -> int:
+        symbol_performance = self._symbols.get(symbol)
+        return 0 if symbol_performance is None else symbol_performance.position
+
+    def _mark(self, symbol_performance: _SymbolPerformance) -> None:
+        unrealized_pnl = (
+            symbol_performance.position
+            * (symbol_performance.mark_price - symbol_performance.average_entry_price)
+            * self.multiplier
+            if symbol_performance.position
+            else 0.0
+        )
+        self.unrealized_pnl += unrealized_pnl - symbol_performance.unrealized_pnl
+        symbol_performance.unrealized_pnl = unrealized_pnl
+
+    def update_trade(self, trade_event_message: TradeEventMessage) -> None:
+        symbol_performance = self._symbol_performance(trade_event_message.symbol)
+        position = symbol_performance.position
+        fill_price = trade_event_message.fill_price
+        quantity = (
+            trade_event_message.quantity
+            if trade_event_message.trade_direction == TradeDirection.BUY
+            else -trade_event_message.quantity
+        )
+        new_position = position + quantity
+
+        if position == 0 or (position > 0) == (quantity > 0):
+            symbol_performance.average_entry_price = (
+                fill_price
+                if position == 0
+                else (
+                    symbol_performance.average_entry_price * position
+                    + fill_price * quantity
+                )
+                / new_position
+            )
+        else:
+            closed_quantity = min(abs(quantity), abs(position))
+            self.realized_pnl += (
+                closed_quantity
+                * (fill_price - symbol_performance.average_entry_price)
+                * (1 if position > 0 else -1)
+                * self.multiplier
+            )
+            if new_position == 0:
+                symbol_performance.average_entry_price = float("nan")
+            elif (new_position > 0) != (position > 0):
+                symbol_performance.average_entry_price = fill_price
+        symbol_performance.position = new_position
+        if symbol_performance.mark_price != symbol_performance.mark_price:
+            symbol_performance.mark_price = fill_price
+        self._mark(symbol_performance)
+
+    def update_bar(self, new_bar_event_message: IncomingBarEventMessage) -> None:
+        symbol_performance = self._symbol_performance(new_bar_event_message.symbol)
+        symbol_performance.mark_price = new_bar_event_message.ohlcv.close
+        if symbol_performance.position or symbol_performance.unrealized_pnl:
+            self._mark(symbol_performance)
+        equity = self.realized_pnl + self.unrealized_pnl
+        if equity > self.high_water_mark:
+            self.high_water_mark = equity
+        elif self.high_water_mark - equity > self.max_drawdown:
+            self.max_drawdown = self.high_water_mark - equity
+
+    def indicator_values(self, symbol: str | None = None) -> dict[str, float]:
+        """
+        The current values for the processed bar of `symbol`, keyed by
+        PERFORMANCE_INDICATOR_NAMES.
+        """
+        symbol_performance = self._symbols.get(symbol) or _SymbolPerformance()
+        return {
+            "position": symbol_performance.position,
+            "average_entry_price": symbol_performance.average_entry_price,
+            "realized_pnl": self.realized_pnl,
+            "unrealized_pnl": self.unrealized_pnl,
+            "equity": self.realized_pnl + self.unrealized_pnl,
+            "high_water_mark": self.high_water_mark,
+            "max_drawdown": self.max_drawdown,
+        }
+
+    def summary(self) -> dict:
+        return {
+            "positions": {
+                symbol: symbol_performance.position
+                for symbol, symbol_performance in self._symbols.items()
+            },
+            "realized_pnl": self.realized_pnl,
+            "unrealized_pnl": self.unrealized_pnl,
+            "equity": self.equity,
+            "high_water_mark": self.high_water_mark,
+            "max_drawdown": self.max_drawdown,
+        }
+
+
+def _segment_cumsum(values: np.ndarray, segment_start: np.ndarray) -> np.ndarray:
+    """
+    Cumulative sums of `values` that restart wherever `segment_start` is True,
+    which it must be at index 0.
+    """
+    cumulative_sum = np.cumsum(values)
+    segment_first = np.maximum.accumulate(
+        np.where(segment_start, np.arange(len(values)), 0)
+    )
+    return cumulative_sum - (cumulative_sum - values)[segment_first]
+
+
+def _average_entry_prices(
+    symbol_codes: np.ndarray,
+    quantities: np.ndarray,
+    fill_prices: np.ndarray,
+    symbol_count: int,
+) -> np.ndarray:
+    """
+    Average entry price (average cost method) of the position left in every
+    symbol by the signed fills, which are ordered by symbol code and then by
+    time. A fill that opens a position or flips its sign restarts the average,
+    an adding fill mixes its price in and a reducing fill scales down the
+    weight of all earlier fills. So the average is a weighted mean of the
+    fills since the last opening one, weighted by their quantities times the
+    product of the later reduction factors, taken as a cumulative log sum.
+    """
+    fill_count = len(quantities)
+    first_of_symbol = np.ones(fill_count, dtype=bool)
+    first_of_symbol[1:] = symbol_codes[1:] != symbol_codes[:-1]
+    positions = _segment_cumsum(quantities, first_of_symbol)
+    positions_before = positions - quantities
+    opens = (positions_before == 0) | (
+        np.sign(positions) * np.sign(positions_before) < 0
+    )
+    adds = ~opens & (np.sign(quantities) == np.sign(positions_before))
+    # Reductions to zero are followed by an opening fill, if any.
+    reduces = ~opens & ~adds & (positions != 0)
+    log_reduction = np.zeros(fill_count)
+    log_reduction[reduces] = np.log(positions[reduces] / positions_before[reduces])
+    cumulative_log_reduction = np.cumsum(log_reduction)
+
+    fill_index = np.arange(fill_count)
+    last_fill_of_symbol = np.flatnonzero(np.append(first_of_symbol[1:], True))
+    last_fill = last_fill_of_symbol[np.cumsum(first_of_symbol) - 1]
+    # The first fill of every symbol opens a position.
+    last_open = np.maximum.accumulate(np.where(opens, fill_index, 0))
+    weights = np.where(opens, positions, quantities) * np.exp(
+        cumulative_log_reduction[last_fill] - cumulative_log_reduction
+    )
+    weights[(last_open != last_open[last_fill]) | ~(opens | adds)] = 0.0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.bincount(
+            symbol_codes, weights * fill_prices, symbol_count
+        ) / np.bincount(symbol_codes, weights, symbol_count)
+
+
+def summarize_performance(
+    bars: BarArrays, trades: list[TradeEventMessage], multiplier: float = 1.0
+) -> dict:
+    """
+    Computes the values of PerformanceTracker.summary() after a run from the
+    run's bars and fills at once. Per-symbol positions are cumulative sums of
+    the fills, the cash is their total, and the market value of all positions
+    changes only at the bars of the symbol whose close or position changes,
+    so equity at every bar's close is a cumulative sum as well. Every fill
+    must have happened on one of `bars`.
+    """
+    bar_count = len(bars)
+    if not bar_count:
+        return {
+            "positions": {},
+            "realized_pnl": 0.0,
+            "unrealized_pnl": 0.0,
+            "equity": 0.0,
+            "high_water_mark": 0.0,
+            "max_drawdown": 0.0,
+        }
+    symbols, bar_symbol_codes = np.unique(bars.symbol.astype(str), return_inverse=True)
+    trade_symbol_codes = np.searchsorted(
+        symbols, np.array([str(trade.symbol) for trade in trades], dtype=str)
+    ).astype(np.int64)
+    trade_ts_event = np.array([trade.ts_event for trade in trades], dtype=np.int64)
+    quantities = np.array(
+        [
+            (
+                trade.quantity
+                if trade.trade_direction == TradeDirection.BUY
+                else -trade.quantity
+            )
+            for trade in trades
+        ],
+        dtype=np.int64,
+    )
+    fill_prices = np.array([trade.fill_price for trade in trades], dtype=np.float64)
+
+    # Bars by symbol and then by time. A fill happens on the first bar of its
+    # symbol at its ts_event, found via keys of symbol code and ts_event rank.
+    by_symbol = np.argsort(bar_symbol_codes, kind="stable")
+    ts_events, ts_event_ranks = np.unique(
+        np.concatenate((bars.ts_event, trade_ts_event)), return_inverse=True
+    )
+    bar_keys = (
+        bar_symbol_codes[by_symbol] * len(ts_events)
+        + ts_event_ranks[:bar_count][by_symbol]
+    )
+    trade_keys = trade_symbol_codes * len(ts_events) + ts_event_ranks[bar_count:]
+    fill_bar_index = by_symbol[np.searchsorted(bar_keys, trade_keys, side="left")]
+
+    position_change = np.zeros(bar_count, dtype=np.int64)
+    np.add.at(position_change, fill_bar_index, quantities)
+    cash = np.cumsum(np.bincount(fill_bar_index, -quantities * fill_prices, bar_count))
+    first_of_symbol = np.ones(bar_count, dtype=bool)
+    first_of_symbol[1:] = bar_symbol_codes[by_symbol][1:] != (
+        bar_symbol_codes[by_symbol][:-1]
+    )
+    symbol_positions = _segment_cumsum(position_change[by_symbol], first_of_symbol)
+    symbol_values = symbol_positions * bars.close[by_symbol]
+    value_change = np.empty(bar_count)
+    value_change[by_symbol] = symbol_values - np.where(
+        first_of_symbol, 0.0, np.roll(symbol_values, 1)
+    )
+    equity = (cash + np.cumsum(value_change)) * multiplier
+
+    last_bar_of_symbol = np.flatnonzero(np.append(first_of_symbol[1:], True))
+    final_positions = symbol_positions[last_bar_of_symbol]
+    trade_order = np.argsort(trade_symbol_codes, kind="stable")
+    average_entry_prices = _average_entry_prices(
+        trade_symbol_codes[trade_order],
+        quantities[trade_order],
+        fill_prices[trade_order],
+        len(symbols),
+    )
+    is_open = final_positions != 0
+    unrealized_pnl = float(
+        np.sum(
+            final_positions[is_open]
+            * (
+                bars.close[by_symbol][last_bar_of_symbol][is_open]
+                - average_entry_prices[is_open]
+            )
+        )
+        * multiplier
+    )
+
+    high_water_mark = np.maximum.accumulate(np.maximum(equity, 0.0))
+    final_equity = float(equity[-1])
+    return {
+        "positions": dict(zip(symbols.tolist(), final_positions.tolist())),
+        "realized_pnl": final_equity - unrealized_pnl,
+        "unrealized_pnl": unrealized_pnl,
+        "equity": final_equity,
+        "high_water_mark": float(high_water_mark[-1]),
+        "max_drawdown": float(np.max(high_water_mark - equity)),
+    }
@@ -0,0 +1,39 @@
+from ttools.ontology.event_messages import IncomingBarEventMessage
+from ttools.strategies.abc_strategies import StrategiesABC
+
+
+class StrategyGroup(StrategiesABC):
+    """
+    Runs several strategies on the same stream of bars in one thread. The
+    strategies must have been created with the same `indicator_registry`, so
+    an indicator that several of them register is computed once per bar.
+
+    The group consumes the incoming queue; the strategies put their processed
+    bars and trades to their own output queues.
+    """
+
+    def __init__(self, strategies: list[StrategiesABC], **kwargs):
+        if len({id(strategy.indicator_registry) for strategy in strategies}) > 1:
+            raise ValueError(
+                "The strategies of a StrategyGroup must share one IndicatorRegistry."
+            )
+        super().__init__(
+            indicator_registry=(
+                strategies[0].indicator_registry if strategies else None
+            ),
+            **kwargs,
+        )
+        self.strategies = strategies
+
+    def _process_bar(self, new_bar_event_message: IncomingBarEventMessage) -> None:
+        for strategy in self.strategies:
+            strategy._process_bar(new_bar_event_message)
+
+    def on_bar(self, new_bar_event_message: IncomingBarEventMessage):
+        pass
+
+    def _run_strategy(self) -> None:
+        super()._run_strategy()
+        for strategy in self.strategies:
+            strategy.process_bar_event_message_queue.flush()
+            strategy.trade_event_message_queue.flush()
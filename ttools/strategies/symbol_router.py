@@ -0,0 +1,54 @@
+from collections.abc import Callable
+from ttools.ontology.event_messages import IncomingBarEventMessage
+from ttools.strategies.abc_strategies import StrategiesABC
+from ttools.logging_config import logger
+
+
+class SymbolRouter(StrategiesABC):
+    """
+    Dispatches every bar of a multi-symbol stream to the strategy instance that
+    trades its symbol, so one pass over the data drives a whole basket. The
+    instances are looked up in `strategies`; for other symbols one is created
+    with `strategy_factory(symbol)` if given, otherwise their bars are dropped.
+
+    The router consumes the incoming queue; the routed strategies put their
+    processed bars and trades to their own output queues.
+    """
+
+    def __init__(
+        self,
+        strategies: dict[str, StrategiesABC] | None = None,
+        strategy_factory: Callable[[str], StrategiesABC] | None = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.strategies: dict[str, StrategiesABC] = dict(strategies or {})
+        self.strategy_factory = strategy_factory
+        self._unrouted_symbols: set[str] = set()
+
+    def _get_strategy(self, symbol: str) -> StrategiesABC | None:
+        strategy = self.strategies.get(symbol)
+        if strategy is None and self.strategy_factory is not None:
+            strategy = self.strategies[symbol] = self.strategy_factory(symbol)
+            logger.info(f"Created {type(strategy).__name__} for {symbol}")
+        return strategy
+
+    def _process_bar(self, new_bar_event_message: IncomingBarEventMessage) -> None:
+        strategy = self._get_strategy(new_bar_event_message.symbol)
+        if strategy is not None:
+            strategy._process_bar(new_bar_event_message)
+        elif new_bar_event_message.symbol not in self._unrouted_symbols:
+            self._unrouted_symbols.add(new_bar_event_message.symbol)
+            logger.warning(
+                f"No strategy for symbol {new_bar_event_message.symbol}, "
+                f"dropping its bars"
+            )
+
+    def on_bar(self, new_bar_event_message: IncomingBarEventMessage):
+        pass
+
+    def _run_strategy(self) -> None:
+        super()._run_strategy()
+        for strategy in self.strategies.values():
+            strategy.process_bar_event_message_queue.flush()
+            strategy.trade_event_message_queue.flush()
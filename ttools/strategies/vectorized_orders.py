@@ -0,0 +1,60 @@
+import dataclasses
+import numpy as np
+from ttools.ontology.enum_defs import DecisionType, OrderType, TradeDirection
+
+
+@dataclasses.dataclass(frozen=True)
+class VectorizedOrders:
+    """
+    Orders generated by a strategy for a whole array of bars (one element per
+    order). `bar_index` is the index of the bar on whose close the order was
+    submitted; `price` is the limit or stop price and NaN for market orders.
+    """
+
+    bar_index: np.ndarray  # int64
+    trade_direction: np.ndarray  # object (TradeDirection)
+    quantity: np.ndarray  # int64
+    decision_type: np.ndarray  # object (DecisionType)
+    order_type: np.ndarray  # object (OrderType)
+    price: np.ndarray  # float64
+
+    @classmethod
+    def from_signal(
+        cls,
+        signal: np.ndarray,
+        trade_direction: TradeDirection,
+        quantity: int,
+        decision_type: DecisionType,
+        order_type: OrderType = OrderType.MARKET,
+        price: np.ndarray | float = np.nan,
+    ) -> "VectorizedOrders":
+        """
+        Creates one order for every bar for which the boolean `signal` is True.
+        `price` is either a scalar or an array aligned with `signal`.
+        """
+        bar_index = np.flatnonzero(signal)
+        price = np.broadcast_to(np.asarray(price, dtype=float), np.shape(signal))
+        return cls(
+            bar_index=bar_index,
+            trade_direction=np.full(len(bar_index), trade_direction, dtype=object),
+            quantity=np.full(len(bar_index), quantity, dtype=np.int64),
+            decision_type=np.full(len(bar_index), decision_type, dtype=object),
+            order_type=np.full(len(bar_index), order_type, dtype=object),
+            price=price[bar_index],
+        )
+
+    @classmethod
+    def concatenate(cls, *orders: "VectorizedOrders") -> "VectorizedOrders":
+        """
+        Merges several order arrays. Orders submitted on the same bar keep the
+        order in which they are passed, as if submitted one after another.
+        """
+        columns = {
+            field.name: np.concatenate([getattr(o, field.name) for o in orders])
+            for field in dataclasses.fields(cls)
+        }
+        sort_order = np.argsort(columns["bar_index"], kind="stable")
+        return cls(**{name: values[sort_order] for name, values in columns.items()})
+
+    def __len__(self) -> int:
+        return len(self.bar_index)
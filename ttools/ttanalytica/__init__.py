@@ -0,0 +1,2 @@
+from .ttanalytica_writer import *
+from .trade_charts import *
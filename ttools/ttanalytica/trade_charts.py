@@ -0,0 +1,241 @@
+import concurrent.futures
+import multiprocessing
+import os
+import numpy as np
+import pandas as pd
+from ttools.ontology.enum_defs import TradeDirection
+from ttools.strategies.performance_tracker import PERFORMANCE_INDICATOR_NAMES
+from ttools.logging_config import logger
+
+NANOSECONDS_PER_DAY = 86_400 * 10**9
+
+
+class _TradeChart:
+    """
+    One figure per worker process whose artists are updated in place for
+    every chart, rather than creating a new figure per trade.
+    """
+
+    def __init__(self, width: float, height: float, dpi: int):
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.dates
+        import matplotlib.pyplot as plt
+        from matplotlib.collections import LineCollection
+
+        self.figure, self.ax = plt.subplots(figsize=(width, height), dpi=dpi)
+        self.ax.xaxis.set_major_formatter(
+            matplotlib.dates.DateFormatter("%Y-%m-%d %H:%M:%S")
+        )
+        self.figure.autofmt_xdate()
+        self.bar_ranges = LineCollection([], colors="grey", linewidths=1)
+        self.ax.add_collection(self.bar_ranges)
+        (self.close_line,) = self.ax.plot([], [], color="black", linewidth=1)
+        (self.trade_marker,) = self.ax.plot([], [], linestyle="", markersize=10)
+        self.trade_line = self.ax.axvline(0, color="tab:blue", linewidth=0.8)
+        self.indicator_lines: dict = {}
+        self.title = self.ax.set_title("")
+
+    def render(self, path: str, trade: dict, window: dict[str, np.ndarray]) -> None:
+        # Matplotlib dates are days since the UNIX epoch.
+        x = window["ts_event"] / NANOSECONDS_PER_DAY
+        self.bar_ranges.set_segments(
+            np.stack(
+                [
+                    np.column_stack([x, window["low"]]),
+                    np.column_stack([x, window["high"]]),
+                ],
+                axis=1,
+            )
+        )
+        self.close_line.set_data(x, window["close"])
+
+        for name, line in self.indicator_lines.items():
+            line.set_visible(name in window)
+        for name, values in window.items():
+            if name in ("ts_event", "open", "high", "low", "close"):
+                continue
+            line = self.indicator_lines.get(name)
+            if line is None:
+                (line,) = self.ax.plot([], [], linewidth=1, label=name)
+                self.indicator_lines[name] = line
+            line.set_data(x, values)
+
+        trade_x = trade["ts_event"] / NANOSECONDS_PER_DAY
+        is_buy = trade["trade_direction"] == TradeDirection.BUY.name
+        self.trade_marker.set_data([trade_x], [trade["fill_price"]])
+        self.trade_marker.set_marker("^" if is_buy else "v")
+        self.trade_marker.set_color("tab:green" if is_buy else "tab:red")
+        self.trade_line.set_xdata([trade_x, trade_x])
+        symbol = trade.get("symbol")
+        self.title.set_text(
+            f"Trade {trade['trade_id']}: {trade['trade_direction']} "
+            f"{trade['quantity']} {symbol if isinstance(symbol, str) else ''} "
+            f"@ {trade['fill_price']} ({trade['assoc_decision_type']})"
+        )
+
+        if self.indicator_lines:
+            self.ax.legend(
+                handles=[
+                    line for line in self.indicator_lines.values() if line.get_visible()
+                ],
+                loc="upper left",
+            )
+        # relim() ignores collections, so the limits are set from the bars.
+        margin = 0.02 * (np.nanmax(window["high"]) - np.nanmin(window["low"]))
+        self.ax.set_xlim(x[0], x[-1])
+        self.ax.set_ylim(
+            min(np.nanmin(window["low"]), trade["fill_price"]) - margin,
+            max(np.nanmax(window["high"]), trade["fill_price"]) + margin,
+        )
+        self.figure.savefig(path)
+
+
+_worker_chart: _TradeChart | None = None
+
+
+def _initialize_chart_worker(width: float, height: float, dpi: int) -> None:
+    global _worker_chart
+    _worker_chart = _TradeChart(width, height, dpi)
+
+
+def _render_trade_chart(path: str, trade: dict, window: dict[str, np.ndarray]) -> str:
+    _worker_chart.render(path, trade, window)
+    return path
+
+
+class TradeChartRenderer:
+    """
+    Renders one chart per trade, showing the bars and indicators in a window
+    of `bars_before` and `bars_after` bars around it, on a pool of worker
+    processes. Each worker draws into a single reused figure with the Agg
+    backend. At most `max_pending` charts are queued at a time, so memory
+    stays bounded no matter how many trades there are.
+
+    Use it as a context manager and either call render() after a run or
+    submit() windows as trades are closed.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        bars_before: int = 120,
+        bars_after: int = 60,
+        max_workers: int | None = None,
+        max_pending: int | None = None,
+        width: float = 12,
+        height: float = 6,
+        dpi: int = 100,
+    ):
+        self.output_dir = output_dir
+        self.bars_before = bars_before
+        self.bars_after = bars_after
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 4 * self.max_workers
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_initialize_chart_worker,
+            initargs=(width, height, dpi),
+        )
+        self._pending: set[concurrent.futures.Future] = set()
+        self.rendered_paths: list[str] = []
+        os.makedirs(output_dir, exist_ok=True)
+
+    def __enter__(self) -> "TradeChartRenderer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _collect(self, futures) -> None:
+        for future in futures:
+            try:
+                self.rendered_paths.append(future.result())
+            except Exception as e:
+                logger.error(f"Error rendering trade chart: {e}")
+
+    def submit(self, trade: dict, window: dict[str, np.ndarray]) -> None:
+        """
+        Queues the chart of `trade` (a row of the TTAnalytica trades table)
+        drawn over `window`, which maps "ts_event", "open", "high", "low",
+        "close" and any indicator names to equally long arrays. Blocks while
+        `max_pending` charts are queued.
+        """
+        if len(self._pending) >= self.max_pending:
+            done, self._pending = concurrent.futures.wait(
+                self._pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            self._collect(done)
+        path = os.path.join(self.output_dir, f"trade_{trade['trade_id']}.png")
+        self._pending.add(
+            self._executor.submit(_render_trade_chart, path, trade, window)
+        )
+
+    def render(self, trades: pd.DataFrame, processed_bars: pd.DataFrame) -> list[str]:
+        """
+        Renders all `trades` with windows sliced from `processed_bars`, both in
+        the format written by TTAnalyticaWriter, and returns the chart paths.
+        """
+        chart_columns = [
+            column
+            for column in processed_bars.columns
+            if column not in ("rtype", "symbol", "volume")
+            and column not in PERFORMANCE_INDICATOR_NAMES
+        ]
+        bars_by_symbol = (
+            processed_bars.groupby("symbol", dropna=False)
+            if trades["symbol"].notna().any()
+            else [(None, processed_bars)]
+        )
+        for symbol, bars in bars_by_symbol:
+            bars = bars.sort_values("ts_event", kind="stable")
+            columns = {
+                column: bars[column].to_numpy(dtype=np.float64)
+                for column in chart_columns
+            }
+            ts_event = bars["ts_event"].to_numpy()
+            symbol_trades = (
+                trades if symbol is None else trades[trades["symbol"] == symbol]
+            )
+            for trade in symbol_trades.to_dict("records"):
+                index = int(np.searchsorted(ts_event, trade["ts_event"]))
+                window = slice(
+                    max(index - self.bars_before, 0), index + self.bars_after + 1
+                )
+                self.submit(
+                    trade,
+                    {column: values[window] for column, values in columns.items()},
+                )
+        self.wait()
+        return self.rendered_paths
+
+    def wait(self) -> None:
+        done, _ = concurrent.futures.wait(self._pending)
+        self._pending = set()
+        self._collect(done)
+
+    def close(self) -> None:
+        self.wait()
+        self._executor.shutdown()
+
+
+def render_trade_charts(
+    path_to_ttanalytica_dir: str, path_to_charts_dir: str | None = None, **kwargs
+) -> list[str]:
+    """
+    Renders the charts of all trades written by a TTAnalyticaWriter to
+    `path_to_ttanalytica_dir` into `<path_to_ttanalytica_dir>/charts` by default.
+    """
+    trades = pd.read_csv(os.path.join(path_to_ttanalytica_dir, "trades.csv"))
+    processed_bars = pd.read_csv(
+        os.path.join(path_to_ttanalytica_dir, "processed_bars.csv")
+    )
+    path_to_charts_dir = path_to_charts_dir or os.path.join(
+        path_to_ttanalytica_dir, "charts"
+    )
+    with TradeChartRenderer(path_to_charts_dir, **kwargs) as renderer:
+        paths = renderer.render(trades, processed_bars)
+    logger.info(f"Rendered {len(paths)} trade charts to {path_to_charts_dir}")
+    return paths
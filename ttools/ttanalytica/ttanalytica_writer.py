@@ -0,0 +1,293 @@
+import math
+import os
+import queue
+import threading
+import time
+import pandas as pd
+from ttools.ontology.batching_queue import END_OF_STREAM, BatchingQueue
+from ttools.ontology.event_messages import (
+    GLOBAL_STOP_EVENT,
+    ProcessedBarEventMessage,
+    TradeEventMessage,
+)
+from ttools.ontology import global_queues
+from ttools.logging_config import logger
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+PROCESSED_BAR_COLUMNS = [
+    "ts_event",
+    "rtype",
+    "symbol",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+]
+
+TRADE_COLUMNS = [
+    "ts_event",
+    "trade_id",
+    "assoc_order_id",
+    "symbol",
+    "trade_direction",
+    "quantity",
+    "fill_price",
+    "assoc_decision_type",
+]
+
+
+class _ColumnarTableWriter:
+    """
+    Buffers rows column by column and appends them to `<path_stem>.csv` and,
+    if requested, `<path_stem>.parquet`. The columns are fixed by the first
+    flush; columns that appear later are dropped and columns that are missing
+    from later rows are written as NaN.
+    """
+
+    def __init__(self, path_stem: str, columns: list[str], file_formats: set[str]):
+        self.path_stem = path_stem
+        self.columns: dict[str, list] = {column: [] for column in columns}
+        self.file_formats = file_formats
+        self.row_count = 0
+        self.written_row_count = 0
+        self._written_columns: list[str] | None = None
+        self._parquet_writer = None
+
+    def add_column(self, column: str) -> list:
+        values = self.columns[column] = [math.nan] * self.row_count
+        return values
+
+    def pad_columns(self) -> None:
+        """
+        Pads the columns that were not appended to for the current row.
+        """
+        for values in self.columns.values():
+            if len(values) < self.row_count:
+                values.append(math.nan)
+
+    def flush(self) -> None:
+        if not self.row_count:
+            return
+        table = pd.DataFrame(self.columns)
+        if self._written_columns is None:
+            self._written_columns = list(table.columns)
+        elif list(table.columns) != self._written_columns:
+            dropped_columns = set(table.columns) - set(self._written_columns)
+            if dropped_columns:
+                logger.warning(
+                    f"Dropping columns {sorted(dropped_columns)} that are not in "
+                    f"{self.path_stem}"
+                )
+            table = table.reindex(columns=self._written_columns)
+
+        if "csv" in self.file_formats:
+            table.to_csv(
+                f"{self.path_stem}.csv",
+                mode="w" if self.written_row_count == 0 else "a",
+                header=self.written_row_count == 0,
+                index=False,
+            )
+        if "parquet" in self.file_formats:
+            arrow_table = pyarrow.Table.from_pandas(
+                table,
+                schema=(self._parquet_writer.schema if self._parquet_writer else None),
+                preserve_index=False,
+            )
+            if self._parquet_writer is None:
+                self._parquet_writer = pyarrow.parquet.ParquetWriter(
+                    f"{self.path_stem}.parquet", arrow_table.schema
+                )
+            self._parquet_writer.write_table(arrow_table)
+
+        self.written_row_count += self.row_count
+        self.row_count = 0
+        for values in self.columns.values():
+            values.clear()
+
+    def close(self) -> None:
+        self.flush()
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+
+class TTAnalyticaWriter:
+    """
+    Background consumer that drains the processed bar and trade queues to
+    `processed_bars.csv` and `trades.csv` in `output_dir`, plus Parquet files if
+    pyarrow is installed. Messages are buffered column by column, one column per
+    `indicator_values` key, and written in batches once `flush_size` rows are
+    buffered or `flush_interval` seconds have passed. The strategy thread only
+    ever puts to the (unbounded) queues, so it is never blocked by disk writes.
+
+    Everything still queued is written when the writer is stopped, either by
+    stop() or the stop event.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        process_bar_event_message_queue: BatchingQueue | None = None,
+        trade_event_message_queue: BatchingQueue | None = None,
+        stop_event: threading.Event | None = None,
+        file_formats: tuple[str, ...] = ("csv", "parquet"),
+        flush_size: int = 100_000,
+        flush_interval: float = 5.0,
+        poll_interval: float = 0.05,
+    ):
+        self.output_dir = output_dir
+        self.process_bar_event_message_queue = (
+            process_bar_event_message_queue
+            or global_queues.process_bar_event_message_queue
+        )
+        self.trade_event_message_queue = (
+            trade_event_message_queue or global_queues.trade_event_message_queue
+        )
+        self._stop_event = stop_event or GLOBAL_STOP_EVENT
+        self._instance_stop_event = threading.Event()
+        self.file_formats = set(file_formats)
+        if "parquet" in self.file_formats and pyarrow is None:
+            logger.info("pyarrow is not installed, not writing Parquet files")
+            self.file_formats.discard("parquet")
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.poll_interval = poll_interval
+        self.writer_thread: threading.Thread | None = None
+
+        os.makedirs(output_dir, exist_ok=True)
+        self._processed_bars = _ColumnarTableWriter(
+            os.path.join(output_dir, "processed_bars"),
+            PROCESSED_BAR_COLUMNS,
+            self.file_formats,
+        )
+        self._trades = _ColumnarTableWriter(
+            os.path.join(output_dir, "trades"), TRADE_COLUMNS, self.file_formats
+        )
+
+    def _buffer_processed_bars(
+        self, processed_bar_event_messages: list[ProcessedBarEventMessage]
+    ) -> None:
+        table = self._processed_bars
+        columns = table.columns
+        ts_event, rtype, symbol = (
+            columns["ts_event"],
+            columns["rtype"],
+            columns["symbol"],
+        )
+        open_, high, low = columns["open"], columns["high"], columns["low"]
+        close, volume = columns["close"], columns["volume"]
+        for message in processed_bar_event_messages:
+            if message is END_OF_STREAM:
+                continue
+            ohlcv = message.ohlcv
+            ts_event.append(message.ts_event)
+            rtype.append(message.rtype.value)
+            symbol.append(message.symbol)
+            open_.append(ohlcv.open)
+            high.append(ohlcv.high)
+            low.append(ohlcv.low)
+            close.append(ohlcv.close)
+            volume.append(ohlcv.volume)
+            for name, value in message.indicator_values.items():
+                values = columns.get(name)
+                if values is None:
+                    values = table.add_column(name)
+                values.append(value)
+            table.row_count += 1
+            if len(columns) != len(PROCESSED_BAR_COLUMNS) + len(
+                message.indicator_values
+            ):
+                table.pad_columns()
+
+    def _buffer_trades(self, trade_event_messages: list[TradeEventMessage]) -> None:
+        table = self._trades
+        columns = table.columns
+        for message in trade_event_messages:
+            if message is END_OF_STREAM:
+                continue
+            columns["ts_event"].append(message.ts_event)
+            columns["trade_id"].append(message.trade_id)
+            columns["assoc_order_id"].append(message.assoc_order_id)
+            columns["symbol"].append(message.symbol)
+            columns["trade_direction"].append(message.trade_direction.name)
+            columns["quantity"].append(message.quantity)
+            columns["fill_price"].append(message.fill_price)
+            columns["assoc_decision_type"].append(message.assoc_decision_type.name)
+            table.row_count += 1
+
+    def _drain(self, block: bool) -> int:
+        """
+        Buffers the messages that are available in both queues, up to
+        `flush_size` rows each, and returns how many were received. With
+        `block=True`, waits up to `poll_interval` for the first batch of
+        processed bars.
+        """
+        received = 0
+        for event_message_queue, buffer, table in (
+            (
+                self.process_bar_event_message_queue,
+                self._buffer_processed_bars,
+                self._processed_bars,
+            ),
+            (self.trade_event_message_queue, self._buffer_trades, self._trades),
+        ):
+            while table.row_count < self.flush_size:
+                try:
+                    messages = event_message_queue.get_many(
+                        block=block, timeout=self.poll_interval
+                    )
+                except queue.Empty:
+                    break
+                buffer(messages)
+                received += len(messages)
+                block = False
+        return received
+
+    def flush(self) -> None:
+        self._processed_bars.flush()
+        self._trades.flush()
+
+    def _write(self) -> None:
+        last_flush_time = time.monotonic()
+        while not (self._stop_event.is_set() or self._instance_stop_event.is_set()):
+            self._drain(block=True)
+            if (
+                self._processed_bars.row_count >= self.flush_size
+                or self._trades.row_count >= self.flush_size
+                or time.monotonic() - last_flush_time >= self.flush_interval
+            ):
+                self.flush()
+                last_flush_time = time.monotonic()
+        self.process_bar_event_message_queue.flush()
+        self.trade_event_message_queue.flush()
+        while self._drain(block=False):
+            self.flush()
+        self._processed_bars.close()
+        self._trades.close()
+        logger.info(
+            f"Wrote {self._processed_bars.written_row_count} processed bars and "
+            f"{self._trades.written_row_count} trades to {self.output_dir}"
+        )
+
+    def start(self) -> None:
+        self.writer_thread = threading.Thread(
+            target=self._write,
+            name="TTAnalyticaWriterThread",
+        )
+        self.writer_thread.start()
+
+    def stop(self) -> None:
+        """
+        Writes everything still queued and waits for the writer thread to end.
+        Call it after the strategy thread has finished.
+        """
+        self._instance_stop_event.set()
+        if self.writer_thread and self.writer_thread.is_alive():
+            self.writer_thread.join()